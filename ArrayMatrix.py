@@ -0,0 +1,635 @@
+from array import array
+from random import Random
+
+from SearchStats import Cancelled
+
+# Lists of an ArrayMatrix that are packed by to_arrays
+ARRAY_NAMES = ("L", "R", "U", "D", "C", "row", "S", "row_headers")
+
+# Names of the column choice heuristics and the methods implementing them
+HEURISTICS = {
+    "min": "choose_min",
+    "first": "choose_first",
+    "random": "choose_random",
+    "buckets": "choose_buckets",
+}
+
+
+class ArrayMatrix:
+    """A linked matrix stored in flat integer lists indexed by node number,
+    instead of one DataObject per node. Node 0 is the root, nodes 1 to num_cols
+    are the column headers and the remaining nodes hold the ones of the matrix.
+    With secondary columns, node num_cols + 1 heads their own circular list and
+    the ones start after it.
+    Every node number is a single shared int object, so a node costs six list
+    slots. Reading from a list is also much faster than reading from an
+    array("i"), which creates a new int every time, so the packed arrays from
+    to_arrays are only used for storage.
+
+    :param List[int] L: Left node of every node
+    :param List[int] R: Right node of every node
+    :param List[int] U: Up node of every node
+    :param List[int] D: Down node of every node
+    :param List[int] C: Column header of every node
+    :param List[int] S: Size of every column, indexed by the node of its header
+    :param List[int] row: Row every node belongs to, 0 for the root and headers
+    :param List[int] row_headers: First node of every row, -1 for empty rows
+    :param List[str] names: Names of the columns
+    :param int secondary: Head node of the secondary columns, None if there are none
+    """
+
+    def __init__(self, col_headers, secondary=0):
+        """Initialize ArrayMatrix with column headers and no rows.
+
+        :param List[str] col_headers: Column headers.
+        :param int secondary: Number of secondary columns, the last ones of col_headers.
+        """
+        num_cols = len(col_headers)
+        if not 0 <= secondary <= num_cols:
+            raise Exception("Incorrect header number")
+        self.num_cols = num_cols
+        self.names = [None] + list(col_headers)
+
+        # Root and primary headers form a circular list, with every column empty.
+        # Secondary headers form another one, which choose never looks at.
+        rings = [list(range(0, num_cols - secondary + 1))]
+        self.secondary = None
+        if secondary:
+            self.secondary = num_cols + 1
+            rings.append([num_cols + 1] + list(range(num_cols - secondary + 1, num_cols + 1)))
+
+        headers = list(range(0, num_cols + len(rings)))
+        self.L = headers.copy()
+        self.R = headers.copy()
+        for ring in rings:
+            for k in range(0, len(ring)):
+                self.L[ring[k]] = ring[k - 1]
+                self.R[ring[k]] = ring[(k + 1) % len(ring)]
+        self.U = headers.copy()
+        self.D = headers.copy()
+        self.C = headers
+        self.S = [0] * (num_cols + 1)
+        self.row = [0] * len(headers)
+        self.row_headers = [0]
+        self.random = None
+
+    def add_row(self, cols):
+        """Append a row to the bottom of ArrayMatrix self.
+
+        :param List[int] cols: Indices (starting at 0) of the columns of the row
+        that contain a 1, in increasing order.
+        :return int: Returns the number of the new row, starting at 1.
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        row_number = len(self.row_headers)
+        count = len(cols)
+        nodes = list(range(len(L), len(L) + count))
+
+        for k in range(0, count):
+            node = nodes[k]
+            c = C[cols[k] + 1]
+            up = U[c]
+            L.append(nodes[k - 1])
+            R.append(nodes[(k + 1) % count])
+            U.append(up)
+            D.append(c)
+            C.append(c)
+            self.row.append(row_number)
+            D[up] = node
+            U[c] = node
+            S[c] += 1
+
+        self.row_headers.append(nodes[0] if nodes else -1)
+        return row_number
+
+    def cover(self, c):
+        """Cover column c.
+
+        :param int c: Header node of column to cover.
+        :return: None
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                u = U[j]
+                d = D[j]
+                D[u] = d
+                U[d] = u
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        """Uncover column c.
+
+        :param int c: Header node of column to uncover.
+        :return: None
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def cover_row(self, r):
+        """Cover every other column of the row node r belongs to.
+
+        :param int r: Node of the row.
+        :return: None
+        """
+        R = self.R
+        j = R[r]
+        while j != r:
+            self.cover(self.C[j])
+            j = R[j]
+
+    def cover_row_counted(self, r):
+        """Cover every other column of the row node r belongs to, like cover_row,
+        counting the links removed.
+
+        :param int r: Node of the row.
+        :return int: Number of links removed, see count_updates
+        """
+        R = self.R
+        updates = 0
+        j = R[r]
+        while j != r:
+            updates += self.count_updates(self.C[j])
+            self.cover(self.C[j])
+            j = R[j]
+        return updates
+
+    def count_updates(self, c):
+        """Count the links cover would remove now, the header and every node of the
+        other columns of the rows of column c.
+
+        :param int c: Header node of the column.
+        :return int: Number of links
+        """
+        R, D = self.R, self.D
+        updates = 1
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                updates += 1
+                j = R[j]
+            i = D[i]
+        return updates
+
+    def uncover_row(self, r):
+        """Uncover every other column of the row node r belongs to.
+
+        :param int r: Node of the row.
+        :return: None
+        """
+        L = self.L
+        j = L[r]
+        while j != r:
+            self.uncover(self.C[j])
+            j = L[j]
+
+    def select_row(self, row_number):
+        """Put row number row_number in the solution by covering all of its columns,
+        unless one of them is already covered. Same as RootObject.select_row.
+
+        :param int row_number: Row to select, starting at 1.
+        :return bool: Whether the row could be selected.
+        """
+        L, R, C = self.L, self.R, self.C
+        row_start = self.row_headers[row_number]
+        j = row_start
+        while True:
+            if R[L[C[j]]] != C[j]:
+                return False
+            j = R[j]
+            if j == row_start:
+                break
+        self.cover(C[row_start])
+        self.cover_row(row_start)
+        return True
+
+    def unselect_row(self, row_number):
+        """Undo select_row for row number row_number.
+
+        :param int row_number: Row to unselect, starting at 1.
+        :return: None
+        """
+        row_start = self.row_headers[row_number]
+        self.uncover_row(row_start)
+        self.uncover(self.C[row_start])
+
+    def branch_rows(self):
+        """Return the rows of the column choose picks, same as RootObject.branch_rows.
+
+        :return List[int]: Row numbers top to bottom, None if every column is covered.
+        """
+        D, row = self.D, self.row
+        c = self.choose()
+        if c == 0:
+            return None
+        rows = []
+        r = D[c]
+        while r != c:
+            rows.append(row[r])
+            r = D[r]
+        return rows
+
+    def snapshot(self):
+        """Return the current state of the links, same as RootObject.snapshot.
+
+        :return tuple: Copies of the link and size lists.
+        """
+        return (self.L.copy(), self.R.copy(), self.U.copy(), self.D.copy(), self.S.copy())
+
+    def to_arrays(self):
+        """Pack the links of ArrayMatrix self into arrays of C ints, for storage.
+
+        :return Dict[str, array]: Returns the arrays named by ARRAY_NAMES.
+        """
+        return {name: array("i", getattr(self, name)) for name in ARRAY_NAMES}
+
+    def choose_min(self):
+        """Choose the next column to cover with minimum branching factor.
+
+        :return int: Header node of next column to cover, 0 if there are none.
+        """
+        R, S = self.R, self.S
+        c = 0
+        s = len(self.row_headers)
+        j = R[0]
+        while j:
+            size = S[j]
+            if size < s:
+                if not size:
+                    return j
+                c = j
+                s = size
+            j = R[j]
+        return c
+
+    choose = choose_min
+
+    def choose_first(self):
+        """Choose the leftmost column.
+
+        :return int: Header node of next column to cover, 0 if there are none.
+        """
+        return self.R[0]
+
+    def choose_random(self):
+        """Choose a column with minimum branching factor, breaking ties at random.
+
+        :return int: Header node of next column to cover, 0 if there are none.
+        """
+        R, S = self.R, self.S
+        ties = [0]
+        s = len(self.row_headers)
+        j = R[0]
+        while j:
+            size = S[j]
+            if size < s:
+                ties = [j]
+                s = size
+            elif size == s:
+                ties.append(j)
+            j = R[j]
+        return self.random.choice(ties)
+
+    def set_heuristic(self, name, seed=None):
+        """Set how choose picks the next column, same as RootObject.set_heuristic.
+
+        :param str name: Name of the heuristic, a key of HEURISTICS.
+        :param int seed: Seed of the random tie-break.
+        :return: None
+        """
+        if name not in HEURISTICS:
+            raise Exception("Unknown heuristic!")
+        if name == "buckets" and not isinstance(self, BucketArrayMatrix):
+            raise Exception("Matrix was built without size buckets!")
+        if name == "random":
+            self.random = Random(seed)
+        self.choose = getattr(self, HEURISTICS[name])
+
+    def search(self, k, solution):
+        """Dancing links algorithm, same as Exact_Cover.search.
+
+        :param int k: Recursion depth, kept for compatibility
+        :param List[int] solution: Solution of exact cover
+        :return Boolean: Returns True if exact cover exists, False otherwise
+        """
+        for rows in self.search_all():
+            rows.reverse()
+            solution.extend(rows)
+            return True
+        return False
+
+    def search_all(self, stats=None, cancel=None):
+        """Dancing links algorithm with an explicit stack, same as
+        Exact_Cover.search_all.
+
+        :param SearchStats stats: Statistics to update while searching, None to skip them
+        :param cancel: Called at every node to cancel the search, see Exact_Cover.search_all.
+        :return Iterator[List[int]]: Yields the rows of each solution
+        """
+        row = self.row
+        solutions = self._search(stats, cancel)
+        try:
+            for stack in solutions:
+                yield [row[r] for r in stack]
+        finally:
+            solutions.close()
+
+    def count_solutions(self, limit=None, stats=None, cancel=None):
+        """Count the solutions of the exact cover, same as Exact_Cover.count_solutions.
+
+        :param int limit: Stop counting once limit solutions are found, None to count all
+        :param SearchStats stats: Statistics to update while searching, None to skip them
+        :param cancel: Called at every node to cancel the search, see Exact_Cover.search_all.
+        :return int: Returns the number of solutions, at most limit
+        """
+        if limit is not None:
+            if limit < 0:
+                raise Exception("Limit must not be negative!")
+            if limit == 0:
+                return 0
+
+        count = 0
+        solutions = self._search(stats, cancel)
+        try:
+            for stack in solutions:
+                count += 1
+                if limit is not None and count >= limit:
+                    break
+        finally:
+            solutions.close()
+        return count
+
+    def _search(self, stats, cancel):
+        """The search loop shared by search_all and count_solutions, same as
+        Exact_Cover._search.
+
+        :param SearchStats stats: Statistics to update while searching, None to skip them
+        :param cancel: Called at every node to cancel the search, see Exact_Cover.search_all.
+        :return Iterator[List[int]]: Yields the stack of chosen row nodes at each
+        solution, only valid until the next one
+        """
+        C, D, S, row = self.C, self.D, self.S, self.row
+        counting = stats is not None and stats.count_updates
+
+        # Chosen row node of every level, its column is covered too
+        stack = []
+        if stats is not None:
+            stats.start()
+        try:
+            while True:
+                if cancel is not None and cancel():
+                    raise Cancelled()
+
+                c = self.choose()
+                if stats is not None:
+                    stats.node(len(stack), 0 if c == 0 else S[c])
+
+                # Solution found
+                if c == 0:
+                    if stats is not None:
+                        stats.solution([row[r] for r in stack])
+                    yield stack
+
+                # Go one level deeper unless a column has no more rows left
+                elif D[c] != c:
+                    r = D[c]
+                    if counting:
+                        stats.updates += self.count_updates(c)
+                        self.cover(c)
+                        stats.updates += self.cover_row_counted(r)
+                    else:
+                        self.cover(c)
+                        self.cover_row(r)
+                    stack.append(r)
+                    continue
+
+                # Backtrack to the deepest level with another row to try
+                while stack:
+                    r = stack.pop()
+                    self.uncover_row(r)
+                    if stats is not None:
+                        stats.backtrack(len(stack))
+                    c = C[r]
+                    r = D[r]
+                    if r != c:
+                        if counting:
+                            stats.updates += self.cover_row_counted(r)
+                        else:
+                            self.cover_row(r)
+                        stack.append(r)
+                        break
+                    self.uncover(c)
+                else:
+                    return
+        finally:
+            while stack:
+                r = stack.pop()
+                self.uncover_row(r)
+                self.uncover(C[r])
+            if stats is not None:
+                stats.stop()
+
+
+class BucketArrayMatrix(ArrayMatrix):
+    """An ArrayMatrix that also keeps every uncovered column in a circular doubly
+    linked list of the columns of its size, so that a column of minimum size is
+    found without looking at the others. The head of the bucket of size s is node
+    num_cols + 1 + s of BL and BR. Uncovering puts every column back exactly where
+    it was in its bucket, same as LinkedMatrix.BucketColumnObject.
+
+    :param List[int] BL: Previous column in size bucket, by header node
+    :param List[int] BR: Next column in size bucket, by header node
+    :param List[int] B: Column before the column of every node taken out by cover,
+    in its old bucket, by node
+    :param int lowest: No bucket below lowest has a column
+    """
+
+    def fill_buckets(self):
+        """Put every column in the bucket of its size, once all rows are added.
+
+        :return: None
+        """
+        num_cols = self.num_cols
+        heads = list(range(num_cols + 1, num_cols + max(self.S) + 2))
+        self.BL = list(range(0, num_cols + 1)) + heads
+        self.BR = self.BL.copy()
+        self.B = [0] * len(self.L)
+        self.lowest = 0
+        for c in range(1, num_cols + 1):
+            self.add_to_bucket(self.C[c])
+        self.set_heuristic("buckets")
+
+    def add_to_bucket(self, c):
+        """Put column c in the size bucket matching its size.
+
+        :param int c: Header node of column.
+        :return: None
+        """
+        BL, BR = self.BL, self.BR
+        head = self.num_cols + 1 + self.S[c]
+        BL[c] = head
+        BR[c] = BR[head]
+        BL[BR[head]] = c
+        BR[head] = c
+        if self.S[c] < self.lowest:
+            self.lowest = self.S[c]
+
+    def cover(self, c):
+        """Cover column c, moving the columns that lose a node to the head of the next
+        lower bucket, same as BucketColumnObject.cover.
+
+        :param int c: Header node of column to cover.
+        :return: None
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        BL, BR, B = self.BL, self.BR, self.B
+        base = self.num_cols + 1
+        # BL and BR of c are kept, to put it back between them
+        BR[BL[c]] = BR[c]
+        BL[BR[c]] = BL[c]
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                u = U[j]
+                d = D[j]
+                D[u] = d
+                U[d] = u
+                k = C[j]
+                BR[BL[k]] = BR[k]
+                BL[BR[k]] = BL[k]
+                B[j] = BL[k]
+                size = S[k] - 1
+                S[k] = size
+                head = base + size
+                BL[k] = head
+                BR[k] = BR[head]
+                BL[BR[head]] = k
+                BR[head] = k
+                if size < self.lowest:
+                    self.lowest = size
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        """Uncover column c, moving the columns that get a node back to where they
+        were in the next higher bucket, same as BucketColumnObject.uncover.
+
+        :param int c: Header node of column to uncover.
+        :return: None
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        BL, BR, B = self.BL, self.BR, self.B
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                k = C[j]
+                BR[BL[k]] = BR[k]
+                BL[BR[k]] = BL[k]
+                S[k] += 1
+                before = B[j]
+                BL[k] = before
+                BR[k] = BR[before]
+                BL[BR[before]] = k
+                BR[before] = k
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+        BR[BL[c]] = c
+        BL[BR[c]] = c
+        if S[c] < self.lowest:
+            self.lowest = S[c]
+
+    def snapshot(self):
+        """Return the current state of the links, with the size buckets, same as
+        RootObject.snapshot.
+
+        :return tuple: Copies of the link, size and bucket lists.
+        """
+        return ArrayMatrix.snapshot(self) + (self.BL.copy(), self.BR.copy())
+
+    def choose_buckets(self):
+        """Choose a column with minimum branching factor from the size buckets.
+
+        :return int: Header node of next column to cover, 0 if there are none.
+        """
+        BR = self.BR
+        head = self.num_cols + 1 + self.lowest
+        while head < len(BR):
+            if BR[head] != head:
+                self.lowest = head - self.num_cols - 1
+                return BR[head]
+            head += 1
+        self.lowest = head - self.num_cols - 1
+        return 0
+
+
+def build_array_matrix(col_headers, rows, buckets=False, secondary=0):
+    """Build an ArrayMatrix from the positions of the ones in each row. Same as
+    LinkedMatrix.build_linked_matrix, but for the array engine.
+
+    :param List[str] col_headers: Column headers.
+    :param Iterable[List[int]] rows: For every row, the indices (starting at 0) of
+    the columns that contain a 1, in increasing order.
+    :param bool buckets: Whether to keep columns in size buckets, and choose from them.
+    :param int secondary: Number of secondary columns, the last ones of col_headers.
+    :return ArrayMatrix: Returns the linked matrix.
+    """
+    if buckets:
+        if secondary:
+            raise Exception("Size buckets do not support secondary columns!")
+        matrix = BucketArrayMatrix(col_headers)
+    else:
+        matrix = ArrayMatrix(col_headers, secondary)
+    for row in rows:
+        matrix.add_row(row)
+    if buckets:
+        matrix.fill_buckets()
+    return matrix
+
+
+def array_matrix_from_arrays(col_headers, arrays, secondary=0):
+    """Rebuild an ArrayMatrix from the arrays of ArrayMatrix.to_arrays, in bulk.
+
+    :param List[str] col_headers: Column headers.
+    :param Dict[str, array] arrays: Arrays named by ARRAY_NAMES.
+    :param int secondary: Number of secondary columns, the last ones of col_headers.
+    :return ArrayMatrix: Returns the linked matrix.
+    """
+    matrix = ArrayMatrix(col_headers, secondary)
+    if len(arrays["S"]) != matrix.num_cols + 1:
+        raise Exception("Incorrect header number")
+
+    # Share one int object per node and per row number
+    nodes = list(range(0, len(arrays["L"])))
+    for name in ("L", "R", "U", "D", "C"):
+        setattr(matrix, name, list(map(nodes.__getitem__, arrays[name])))
+    row_numbers = list(range(0, len(arrays["row_headers"])))
+    matrix.row = list(map(row_numbers.__getitem__, arrays["row"]))
+    matrix.S = arrays["S"].tolist()
+    matrix.row_headers = arrays["row_headers"].tolist()
+
+    return matrix
@@ -0,0 +1,154 @@
+import numpy as np
+
+from SolverSession import SudokuSession
+
+# Status of every puzzle after eliminate
+OPEN = 0
+SOLVED = 1
+CONTRADICTION = -1
+
+
+def grids_to_candidates(n, grids):
+    """Convert Sudoku grids to packed candidate bitmasks, one per cell, with bit
+    number - 1 set when number is still possible in the cell.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param grids: N grids as nested lists or an array of shape (N, n**2, n**2), 0 for
+    empty cells.
+    :return np.ndarray: Candidates of shape (N, n**2, n**2).
+    """
+    size = n**2
+    values = np.asarray(grids, dtype=np.int64)
+    if values.ndim != 3 or values.shape[1:] != (size, size):
+        raise Exception("Invalid grid size!")
+    if ((values < 0) | (values > size)).any():
+        raise Exception("Invalid number!")
+
+    dtype = np.uint16 if size <= 16 else np.uint32
+    full = (1 << size) - 1
+    cand = np.where(values == 0, full, np.left_shift(1, values - 1))
+    return cand.astype(dtype)
+
+
+def candidates_to_grids(cand):
+    """Convert candidates back to grids, filling only the cells with a single candidate.
+
+    :param np.ndarray cand: Candidates of shape (N, n**2, n**2).
+    :return np.ndarray: Grids of shape (N, n**2, n**2), 0 for undecided cells.
+    """
+    single = (cand != 0) & (cand & (cand - 1) == 0)
+    return np.where(single, np.log2(np.maximum(cand, 1)).astype(np.int64) + 1, 0)
+
+
+def _units(n, cand):
+    """Return the rows, columns and boxes of candidates, each of shape
+    (N, n**2 units, n**2 cells).
+    """
+    count = cand.shape[0]
+    size = n**2
+    boxes = cand.reshape(count, n, n, n, n).transpose(0, 1, 3, 2, 4).reshape(count, size, size)
+    return cand, cand.transpose(0, 2, 1), boxes
+
+
+def _to_cells(n, rows, cols, boxes):
+    """Combine one mask per row, column and box into one mask per cell, the union of
+    the masks of the three units of the cell.
+    """
+    count = rows.shape[0]
+    boxes = np.repeat(np.repeat(boxes.reshape(count, n, n), n, axis=1), n, axis=2)
+    return rows[:, :, None] | cols[:, None, :] | boxes
+
+
+def _once_twice(units):
+    """Return the bits set in at least one cell and in at least two cells of every unit.
+
+    :param np.ndarray units: Masks of shape (N, units, cells).
+    :return Tuple[np.ndarray, np.ndarray]: Masks of shape (N, units).
+    """
+    once = np.zeros(units.shape[:2], dtype=units.dtype)
+    twice = np.zeros(units.shape[:2], dtype=units.dtype)
+    for k in range(0, units.shape[2]):
+        twice |= once & units[:, :, k]
+        once |= units[:, :, k]
+    return once, twice
+
+
+def eliminate(n, cand):
+    """Run naked and hidden singles on every puzzle of a candidate array at once,
+    until none of them changes. Every step works on the whole batch with bitwise
+    row, column and box reductions. Puzzles drop out of the batch as soon as they are
+    solved, stuck or found to have no solution.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param np.ndarray cand: Candidates of shape (N, n**2, n**2), updated in place.
+    :return np.ndarray: Status of every puzzle, OPEN, SOLVED or CONTRADICTION.
+    """
+    full = cand.dtype.type((1 << n**2) - 1)
+    status = np.full(cand.shape[0], OPEN, dtype=np.int8)
+    active = np.arange(cand.shape[0])
+
+    while active.size:
+        c = cand[active]
+        single = c & (c - 1) == 0
+        fixed = np.where(single, c, 0).astype(c.dtype)
+        dead = (c == 0).any(axis=(1, 2))
+
+        # Naked singles, remove placed numbers from the other cells of their units
+        placed = []
+        for units in _units(n, fixed):
+            once, twice = _once_twice(units)
+            dead |= (twice != 0).any(axis=1)
+            placed.append(once)
+        new = np.where(single, c, c & ~_to_cells(n, *placed))
+
+        # Hidden singles, a number with one cell left in a unit goes there
+        hidden = []
+        for units in _units(n, new):
+            once, twice = _once_twice(units)
+            dead |= (once != full).any(axis=1)
+            hidden.append(once & ~twice)
+        only = new & _to_cells(n, *hidden)
+        new = np.where(only != 0, only, new)
+
+        changed = (new != c).any(axis=(1, 2))
+        complete = (new & (new - 1) == 0).all(axis=(1, 2))
+        cand[active] = new
+
+        status[active[dead]] = CONTRADICTION
+        status[active[~dead & ~changed & complete]] = SOLVED
+        active = active[~dead & changed]
+
+    return status
+
+
+def solve_batch(n, grids, session=None, chunk_size=10000):
+    """Solve many Sudoku puzzles, eliminating candidates for all of them at once.
+    Puzzles solved by elimination are returned as they are, only the others are
+    searched with the exact cover matrix of session.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param grids: Grids as nested lists or an array of shape (N, n**2, n**2), 0 for
+    empty cells.
+    :param SudokuSession session: Session for the puzzles left, None to make one.
+    :param int chunk_size: Number of puzzles eliminated together, which bounds memory.
+    :return List[List[List[int]]]: Returns the solved grids in order, None for
+    puzzles with no solution.
+    """
+    if session is None:
+        session = SudokuSession(n)
+
+    results = []
+    for start in range(0, len(grids), chunk_size):
+        cand = grids_to_candidates(n, grids[start:start + chunk_size])
+        status = eliminate(n, cand)
+        values = candidates_to_grids(cand)
+
+        for p in range(0, len(status)):
+            if status[p] == SOLVED:
+                results.append(values[p].tolist())
+            elif status[p] == CONTRADICTION:
+                results.append(None)
+            else:
+                results.append(session.solve(values[p].tolist()))
+
+    return results
@@ -0,0 +1,212 @@
+import argparse
+import sys
+import time
+
+from PuzzleIO import InvalidPuzzle, format_grid, parse_puzzle
+from SolutionCache import SolutionCache
+from SolverSession import SudokuSession
+
+# Status of every solved line
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+INVALID = "invalid"
+
+
+class BatchSolver:
+    """Solves a stream of puzzles one line at a time, keeping one SudokuSession
+    per grid size and counting the results.
+
+    :param Dict[int, SudokuSession] sessions: Sessions by n.
+    :param Dict[str, int] counts: Number of puzzles by status.
+    :param SolutionCache solution_cache: Cache of solutions, None to always search.
+    """
+
+    def __init__(self, engine="object", cache=False, solution_cache=None):
+        """Initialize BatchSolver.
+
+        :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+        :param bool cache: Whether to load matrices from the template cache.
+        :param SolutionCache solution_cache: Cache of solutions, None to always search.
+        """
+        self.engine = engine
+        self.cache = cache
+        self.solution_cache = solution_cache
+        self.sessions = {}
+        self.counts = {SOLVED: 0, UNSOLVABLE: 0, INVALID: 0}
+
+    def session(self, n):
+        """Return the session for grids of size n**2, building it on first use.
+
+        :param int n: n**2 is size of Sudoku grid.
+        :return SudokuSession: The session.
+        """
+        if n not in self.sessions:
+            self.sessions[n] = SudokuSession(n, self.engine, cache=self.cache)
+        return self.sessions[n]
+
+    def solve_line(self, line, stats=None, cancel=None):
+        """Solve the puzzle on one line. Only lines that are not puzzles are invalid,
+        givens that conflict make a puzzle unsolvable, and any other error is raised.
+
+        :param str line: The puzzle, see PuzzleIO.parse_puzzle.
+        :param SearchStats stats: Statistics of the search, None to skip them.
+        :param cancel: Called at every node to cancel the search, see Exact_Cover.search_all.
+        :return Tuple[str, str]: Returns the solution on one line, or the status if
+        there is none, and the status.
+        """
+        try:
+            n, grid = parse_puzzle(line)
+        except InvalidPuzzle:
+            self.counts[INVALID] += 1
+            return INVALID, INVALID
+
+        if self.solution_cache is not None:
+            solved = self.solution_cache.solve(self.session(n), grid, stats, cancel)
+        else:
+            solved = self.session(n).solve(grid, stats, cancel)
+
+        if solved is None:
+            self.counts[UNSOLVABLE] += 1
+            return UNSOLVABLE, UNSOLVABLE
+
+        self.counts[SOLVED] += 1
+        return format_grid(solved), SOLVED
+
+    def solve_stream(self, lines, out, status=False):
+        """Solve every puzzle in lines and write one line to out for each of them, as
+        soon as it is solved. Empty lines are skipped.
+
+        :param Iterable[str] lines: Puzzles, one per line.
+        :param TextIO out: Where solutions are written.
+        :param bool status: Whether to add the status and the time in milliseconds to
+        every line, separated by tabs.
+        :return: None
+        """
+        for line in lines:
+            if not line.strip():
+                continue
+
+            start = time.perf_counter()
+            solution, result = self.solve_line(line)
+            write_result(out, solution, result, (time.perf_counter() - start) * 1000, status)
+
+    def summary(self, elapsed):
+        """Return a summary of the solved puzzles.
+
+        :param float elapsed: Total time in seconds.
+        :return str: Number of puzzles by status and throughput.
+        """
+        total = sum(self.counts.values())
+        rate = total / elapsed if elapsed > 0 else 0.0
+        text = "%d puzzles (%d solved, %d unsolvable, %d invalid) in %.3fs, %.1f puzzles/sec" % (
+            total, self.counts[SOLVED], self.counts[UNSOLVABLE], self.counts[INVALID], elapsed, rate)
+        if self.solution_cache is not None:
+            text += "\ncache: %(hits)d hits, %(misses)d misses, %(uncached)d uncached, " \
+                    "%(evictions)d evictions, %(hit_rate).1f%% hit rate" % dict(
+                        self.solution_cache.stats(), hit_rate=self.solution_cache.hit_rate() * 100)
+        return text
+
+
+def write_result(out, solution, result, elapsed, status=False, index=None):
+    """Write the result of one puzzle to out.
+
+    :param TextIO out: Where solutions are written.
+    :param str solution: The solution on one line, or the status if there is none.
+    :param str result: The status.
+    :param float elapsed: Time spent on the puzzle in milliseconds.
+    :param bool status: Whether to add the status and the time, separated by tabs.
+    :param int index: Number of the puzzle in the input, written first if not None.
+    :return: None
+    """
+    if index is not None:
+        out.write("%d\t" % index)
+    if status:
+        out.write("%s\t%s\t%.3f\n" % (solution, result, elapsed))
+    else:
+        out.write(solution + "\n")
+
+
+def parse_args(argv):
+    """Parse the command line arguments.
+
+    :param List[str] argv: Arguments, without the program name.
+    :return argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Solve Sudoku puzzles, one per line.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file of puzzles, - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file for solutions, - for stdout (default)")
+    parser.add_argument("--status", action="store_true",
+                        help="add status and time in milliseconds to every line")
+    parser.add_argument("--summary", action="store_true",
+                        help="print a summary with throughput to stderr at the end")
+    parser.add_argument("--engine", choices=("object", "array"), default="object",
+                        help="dancing links engine (default object)")
+    parser.add_argument("--cache", action="store_true",
+                        help="load matrices from the template cache, array engine only")
+    parser.add_argument("--solution-cache", type=int, default=0, metavar="SIZE",
+                        help="answer symmetries of solved puzzles from a cache of SIZE "
+                             "solutions, single process only (default off)")
+    parser.add_argument("--solution-cache-file", default=None,
+                        help="file the solution cache is loaded from and saved to")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes (default 1)")
+    parser.add_argument("--chunk-size", type=int, default=256,
+                        help="puzzles sent to a worker at once (default 256)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="write solutions as soon as they are ready, prefixed with "
+                             "the number of the puzzle in the input")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Solve puzzles from a file or stdin, as given by the command line.
+
+    :param List[str] argv: Arguments, None for sys.argv.
+    :return int: Exit status.
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.cache and args.engine != "array":
+        print("--cache needs --engine array", file=sys.stderr)
+        return 2
+    if args.solution_cache and args.workers > 1:
+        print("--solution-cache needs -j 1", file=sys.stderr)
+        return 2
+
+    solution_cache = None
+    if args.solution_cache:
+        solution_cache = SolutionCache(args.solution_cache, args.solution_cache_file)
+    solver = BatchSolver(args.engine, args.cache, solution_cache)
+    source = sys.stdin if args.input == "-" else open(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    start = time.perf_counter()
+    try:
+        if args.workers > 1:
+            # Imported here so single process runs do not load multiprocessing
+            from ParallelSolver import solve_parallel
+
+            lines = (line for line in source if line.strip())
+            for index, solution, result, elapsed in solve_parallel(
+                    lines, args.workers, args.chunk_size, not args.unordered,
+                    args.engine, args.cache):
+                solver.counts[result] += 1
+                write_result(out, solution, result, elapsed, args.status,
+                             index if args.unordered else None)
+        else:
+            solver.solve_stream(source, out, args.status)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if solution_cache is not None and args.solution_cache_file:
+        solution_cache.save(args.solution_cache_file)
+    if args.summary:
+        print(solver.summary(time.perf_counter() - start), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from Exact_Cover import *
+from Matrix import sparse_matrix
+from PuzzleIO import parse_puzzle
+from SearchStats import SearchStats
+
+# Puzzles solved by default, next to this file
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "BenchmarkCorpus.txt")
+
+# Entries faster than this many seconds in both runs are not compared, their
+# timings are mostly noise
+MIN_TIME = 0.001
+
+
+def load_corpus(path=DEFAULT_CORPUS):
+    """Load the puzzles of a benchmark corpus, one per line as a name and a puzzle
+    separated by a tab. Empty lines and lines starting with # are skipped.
+
+    :param str path: Path of the corpus.
+    :return List[Tuple[str, int, List[List[int]]]]: Name, n and grid of every puzzle.
+    """
+    corpus = []
+    with open(path) as source:
+        for line in source:
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, puzzle = line.split("\t")
+            n, grid = parse_puzzle(puzzle)
+            corpus.append((name, n, grid))
+    return corpus
+
+
+def best_time(func, repeat):
+    """Call func repeat times with garbage collection off, like timeit does.
+
+    :param func: Function to time, called with no arguments.
+    :param int repeat: Number of calls.
+    :return float: Fastest call in seconds.
+    """
+    best = float("inf")
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(0, repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def peak_memory(func):
+    """Call func once and return the peak memory it allocated, as traced by tracemalloc.
+
+    :param func: Function to measure, called with no arguments.
+    :return int: Peak allocated memory in bytes.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(func, repeat):
+    """Time func and measure its peak memory in separate calls, since tracing
+    memory slows it down.
+
+    :param func: Function to measure, called with no arguments.
+    :param int repeat: Number of timed calls.
+    :return Dict[str, float]: Fastest time in seconds and peak memory in bytes.
+    """
+    return {"time": best_time(func, repeat), "peak_memory": peak_memory(func)}
+
+
+def dense_matrix(n):
+    """Build the dense Matrix of the Sudoku exact cover, the way the matrix was built
+    before generate_sudoku_matrix worked from sparse rows.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :return Matrix: The dense matrix.
+    """
+    rows = generate_sudoku_rows(n)
+    num_cols = 4 * n**4
+    matrix = Matrix(len(rows), num_cols)
+    for i in range(0, len(rows)):
+        for j in rows[i]:
+            matrix.set(1, i + 1, j + 1)
+    return matrix
+
+
+def sparse_sudoku_matrix(n):
+    """Build the sparse Matrix of the Sudoku exact cover from its rows.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :return Matrix: The sparse matrix.
+    """
+    rows = generate_sudoku_rows(n)
+    pairs = ((i + 1, j + 1) for i in range(0, len(rows)) for j in rows[i])
+    return sparse_matrix(len(rows), 4 * n**4, pairs)
+
+
+def bench_construction(n, engines, repeat, dense_max=3):
+    """Measure every stage of building the exact cover matrix of one grid size.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[str] engines: Engines to build, see LinkedMatrix.build_linked_matrix.
+    :param int repeat: Number of timed calls of every stage.
+    :param int dense_max: Largest n to build with the dense Matrix.convert.
+    :return Dict[str, Dict[str, float]]: Results by name.
+    """
+    results = {}
+    prefix = "build/%dx%d/" % (n**2, n**2)
+    results[prefix + "col_headers"] = measure(lambda: generate_sudoku_col_headers(n), repeat)
+    results[prefix + "row_dicts"] = measure(lambda: generate_sudoku_row_dicts(n), repeat)
+    results[prefix + "rows"] = measure(lambda: generate_sudoku_rows(n), repeat)
+    for engine in engines:
+        results[prefix + "matrix/" + engine] = measure(lambda: generate_sudoku_matrix(n, engine), repeat)
+
+    if n <= dense_max:
+        headers = generate_sudoku_col_headers(n)
+        matrix = dense_matrix(n)
+        for engine in engines:
+            results[prefix + "convert/" + engine] = measure(lambda: matrix.convert(headers, engine), repeat)
+
+    headers = generate_sudoku_col_headers(n)
+    results[prefix + "sparse"] = measure(lambda: sparse_sudoku_matrix(n), repeat)
+    matrix = sparse_sudoku_matrix(n)
+    for engine in engines:
+        results[prefix + "convert_sparse/" + engine] = measure(lambda: matrix.convert(headers, engine), repeat)
+
+    return results
+
+
+def bench_search(corpus, engines, repeat):
+    """Measure search on every puzzle of a corpus. Every engine builds one matrix
+    per grid size and covers the givens of every puzzle before timing.
+
+    :param List[Tuple[str, int, List[List[int]]]] corpus: Puzzles, see load_corpus.
+    :param List[str] engines: Engines to search with, see LinkedMatrix.build_linked_matrix.
+    :param int repeat: Number of timed searches of every puzzle.
+    :return Dict[str, Dict[str, float]]: Results by name.
+    """
+    results = {}
+    for engine in engines:
+        matrices = {}
+        for name, n, grid in corpus:
+            if n not in matrices:
+                matrices[n] = generate_sudoku_matrix(n, engine)
+            h = matrices[n]
+
+            rows = cover_givens(h, n, grid)
+            if rows is None:
+                raise Exception("Givens of %s conflict!" % name)
+            try:
+                result = measure(lambda: search(0, h, []), repeat)
+                stats = SearchStats()
+                next(search_all(h, stats), None)
+                result["nodes"] = stats.nodes
+                result["updates"] = stats.updates
+            finally:
+                uncover_givens(h, rows)
+            results["search/%s/%s" % (engine, name)] = result
+    return results
+
+
+def run(sizes=(2, 3, 4, 5), engines=("object", "array"), repeat=5, corpus_path=DEFAULT_CORPUS,
+        dense_max=3):
+    """Run the whole benchmark.
+
+    :param Iterable[int] sizes: Values of n to measure, for construction and search.
+    :param Iterable[str] engines: Engines to measure, see LinkedMatrix.build_linked_matrix.
+    :param int repeat: Number of timed calls of every entry.
+    :param str corpus_path: Path of the corpus of puzzles, see load_corpus.
+    :param int dense_max: Largest n to build with the dense Matrix.convert.
+    :return dict: Description of the machine and results by name.
+    """
+    sizes = list(sizes)
+    engines = list(engines)
+    corpus = [puzzle for puzzle in load_corpus(corpus_path) if puzzle[1] in sizes]
+
+    results = {}
+    for n in sizes:
+        results.update(bench_construction(n, engines, repeat, dense_max))
+    results.update(bench_search(corpus, engines, repeat))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=0.1):
+    """Compare the results of two runs. Entries found in both runs are compared on
+    time, peak memory and, for searches, nodes and updates, and an entry regresses
+    when any of them grows by more than threshold. Times under MIN_TIME in both runs
+    are skipped.
+
+    :param dict old: Earlier run, see run.
+    :param dict new: Later run, see run.
+    :param float threshold: Allowed growth, 0.1 for 10%.
+    :return List[Tuple[str, str, float, float, bool]]: Name, measure, old value, new
+    value and whether it regressed, for every comparison.
+    """
+    rows = []
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        for key in ("time", "peak_memory", "nodes", "updates"):
+            before = old["results"][name].get(key)
+            after = new["results"][name].get(key)
+            if before is None or after is None:
+                continue
+            if key == "time" and before < MIN_TIME and after < MIN_TIME:
+                continue
+            rows.append((name, key, before, after, after > before * (1 + threshold)))
+    return rows
+
+
+def format_comparison(rows):
+    """Format the result of compare as a table.
+
+    :param List[Tuple[str, str, float, float, bool]] rows: See compare.
+    :return str: One line per comparison, regressions marked with REGRESSION.
+    """
+    lines = []
+    for name, key, before, after, regressed in rows:
+        change = (after - before) / before * 100 if before else 0.0
+        if key == "time":
+            values = "%10.4fs %10.4fs" % (before, after)
+        elif key == "peak_memory":
+            values = "%9.1fkB %9.1fkB" % (before / 1024, after / 1024)
+        else:
+            values = "%11d %11d" % (before, after)
+        lines.append("%-40s %-11s %s %+7.1f%%%s" % (
+            name, key, values, change, "  REGRESSION" if regressed else ""))
+    return "\n".join(lines)
+
+
+def parse_args(argv):
+    """Parse the command line arguments.
+
+    :param List[str] argv: Arguments, without the program name.
+    :return argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark matrix construction and search.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark and write JSON")
+    run_parser.add_argument("-o", "--output", default="-",
+                            help="file for the results, - for stdout (default)")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[2, 3, 4, 5],
+                            help="values of n to measure (default 2 3 4 5)")
+    run_parser.add_argument("--engines", nargs="+", choices=("object", "array"),
+                            default=["object", "array"], help="engines to measure (default both)")
+    run_parser.add_argument("--repeat", type=int, default=5,
+                            help="timed calls of every entry, the fastest is kept (default 5)")
+    run_parser.add_argument("--corpus", default=DEFAULT_CORPUS,
+                            help="corpus of puzzles (default BenchmarkCorpus.txt)")
+    run_parser.add_argument("--dense-max", type=int, default=3,
+                            help="largest n to build with the dense Matrix.convert (default 3)")
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("old", help="JSON of the earlier run")
+    compare_parser.add_argument("new", help="JSON of the later run")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="allowed growth before an entry regresses (default 0.1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run or compare benchmarks, as given by the command line.
+
+    :param List[str] argv: Arguments, None for sys.argv.
+    :return int: Exit status, 1 when compare finds a regression.
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == "run":
+        report = run(args.sizes, args.engines, args.repeat, args.corpus, args.dense_max)
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if args.output == "-":
+            print(text)
+        else:
+            with open(args.output, "w") as out:
+                out.write(text + "\n")
+        return 0
+
+    with open(args.old) as source:
+        old = json.load(source)
+    with open(args.new) as source:
+        new = json.load(source)
+    rows = compare(old, new, args.threshold)
+    print(format_comparison(rows))
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
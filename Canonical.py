@@ -0,0 +1,241 @@
+from itertools import permutations, product
+from math import factorial, prod
+
+
+class Transform:
+    """A symmetry of Sudoku grids: an optional transposition, then a reordering of
+    rows and columns that keeps bands and stacks together, then a relabeling of
+    the numbers. Maps a grid to its canonical form, see canonical_form.
+
+    :param bool transpose: Whether the grid is transposed first.
+    :param List[int] rows: Row of the (transposed) grid moved to every row, from 0.
+    :param List[int] cols: Column of the (transposed) grid moved to every column, from 0.
+    :param List[int] labels: New number of every number, labels[0] is 0 for empty cells.
+    """
+
+    def __init__(self, transpose, rows, cols, labels):
+        """Initialize Transform.
+
+        :param bool transpose: Whether the grid is transposed first.
+        :param List[int] rows: Row moved to every row, from 0.
+        :param List[int] cols: Column moved to every column, from 0.
+        :param List[int] labels: New number of every number, 0 for 0.
+        """
+        self.transpose = transpose
+        self.rows = rows
+        self.cols = cols
+        self.labels = labels
+
+    def apply(self, grid):
+        """Transform a grid.
+
+        :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+        :return List[List[int]]: Rows of the transformed grid.
+        """
+        if self.transpose:
+            grid = [list(col) for col in zip(*grid)]
+        labels = self.labels
+        return [[labels[grid[i][j]] for j in self.cols] for i in self.rows]
+
+    def undo(self, grid):
+        """Transform a grid back, inverse of apply. Takes O(n**4) steps, used to map
+        the solution of a canonical grid to the solution of the original one.
+
+        :param List[List[int]] grid: Rows of the transformed grid, 0 for empty cells.
+        :return List[List[int]]: Rows of the original grid.
+        """
+        size = len(grid)
+        numbers = [0] * len(self.labels)
+        for number, label in enumerate(self.labels):
+            numbers[label] = number
+
+        original = [[0] * size for i in range(0, size)]
+        for i, row in zip(self.rows, grid):
+            for j, number in zip(self.cols, row):
+                if self.transpose:
+                    original[j][i] = numbers[number]
+                else:
+                    original[i][j] = numbers[number]
+        return original
+
+
+def has_conflict(n, grid):
+    """Returns whether a number is given twice in a row, column or box, or is out of range.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :return bool: Whether the givens conflict.
+    """
+    size = n**2
+    seen = set()
+    for i in range(0, size):
+        for j in range(0, size):
+            number = grid[i][j]
+            if not number:
+                continue
+            if not 0 < number <= size:
+                return True
+            for unit in (("r", i), ("c", j), ("b", i // n * n + j // n)):
+                if unit + (number,) in seen:
+                    return True
+                seen.add(unit + (number,))
+    return False
+
+
+def _place_row(row, classes, labels, next_label, empty):
+    """Place one row against an ordering of columns that is only partly decided.
+    Columns in the same class can still be swapped, so the smallest row puts the
+    numbers already labeled first in increasing order, then the numbers labeled
+    for the first time, then the empty cells. Columns of labeled numbers become
+    classes of their own, the empty ones stay a class.
+
+    :param List[int] row: The row, 0 for empty cells.
+    :param Tuple[Tuple[int]] classes: Classes of columns, in order.
+    :param Tuple[int] labels: Label of every number, 0 if not labeled yet.
+    :param int next_label: Next unused label.
+    :param int empty: Value of empty cells in keys, above every label.
+    :return Tuple[Tuple[int], list]: The smallest row as a key, and for every class
+    its labeled columns, new columns and empty columns.
+    """
+    key = []
+    splits = []
+    for cls in classes:
+        if len(cls) == 1:
+            number = row[cls[0]]
+            if not number:
+                key.append(empty)
+                splits.append(((), (), cls))
+            elif labels[number]:
+                key.append(labels[number])
+                splits.append((cls, (), ()))
+            else:
+                key.append(next_label)
+                next_label += 1
+                splits.append(((), cls, ()))
+            continue
+
+        labeled = []
+        new = []
+        blank = []
+        for col in cls:
+            number = row[col]
+            if not number:
+                blank.append(col)
+            elif labels[number]:
+                labeled.append((labels[number], col))
+            else:
+                new.append(col)
+        labeled.sort()
+        key.extend(label for label, col in labeled)
+        key.extend(range(next_label, next_label + len(new)))
+        next_label += len(new)
+        key.extend([empty] * len(blank))
+        splits.append((tuple(col for label, col in labeled), tuple(new), tuple(blank)))
+    return tuple(key), splits
+
+
+def _refine(row, splits, labels, next_label):
+    """Split the classes of columns after placing a row, see _place_row. The new
+    numbers of a class are labeled in the order of their columns, so every order
+    gives another candidate.
+
+    :param List[int] row: The row, 0 for empty cells.
+    :param list splits: Labeled, new and empty columns of every class.
+    :param Tuple[int] labels: Label of every number, 0 if not labeled yet.
+    :param int next_label: Next unused label.
+    :return Iterator[Tuple[Tuple[Tuple[int]], Tuple[int], int]]: Yields the classes,
+    labels and next label of every candidate.
+    """
+    orders = [permutations(new) if len(new) > 1 else (new,) for labeled, new, blank in splits]
+    for choice in product(*orders):
+        classes = []
+        new_labels = list(labels)
+        label = next_label
+        for (labeled, new, blank), order in zip(splits, choice):
+            classes.extend((col,) for col in labeled)
+            for col in order:
+                new_labels[row[col]] = label
+                label += 1
+                classes.append((col,))
+            if blank:
+                classes.append(blank)
+        yield tuple(classes), tuple(new_labels), label
+
+
+def canonical_form(n, grid, limit=1000):
+    """Find the canonical form of a grid: the smallest grid, row by row, among every
+    transposition, reordering of bands, stacks and of rows and columns inside them,
+    and relabeling of the numbers, where filled cells come before empty ones and
+    numbers are labeled from 1 in the order they first appear. Grids have the same
+    canonical form exactly when one is a symmetry of the other.
+
+    Rows are picked one at a time, keeping every candidate with the smallest rows so
+    far. Columns are only ordered as far as the rows so far tell them apart, so a
+    candidate only branches where numbers get their labels. Very symmetric grids,
+    nearly full ones and big ones can have too many candidates, and are given up.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :param int limit: Most candidates kept after any row.
+    :return Tuple[List[List[int]], Transform]: Returns the canonical grid and the
+    transform to it, None if the givens conflict or there are more than limit
+    candidates.
+    """
+    if has_conflict(n, grid):
+        return None
+    size = n**2
+    empty = size + 1
+    grids = (grid, [list(col) for col in zip(*grid)])
+
+    # Candidates are the grid, the rows picked so far, the classes of columns and
+    # the labels. Bands are picked with their first row, stacks all at once
+    no_labels = (0,) * (size + 1)
+    candidates = []
+    for t in (0, 1):
+        for stacks in permutations(range(0, n)):
+            classes = tuple(tuple(range(s * n, s * n + n)) for s in stacks)
+            candidates.append((t, (), classes, no_labels, 1))
+
+    for position in range(0, size):
+        best = None
+        placed = []
+        for candidate in candidates:
+            t, rows, classes, labels, next_label = candidate
+            if position % n == 0:
+                bands = set(r // n for r in rows)
+                allowed = [r for r in range(0, size) if r // n not in bands]
+            else:
+                band = rows[-1] // n
+                allowed = [r for r in range(band * n, band * n + n) if r not in rows]
+
+            for r in allowed:
+                key, splits = _place_row(grids[t][r], classes, labels, next_label, empty)
+                if best is None or key < best:
+                    best = key
+                    placed = []
+                if key == best:
+                    placed.append((candidate, r, splits))
+
+        branches = sum(prod(factorial(len(new)) for labeled, new, blank in splits)
+                       for candidate, r, splits in placed)
+        if branches > limit:
+            return None
+
+        # Candidates that picked the same rows in another order are the same
+        candidates = []
+        seen = set()
+        for (t, rows, classes, labels, next_label), r, splits in placed:
+            for refined in _refine(grids[t][r], splits, labels, next_label):
+                state = (t, frozenset(rows), r // n) + refined
+                if state not in seen:
+                    seen.add(state)
+                    candidates.append((t, rows + (r,)) + refined)
+
+    t, rows, classes, labels, next_label = candidates[0]
+    labels = list(labels)
+    for number in range(1, size + 1):
+        if not labels[number]:
+            labels[number] = next_label
+            next_label += 1
+    transform = Transform(bool(t), list(rows), [col for cls in classes for col in cls], labels)
+    return transform.apply(grid), transform
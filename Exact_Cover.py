@@ -1,59 +1,350 @@
-from LinkedMatrix import DataObject, ColumnObject
+import threading
+from math import isqrt
+
+from ArrayMatrix import ArrayMatrix
+from LinkedMatrix import DataObject, ColumnObject, build_linked_matrix
 from Matrix import Matrix
+from SearchStats import Cancelled
+
+# Constraint groups of the Sudoku exact cover columns, see encode_column
+ROW_CONSTRAINT = 0
+COL_CONSTRAINT = 1
+BOX_CONSTRAINT = 2
+CELL_CONSTRAINT = 3
+
+# Matrices shared by get_sudoku_matrix, by n
+_sudoku_matrices = {}
+
+# Held while a shared matrix is built or covered, so threads never interleave covers
+_sudoku_lock = threading.Lock()
+
 
 
 def search(k, h, solution):
     """Dancing links algorithm. For more detail, read the original paper.
+    Stops at the first solution found by search_all, leaving the matrix as it
+    was before the call.
 
-    :param int k: Recursion depth
-    :param ColumnObject h: Root of LinkedMatrix
+    :param int k: Recursion depth, kept for compatibility
+    :param ColumnObject h: Root of LinkedMatrix, or an ArrayMatrix
     :param List[int] solution: Solution of exact cover
     :return Boolean: Returns True if exact cover exists, False otherwise
     """
-    # Choose a column
-    c = h.choose()
-
-    # Solution found
-    # There no more columns are left to iterate over
-    if c == h:
+    for rows in search_all(h):
+        # Rows are added deepest first, as the recursive version did
+        rows.reverse()
+        solution.extend(rows)
         return True
+    return False
+
+def search_all(h, stats=None, cancel=None):
+    """Dancing links algorithm with an explicit stack instead of recursion,
+    yielding every solution. The matrix is fully uncovered once the generator
+    is exhausted or closed, or the search is cancelled.
+
+    :param ColumnObject h: Root of LinkedMatrix, or an ArrayMatrix
+    :param SearchStats stats: Statistics to update while searching, None to skip them
+    :param cancel: Called without arguments at every node, the search raises
+    SearchStats.Cancelled once it returns True. None to never cancel. Much cheaper
+    than a hook of stats, as it needs no statistics.
+    :return Iterator[List[int]]: Yields the rows of each solution
+    """
+    if isinstance(h, ArrayMatrix):
+        yield from h.search_all(stats, cancel)
+        return
+
+    solutions = _search(h, stats, cancel)
+    try:
+        for stack in solutions:
+            yield [r.row for r in stack]
+    finally:
+        solutions.close()
+
+def count_solutions(h, limit=None, stats=None, cancel=None):
+    """Count the solutions of the exact cover, without building them. Same
+    search as search_all. The matrix is left as it was before the call.
+
+    :param ColumnObject h: Root of LinkedMatrix, or an ArrayMatrix
+    :param int limit: Stop counting once limit solutions are found, None to count all
+    :param SearchStats stats: Statistics to update while searching, None to skip them
+    :param cancel: Called at every node to cancel the search, see search_all.
+    :return int: Returns the number of solutions, at most limit
+    """
+    if isinstance(h, ArrayMatrix):
+        return h.count_solutions(limit, stats, cancel)
+    if limit is not None:
+        if limit < 0:
+            raise Exception("Limit must not be negative!")
+        if limit == 0:
+            return 0
+
+    count = 0
+    solutions = _search(h, stats, cancel)
+    try:
+        for stack in solutions:
+            count += 1
+            if limit is not None and count >= limit:
+                break
+    finally:
+        solutions.close()
+    return count
+
+def _search(h, stats, cancel):
+    """The search loop shared by search_all and count_solutions, yielding the
+    chosen row nodes of every solution. Links are only counted when stats asks
+    for it, see SearchStats.
 
-    # Solution not found
-    # There is at least one column, with no more rows left
-    if c.D == c:
-        return False
+    :param ColumnObject h: Root of LinkedMatrix
+    :param SearchStats stats: Statistics to update while searching, None to skip them
+    :param cancel: Called at every node to cancel the search, see search_all.
+    :return Iterator[List[DataObject]]: Yields the stack of chosen rows at each
+    solution, only valid until the next one
+    """
+    counting = stats is not None and stats.count_updates
+
+    # Chosen row of every level, its column is covered too
+    stack = []
+    if stats is not None:
+        stats.start()
+    try:
+        while True:
+            if cancel is not None and cancel():
+                raise Cancelled()
+
+            # Choose a column
+            c = h.choose()
+            if stats is not None:
+                stats.node(len(stack), 0 if c == h else c.S)
+
+            # Solution found
+            # There no more columns are left to iterate over
+            if c == h:
+                if stats is not None:
+                    stats.solution([r.row for r in stack])
+                yield stack
+
+            # Cover column c and its first row, then go one level deeper
+            # unless there is at least one column with no more rows left
+            elif c.D != c:
+                r = c.D
+                if counting:
+                    stats.updates += c.count_updates()
+                    c.cover()
+                    stats.updates += r.cover_row_counted()
+                else:
+                    c.cover()
+                    r.cover_row()
+                stack.append(r)
+                continue
+
+            # Backtrack to the deepest level with another row to try
+            while stack:
+                r = stack.pop()
+                r.uncover_row()
+                if stats is not None:
+                    stats.backtrack(len(stack))
+                c = r.C
+                r = r.D
+                if r != c:
+                    if counting:
+                        stats.updates += r.cover_row_counted()
+                    else:
+                        r.cover_row()
+                    stack.append(r)
+                    break
+                c.uncover()
+            else:
+                return
+    finally:
+        # Undo the remaining levels if the generator is closed early
+        while stack:
+            r = stack.pop()
+            r.uncover_row()
+            r.C.uncover()
+        if stats is not None:
+            stats.stop()
+
+def exact_cover_matrix(rows, primary, secondary=(), engine="object"):
+    """Build the linked matrix of a general exact cover problem, given sparsely.
+    Every primary column must be covered exactly once and every secondary column
+    at most once, so problems like N queens need no slack rows.
+
+    :param List[List] rows: Ids of the columns of every row, any hashable values.
+    :param List primary: Ids of the primary columns.
+    :param List secondary: Ids of the secondary columns.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :return RootObject: The linked matrix, row number k + 1 is rows[k].
+    """
+    ids = list(primary) + list(secondary)
+    index = {}
+    for i in range(0, len(ids)):
+        if ids[i] in index:
+            raise Exception("Duplicate column!")
+        index[ids[i]] = i
+
+    sparse = []
+    for row in rows:
+        try:
+            cols = sorted(set(index[col] for col in row))
+        except KeyError:
+            raise Exception("Unknown column!")
+        if len(cols) != len(row):
+            raise Exception("Duplicate column in row!")
+        sparse.append(cols)
+
+    return build_linked_matrix([str(col) for col in ids], sparse, engine, secondary=len(ids) - len(primary))
+
+
+def exact_covers(rows, primary, secondary=(), engine="object"):
+    """Find every solution of a general exact cover problem.
+
+    :param List[List] rows: Ids of the columns of every row, any hashable values.
+    :param List primary: Ids of the primary columns.
+    :param List secondary: Ids of the secondary columns.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :return Iterator[List[int]]: Yields the indices in rows (starting at 0) of the
+    rows of every solution, in increasing order.
+    """
+    h = exact_cover_matrix(rows, primary, secondary, engine)
+    for solution in search_all(h):
+        yield sorted(row - 1 for row in solution)
 
-    # Cover column c
-    c.cover()
 
-    # Set row to iterate over
-    r = c.D
+def count_exact_covers(rows, primary, secondary=(), limit=None, engine="object"):
+    """Count the solutions of a general exact cover problem.
 
-    # While selected row is not the column headers
-    while r != c:
+    :param List[List] rows: Ids of the columns of every row, any hashable values.
+    :param List primary: Ids of the primary columns.
+    :param List secondary: Ids of the secondary columns.
+    :param int limit: Stop counting once limit solutions are found, None to count all
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :return int: Returns the number of solutions, at most limit
+    """
+    return count_solutions(exact_cover_matrix(rows, primary, secondary, engine), limit)
 
-        # Cover all columns that intersect current row
-        r.cover_row()
 
-        # If solution exists, add it
-        if search(k + 1, h, solution):
-            solution.append(r.row)
-            return True
+def generate_queens_problem(n):
+    """Generate the exact cover problem of placing n queens on an n by n board, with
+    ranks and files as primary columns and diagonals as secondary columns.
 
-        # Uncover all columns that intersect current row
-        r.uncover_row()
+    :param int n: Size of the board.
+    :return Tuple[List[List[str]], List[str], List[str]]: Rows, one per square
+    (rank, then file), primary columns and secondary columns.
+    """
+    if n < 1:
+        raise Exception("Invalid board size!")
 
-        # Move to next row
-        r = r.D
+    primary = ["R" + str(i) for i in range(0, n)] + ["F" + str(j) for j in range(0, n)]
+    secondary = ["A" + str(d) for d in range(0, 2 * n - 1)] + ["B" + str(d) for d in range(0, 2 * n - 1)]
+    rows = []
+    for i in range(0, n):
+        for j in range(0, n):
+            rows.append(["R" + str(i), "F" + str(j), "A" + str(i + j), "B" + str(i - j + n - 1)])
+    return rows, primary, secondary
 
-    # Uncover column c
-    c.uncover()
 
-    return False
+def given_rows(n, grid):
+    """Return the rows of the exact cover matrix of the givens of a Sudoku grid.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :return List[int]: Returns the rows of the givens, left to right from top row down.
+    """
+    size = n**2
+    if len(grid) != size:
+        raise Exception("Number of rows do not match!")
+
+    rows = []
+    for i in range(1, size + 1):
+        if len(grid[i - 1]) != size:
+            raise Exception("Number of columns do not match!")
+
+        for j in range(1, size + 1):
+            number = grid[i - 1][j - 1]
+            if number != 0:
+                if not 0 < number <= size:
+                    raise Exception("Invalid number!")
+                rows.append(encode_candidate(n, number, i, j))
+
+    return rows
+
+def select_rows(h, rows):
+    """Select rows in order. If one of them cannot be selected, nothing is left covered.
+
+    :param ColumnObject h: Root of LinkedMatrix, or an ArrayMatrix
+    :param List[int] rows: Rows to select, starting at 1.
+    :return bool: Whether every row could be selected.
+    """
+    for i in range(0, len(rows)):
+        if not h.select_row(rows[i]):
+            uncover_givens(h, rows[:i])
+            return False
+    return True
+
+def cover_givens(h, n, grid):
+    """Select the rows of the givens of a Sudoku grid in its exact cover matrix.
+    If two givens conflict, nothing is left covered.
+
+    :param ColumnObject h: Root of LinkedMatrix from generate_sudoku_matrix(n), or an ArrayMatrix
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :return List[int]: Returns the selected rows in order, None if the givens conflict
+    """
+    rows = given_rows(n, grid)
+    if not select_rows(h, rows):
+        return None
+    return rows
+
+def uncover_givens(h, rows):
+    """Undo cover_givens or select_rows, unselecting rows in reverse order.
+
+    :param ColumnObject h: Root of LinkedMatrix, or an ArrayMatrix
+    :param List[int] rows: Rows returned by cover_givens
+    :return: None
+    """
+    for row_number in reversed(rows):
+        h.unselect_row(row_number)
+
+def is_unique(puzzle):
+    """Returns whether a Sudoku puzzle has exactly one solution. Counting stops
+    at the second solution. Searches the shared matrix of get_sudoku_matrix, so
+    calls from several threads wait for each other; threads that check many
+    puzzles at once are better off with a SudokuSession each.
+
+    :param List[List[int]] puzzle: Rows of the grid, 0 for empty cells.
+    :return bool: Whether puzzle has a unique solution
+    """
+    n = isqrt(len(puzzle))
+    if n**2 != len(puzzle):
+        raise Exception("Invalid grid size!")
+
+    with _sudoku_lock:
+        h = get_sudoku_matrix(n)
+        rows = cover_givens(h, n, puzzle)
+        if rows is None:
+            return False
+
+        try:
+            return count_solutions(h, 2) == 1
+        finally:
+            uncover_givens(h, rows)
+
+def get_sudoku_matrix(n):
+    """Return a shared exact cover matrix of Sudoku puzzle with size n**2, built on
+    first use. Callers must hold _sudoku_lock while they get and use it, and leave
+    it as they found it.
+
+    :param int n: n**2 is size of corresponding Sudoku puzzle grid.
+    :return RootObject: The exact cover LinkedMatrix.
+    """
+    if n not in _sudoku_matrices:
+        _sudoku_matrices[n] = generate_sudoku_matrix(n)
+    return _sudoku_matrices[n]
 
 def generate_sudoku_col_headers(n):
     """Generate the column headers for a Sudoku puzzle grid of size n**2.
-    These headers are to be used in LinkedMatrix.
+    These headers are to be used in LinkedMatrix. They are only names for
+    debugging, columns are located with encode_column.
 
     :param int n: n**2 is the size of Sudoku puzzle grid.
     :return List[str]: Returns list of strings of column headers.
@@ -102,57 +393,49 @@ def generate_sudoku_col_headers(n):
 
     return col_headers
 
-def generate_sudoku_matrix(n):
+def generate_sudoku_matrix(n, engine="object", buckets=False):
     """Generate exact cover matrix of Sudoku puzzle with size n**2.
+    The linked matrix is built directly from the four constraint columns of
+    every candidate, so no dense matrix is ever created.
 
     :param int n: n**2 is size of corresponding Sudoku puzzle grid.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :param bool buckets: Whether to keep columns in size buckets, see LinkedMatrix.build_linked_matrix.
     :return RootObject: The exact cover LinkedMatrix.
     """
     if n < 1:
         raise Exception("Invalid grid size!")
 
-    sudoku_rows = []
-    col_headers = generate_sudoku_col_headers(n)
-    dicts = generate_sudoku_row_dicts(n)
-    row_number_to_position = dicts[0]
-    position_to_row_number = dicts[1]
-
-    # Total possible placements of numbers
-    num_rows = n**6
+    return build_linked_matrix(generate_sudoku_col_headers(n), generate_sudoku_rows(n), engine, buckets)
 
-    # Total number of columns headers
-    num_cols = (n ** 4) * 4
 
-    # Construct matrix row by row
-    for i in range(1, num_rows + 1):
-        matrix_row = [0] * len(col_headers)
-        position = row_number_to_position[i]
-        number = position[0:2]
+def generate_sudoku_rows(n):
+    """Generate the rows of the exact cover matrix of Sudoku puzzle with size n**2,
+    as the indices of their four columns.
 
-        row = position[2:4]
-        matrix_row[col_headers.index(number + row)] = 1
-
-        col = position[4:6]
-        matrix_row[col_headers.index(number + col)] = 1
-
-        box_num = convert_row_col_to_box(n, int(row[1]), int(col[1]))
-        box = "B"+str(box_num)
-        matrix_row[col_headers.index(number + box)] = 1
+    :param int n: n**2 is size of corresponding Sudoku puzzle grid.
+    :return List[List[int]]: Columns of every row, in order of row number.
+    """
+    if n < 1:
+        raise Exception("Invalid grid size!")
 
-        row_col = row + col
-        matrix_row[col_headers.index(row_col)] = 1
+    size = n**2
 
-        sudoku_rows.append(matrix_row)
+    # Row numbers follow encode_candidate: number, then row, then column
+    sudoku_rows = []
+    for i in range(1, size + 1):
+        for j in range(1, size + 1):
+            for k in range(1, size + 1):
+                sudoku_rows.append(candidate_columns(n, i, j, k))
 
-    sudoku_matrix = Matrix(num_rows, num_cols)
-    sudoku_matrix.set_matrix(sudoku_rows)
-    return sudoku_matrix.convert(col_headers)
+    return sudoku_rows
 
 
 def generate_sudoku_row_dicts(n):
     """Generate a dictionary that converts row numbers in exact cover matrix
     that corresponds to a string denoting row, column and number inside
     each square of corresponding Sudoku puzzle grid of size n**2.
+    Only kept for debugging, use encode_candidate and decode_candidate instead.
 
     :param int n: n**2 is size of Sudoku puzzle grid.
     :return Dict[int, str]: Dictionary that is returned.
@@ -181,6 +464,98 @@ def generate_sudoku_row_dicts(n):
     return row_number_to_position, position_to_row_number
 
 
+def encode_candidate(n, number, row, col):
+    """Given size of Sudoku grid, return the row number in the exact cover matrix
+    of placing number at row row and column col.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param int number: Number placed, from 1 to n**2.
+    :param int row: Row of cell, from 1 to n**2.
+    :param int col: Column of cell, from 1 to n**2.
+    :return int: Returns row number, starting at 1.
+    """
+    size = n * n
+    return ((number - 1) * size + row - 1) * size + col
+
+
+def decode_candidate(n, row_number):
+    """Inverse of encode_candidate.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param int row_number: Row number in exact cover matrix, starting at 1.
+    :return Tuple[int, int, int]: Returns number, row and column of the placement.
+    """
+    size = n * n
+    rest, col = divmod(row_number - 1, size)
+    number, row = divmod(rest, size)
+    return number + 1, row + 1, col + 1
+
+
+def encode_column(n, constraint, i, j):
+    """Given size of Sudoku grid, return the index (starting at 0) of a column in
+    the exact cover matrix. Columns are grouped by constraint, in the same order as
+    generate_sudoku_col_headers:
+    ROW_CONSTRAINT (number i in row j), COL_CONSTRAINT (number i in column j),
+    BOX_CONSTRAINT (number i in box j) and CELL_CONSTRAINT (row i, column j).
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param int constraint: One of the constraint constants.
+    :param int i: First part of the column, from 1 to n**2.
+    :param int j: Second part of the column, from 1 to n**2.
+    :return int: Returns column index.
+    """
+    size = n * n
+    return constraint * size * size + (i - 1) * size + j - 1
+
+
+def decode_column(n, index):
+    """Inverse of encode_column.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param int index: Column index, starting at 0.
+    :return Tuple[int, int, int]: Returns constraint, i and j of the column.
+    """
+    size = n * n
+    constraint, rest = divmod(index, size * size)
+    i, j = divmod(rest, size)
+    return constraint, i + 1, j + 1
+
+
+def candidate_columns(n, number, row, col):
+    """Return the indices of the four columns covered by placing number at row row
+    and column col, in increasing order.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param int number: Number placed, from 1 to n**2.
+    :param int row: Row of cell, from 1 to n**2.
+    :param int col: Column of cell, from 1 to n**2.
+    :return List[int]: Returns column indices.
+    """
+    size = n * n
+    block = size * size
+    number_offset = (number - 1) * size - 1
+    box = convert_row_col_to_box(n, row, col)
+    return [number_offset + row,
+            block + number_offset + col,
+            2 * block + number_offset + box,
+            3 * block + (row - 1) * size + col - 1]
+
+
+def rows_to_grid(n, rows):
+    """Convert rows of the exact cover matrix to a Sudoku grid.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[int] rows: Rows of the matrix, starting at 1.
+    :return List[List[int]]: Rows of the grid, 0 for empty cells.
+    """
+    size = n**2
+    grid = [[0] * size for i in range(0, size)]
+    for row_number in rows:
+        number, row, col = decode_candidate(n, row_number)
+        grid[row - 1][col - 1] = number
+    return grid
+
+
 def invert(dictionary):
     """Inverts dict dictionary.
 
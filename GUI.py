@@ -1,207 +1,285 @@
-import pygame, sys
+import pygame, sys, time
 from pygame.locals import *
 from Exact_Cover import *
+from LiveGrid import LiveChecker, LiveGrid
+from PuzzleIO import BLANKS, SYMBOLS
+
+# Posted by the checker thread with the status of the grid
+STATUS_EVENT = pygame.USEREVENT + 1
+
+# Posted by the checker thread with the solved grid
+SOLVED_EVENT = pygame.USEREVENT + 2
+
+# Posted by a timer while solving, to show progress
+PROGRESS_EVENT = pygame.USEREVENT + 3
+
+# Milliseconds between progress updates
+PROGRESS_INTERVAL = 100
 
 class SudokuSolver():
-    def __init__(self):
-        """Initialize variables.
+    def __init__(self, n=3):
+        """Initialize variables. The layout is computed from the size of the grid,
+        with cells of 50 pixels for 9 by 9 and smaller ones for bigger grids.
 
+        :param int n: n**2 is size of Sudoku grid.
         """
         pygame.init()
         pygame.font.init()
-        self.row_number_to_position = generate_sudoku_row_dicts(3)[0]
-        self.position_to_row_number = generate_sudoku_row_dicts(3)[1]
-        self.col_headers = generate_sudoku_col_headers(3)
-        self.cover_matrix = generate_sudoku_matrix(3)
-
-        self.game_matrix = Matrix(9, 9)
-        for i in range(1, 10):
-            for j in range(1, 10):
-                self.game_matrix.set([0, (25+50*j, 25+50*i)], i, j)
-
-        self.height = 600
-        self.width = 550
+        self.n = n
+        self.grid_size = n**2
+
+        self.margin = 50
+        self.cell = max(24, 450 // self.grid_size)
+        board = self.cell * self.grid_size
+        self.board_rect = Rect(self.margin, self.margin, board, board)
+
+        self.game_matrix = Matrix(self.grid_size, self.grid_size)
+        for i in range(1, self.grid_size + 1):
+            for j in range(1, self.grid_size + 1):
+                self.game_matrix.set([0, self.cell_rect(i, j)], i, j)
+
+        self.height = self.margin + board + 100
+        self.width = board + 2 * self.margin
         self.size = self.width, self.height
         self.white = 255, 255, 255
         self.black = 0, 0, 0
         self.gray = 150, 150, 150
         self.blue = 100, 100, 255
-        self.surface = pygame.Surface(self.size)
         self.screen = pygame.display.set_mode(self.size)
         self.selection = None
-        self.selection_rect = None
         self.text_font = pygame.font.SysFont("ComicSans MS", 30)
-        self.solve_button = None
+        self.solve_button = Rect(self.width // 2 - 75, self.margin + board, 150, 100)
         self.attempted = False
+        self.solving = False
+        self.solve_start = None
 
-    def main(self):
-        """Main method to keep program running.
-
-        """
-        self.screen.fill(self.white)
+        # Every number is rendered once, cells only blit them
+        digit_font = pygame.font.SysFont("ComicSans MS", max(12, self.cell * 3 // 5))
+        self.glyphs = {}
+        for number in range(1, self.grid_size + 1):
+            self.glyphs[number] = digit_font.render(SYMBOLS[number - 1], True, self.black)
 
-        self.solve_button = Rect(200, 500, 150, 100)
-        pygame.draw.rect(self.screen, self.blue, self.solve_button)
-        text_surface = self.text_font.render("SOLVE", True, self.black)
-        self.screen.blit(text_surface, (250, 550))
+        # Parts of the screen drawn since the last update
+        self.dirty = []
 
-        for i in range(50, 650, 50):
-            pygame.draw.line(self.screen, self.black, (i, 50), (i, 500), 1)
-        for j in range(50, 550, 50):
-            pygame.draw.line(self.screen, self.black, (50, j), (500, j), 1)
+        # Solvability of the grid is checked in the background after every edit
+        self.status = None
+        self.version = 0
+        self.checker = LiveChecker(LiveGrid(self.n), self.post_status, self.post_solved)
+        self.checker.start()
 
-        for i in range(50, 650, 150):
-            pygame.draw.line(self.screen, self.black, (i, 50), (i, 500), 2)
-        for j in range(50, 550, 150):
-            pygame.draw.line(self.screen, self.black, (50, j), (500, j), 2)
+    def main(self):
+        """Main method to keep program running. Sleeps until the next event, and
+        only updates the parts of the screen that were drawn.
 
-        pygame.display.flip()
+        """
+        self.draw_board()
         while True:
-            for event in pygame.event.get():
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.checker.stop()
                     sys.exit()
-                if not self.attempted:
+                if event.type == STATUS_EVENT:
+                    # Results of older grids are stale
+                    if event.version == self.version and not self.attempted:
+                        self.status = event.status
+                        if not self.solving:
+                            self.draw_status()
+                elif event.type == SOLVED_EVENT:
+                    if self.solving:
+                        self.show_solution(event.grid)
+                elif event.type == PROGRESS_EVENT:
+                    if self.solving:
+                        self.draw_status()
+                elif self.solving:
+                    if event.type == pygame.MOUSEBUTTONDOWN and self.solve_button.collidepoint(event.pos):
+                        self.cancel()
+                elif not self.attempted:
                     if event.type == pygame.MOUSEBUTTONDOWN:
                         self.event_mouse(event)
                     elif event.type == pygame.KEYDOWN:
                         self.event_key(event)
-                    if not self.attempted:
-                        self.draw_digits()
+
+            if self.dirty:
+                pygame.display.update(self.dirty)
+                self.dirty = []
+
+    def cell_rect(self, row, col):
+        """Return the square of a cell on the screen.
+
+        :param int row: Row of the cell, from 1 to n**2.
+        :param int col: Column of the cell, from 1 to n**2.
+        :return Rect: The square, grid lines included.
+        """
+        return Rect(self.margin + (col - 1) * self.cell, self.margin + (row - 1) * self.cell,
+                    self.cell, self.cell)
 
     def event_mouse(self, event):
         """Determine what happens if mouse keys are pressed. Used to select squares and solve.
 
         """
         if event.type == pygame.MOUSEBUTTONDOWN:
-            row_num = None
-            col_num = None
-            # curr_square = Rect()
-            curr_x = event.pos[0]
-            curr_y = event.pos[1]
-
-            if 200 < curr_x < 350 and 500 < curr_y < 600:
+            if self.solve_button.collidepoint(event.pos):
                 self.solve()
 
+            elif self.board_rect.collidepoint(event.pos):
+                row_num = (event.pos[1] - self.margin) // self.cell + 1
+                col_num = (event.pos[0] - self.margin) // self.cell + 1
+
+                previous = self.selection
+                if self.selection == (row_num, col_num):
+                    self.selection = None
+                else:
+                    self.selection = (row_num, col_num)
+                if previous:
+                    self.draw_cell(*previous)
+                self.draw_cell(row_num, col_num)
+
+    def event_key(self, event):
+        """Determine what happens when keyboard keys are pressed. Used to enter numbers
+        into grid, written as in PuzzleIO, and to clear squares.
+
+        """
+        if event.type == pygame.KEYDOWN and self.selection:
+            if event.key in (pygame.K_BACKSPACE, pygame.K_DELETE) or (event.unicode and event.unicode in BLANKS):
+                number = 0
+            elif event.unicode and 0 < SYMBOLS.find(event.unicode.upper()) + 1 <= self.grid_size:
+                number = SYMBOLS.find(event.unicode.upper()) + 1
             else:
-                if 50 < curr_x < 100:
-                    col_num = 1
-                elif 100 < curr_x < 150:
-                    col_num = 2
-                elif 150 < curr_x < 200:
-                    col_num = 3
-                elif 200 < curr_x < 250:
-                    col_num = 4
-                elif 250 < curr_x < 300:
-                    col_num = 5
-                elif 300 < curr_x < 350:
-                    col_num = 6
-                elif 350 < curr_x < 400:
-                    col_num = 7
-                elif 400 < curr_x < 450:
-                    col_num = 8
-                elif 450 < curr_x < 500:
-                    col_num = 9
-
-                if 50 < curr_y < 100:
-                    row_num = 1
-                elif 100 < curr_y < 150:
-                    row_num = 2
-                elif 150 < curr_y < 200:
-                    row_num = 3
-                elif 200 < curr_y < 250:
-                    row_num = 4
-                elif 250 < curr_y < 300:
-                    row_num = 5
-                elif 300 < curr_y < 350:
-                    row_num = 6
-                elif 350 < curr_y < 400:
-                    row_num = 7
-                elif 400 < curr_y < 450:
-                    row_num = 8
-                elif 450 < curr_y < 500:
-                    row_num = 9
-
-                nearest_x = curr_x - (curr_x % 50) + 2
-                nearest_y = curr_y - (curr_y % 50) + 2
-                fill_in_square = Rect(nearest_x, nearest_y, 48, 48)
-                if 50 < curr_x < 500 and 50 < curr_y < 500:
-                    if self.selection == (row_num, col_num):
-                        self.selection = None
-                        self.selection_rect = None
-                    else:
-                        self.selection = (row_num, col_num)
-                        self.selection_rect = fill_in_square
+                return
 
+            entry = self.game_matrix.get(self.selection[0], self.selection[1])
+            if entry[0] != number:
+                entry[0] = number
+                self.draw_cell(*self.selection)
+                self.version = self.checker.edit(self.selection[0], self.selection[1], number)
+                self.status = None
+                self.draw_status()
 
+    def post_status(self, status, version):
+        """Called from the checker thread with the status of a grid, which is handed
+        to the event loop.
 
-    def event_key(self, event):
-        """Determine what happens when keyboard keys are pressed. Used to enter digits into grid.
+        """
+        pygame.event.post(pygame.event.Event(STATUS_EVENT, status=status, version=version))
+
+    def post_solved(self, grid):
+        """Called from the checker thread with the solved grid, which is handed to the
+        event loop.
 
         """
-        if event.type == pygame.KEYDOWN:
-            if event.unicode.isdigit:
-                if self.selection:
-                    self.game_matrix.get(self.selection[0], self.selection[1])[0] = int(event.unicode)
+        pygame.event.post(pygame.event.Event(SOLVED_EVENT, grid=grid))
 
     def solve(self):
-        """Solve the current Sudoku puzzle.
+        """Start solving the current Sudoku puzzle in the checker thread, which already
+        has every entry covered. The window keeps running and shows the progress,
+        and the solve button turns into a cancel button.
 
         """
-        solutions = []
-        for i in range(1, 10):
-            for j in range(1, 10):
-                entry = self.game_matrix.get(i, j)
-                if entry[0] != 0:
-                    pos = ""
-                    pos += "#" + str(entry[0])
-                    pos += "R" + str(i)
-                    pos += "C" + str(j)
-                    row_num = self.position_to_row_number[pos]
-                    solutions.append(row_num)
-                    self.cover_matrix.row_headers[row_num].C.cover()
-                    self.cover_matrix.row_headers[row_num].cover_row()
-
-        found = search(0, self.cover_matrix, solutions)
-        self.attempted = True
+        self.solving = True
+        self.solve_start = time.perf_counter()
+        self.checker.solve()
+        pygame.time.set_timer(PROGRESS_EVENT, PROGRESS_INTERVAL)
+        self.draw_button()
+        self.draw_status()
+
+    def cancel(self):
+        """Cancel solving and go back to editing the puzzle.
+
+        """
+        self.checker.cancel()
+        self.solving = False
+        pygame.time.set_timer(PROGRESS_EVENT, 0)
+        self.draw_button()
+        self.draw_status()
+
+    def show_solution(self, solved):
+        """Show the result of solving.
 
-        if found:
-            for sol in solutions:
-                sol_pos = self.row_number_to_position[sol]
-                sol_num = int(sol_pos[1])
-                row_num = int(sol_pos[3])
-                col_num = int(sol_pos[5])
-                self.game_matrix.get(row_num, col_num)[0] = sol_num
+        :param List[List[int]] solved: The solved grid, None if there is no solution.
+        """
+        self.solving = False
+        self.attempted = True
+        pygame.time.set_timer(PROGRESS_EVENT, 0)
+        self.checker.stop()
 
+        if solved:
             self.selection = None
-            self.selection_rect = None
-            self.draw_digits()
+            for i in range(1, self.grid_size + 1):
+                for j in range(1, self.grid_size + 1):
+                    self.game_matrix.get(i, j)[0] = solved[i - 1][j - 1]
+                    self.draw_cell(i, j)
 
         else:
             self.screen.fill(self.white)
             text_surface = self.text_font.render("NO SOLUTIONS FOUND", True, self.black)
-            self.screen.blit(text_surface, (150, 300))
-            pygame.display.flip()
+            self.screen.blit(text_surface, text_surface.get_rect(center=self.screen.get_rect().center))
+            self.dirty.append(self.screen.get_rect())
+
+    def draw_board(self):
+        """Draw the whole window: grid lines, every square, the status and the solve button.
+
+        """
+        self.screen.fill(self.white)
+        self.draw_button()
+
+        # Thin lines between squares, thick lines between boxes
+        for k in range(0, self.grid_size + 1):
+            width = 2 if k % self.n == 0 else 1
+            offset = self.margin + k * self.cell
+            pygame.draw.line(self.screen, self.black, (offset, self.board_rect.top),
+                             (offset, self.board_rect.bottom), width)
+            pygame.draw.line(self.screen, self.black, (self.board_rect.left, offset),
+                             (self.board_rect.right, offset), width)
+
+        for i in range(1, self.grid_size + 1):
+            for j in range(1, self.grid_size + 1):
+                self.draw_cell(i, j)
+        self.draw_status()
+        self.dirty = [self.screen.get_rect()]
+
+    def draw_button(self):
+        """Draw the solve button, which cancels while solving.
+
+        """
+        pygame.draw.rect(self.screen, self.blue, self.solve_button)
+        text_surface = self.text_font.render("CANCEL" if self.solving else "SOLVE", True, self.black)
+        self.screen.blit(text_surface, text_surface.get_rect(center=self.solve_button.center))
+        self.dirty.append(self.solve_button)
+
+    def draw_cell(self, row, col):
+        """Draw one square, with its number and the selection.
 
-    def draw_digits(self):
-        """Used to show the digits in the grid.
+        :param int row: Row of the cell, from 1 to n**2.
+        :param int col: Column of the cell, from 1 to n**2.
+        """
+        entry = self.game_matrix.get(row, col)
+        inner = entry[1].inflate(-4, -4)
+        pygame.draw.rect(self.screen, self.gray if self.selection == (row, col) else self.white, inner)
+        if entry[0] != 0:
+            glyph = self.glyphs[entry[0]]
+            self.screen.blit(glyph, glyph.get_rect(center=inner.center))
+        self.dirty.append(inner)
+
+    def draw_status(self):
+        """Show whether the grid has no solution, a unique one or several, above the grid.
+        While solving, show the nodes searched so far and the time spent instead.
 
         """
-        for i in range(1, 10):
-            for j in range(1, 10):
-                entry = self.game_matrix.get(i, j)
-                curr_rect = Rect(entry[1][0] - 23, entry[1][1] - 23, 48, 48)
-                pygame.draw.rect(self.screen, self.white, curr_rect)
-                if self.selection_rect:
-                    pygame.draw.rect(self.screen, self.gray, self.selection_rect)
-
-        for i in range(1, 10):
-            for j in range(1, 10):
-                entry = self.game_matrix.get(i, j)
-                if entry[0] != 0:
-                    text_surface = self.text_font.render(str(entry[0]), True, self.black)
-                    self.screen.blit(text_surface, entry[1])
-        pygame.display.flip()
+        area = Rect(0, 0, self.width, self.margin - 2)
+        pygame.draw.rect(self.screen, self.white, area)
+        if self.solving:
+            progress = self.checker.progress
+            nodes = 0 if progress is None else progress.nodes
+            text = "Solving... %d nodes, %.1fs" % (nodes, time.perf_counter() - self.solve_start)
+        elif self.status is None:
+            text = "Checking..."
+        else:
+            text = self.status.capitalize()
+        text_surface = self.text_font.render(text, True, self.black)
+        self.screen.blit(text_surface, (self.margin, 5))
+        self.dirty.append(area)
 
 if __name__ == "__main__":
-    App = SudokuSolver()
-    App.main()
\ No newline at end of file
+    App = SudokuSolver(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
+    App.main()
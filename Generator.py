@@ -0,0 +1,287 @@
+import argparse
+import sys
+from multiprocessing import Pool
+from random import Random
+
+from Exact_Cover import *
+from PuzzleIO import format_grid
+
+# Symmetries of the clues, each mapping a cell (from 0) to the cell it pairs with
+SYMMETRIES = {
+    "none": lambda size, i, j: (i, j),
+    "rotational": lambda size, i, j: (size - 1 - i, size - 1 - j),
+    "horizontal": lambda size, i, j: (i, size - 1 - j),
+    "vertical": lambda size, i, j: (size - 1 - i, j),
+    "diagonal": lambda size, i, j: (j, i),
+}
+
+# PuzzleGenerator of this worker process, built once by _init_worker
+_generator = None
+
+
+class PuzzleGenerator:
+    """Generates Sudoku puzzles with exactly one solution against a single exact
+    cover matrix, which is covered and uncovered again for every grid and every
+    uniqueness check instead of being rebuilt.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param RootObject matrix: The exact cover matrix, or an ArrayMatrix.
+    :param Random random: Source of every random choice.
+    """
+
+    def __init__(self, n=3, seed=None, engine="object"):
+        """Initialize PuzzleGenerator, building its exact cover matrix.
+
+        :param int n: n**2 is size of Sudoku grid.
+        :param int seed: Seed of the random choices, None for a random one.
+        :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+        """
+        self.n = n
+        self.matrix = generate_sudoku_matrix(n, engine)
+        self.random = Random(seed)
+
+    def full_grid(self):
+        """Generate a random solved grid. The boxes on the diagonal never share a row
+        or a column, so they are filled with random permutations first and the
+        search completes the grid, breaking ties between columns at random. The
+        numbers are then relabeled at random, which keeps the grid valid.
+
+        :return List[List[int]]: Rows of the solved grid.
+        """
+        n = self.n
+        size = n**2
+        while True:
+            rows = []
+            for b in range(0, n):
+                numbers = list(range(1, size + 1))
+                self.random.shuffle(numbers)
+                for k in range(0, size):
+                    rows.append(encode_candidate(n, numbers[k], b * n + k // n + 1, b * n + k % n + 1))
+
+            select_rows(self.matrix, rows)
+            self.matrix.set_heuristic("random", self.random.random())
+            solutions = search_all(self.matrix)
+            try:
+                solution = next(solutions, None)
+            finally:
+                solutions.close()
+                self.matrix.set_heuristic("min")
+                uncover_givens(self.matrix, rows)
+
+            # The diagonal boxes can only fail to complete on bigger grids
+            if solution is not None:
+                break
+
+        labels = list(range(1, size + 1))
+        self.random.shuffle(labels)
+        grid = rows_to_grid(n, rows + solution)
+        return [[labels[number - 1] for number in row] for row in grid]
+
+    def remove_clues(self, solution, clues=None, symmetry="none"):
+        """Remove clues from a solved grid in random order, keeping only the ones whose
+        removal would allow a second solution. Clues paired by symmetry are removed
+        together. Every clue still on the grid stays covered, and removing one costs
+        a search that stops at the first other solution, see _other_solution.
+
+        :param List[List[int]] solution: Rows of the solved grid.
+        :param int clues: Stop once at most this many clues are left, None to remove
+        as many as possible.
+        :param str symmetry: Name of the symmetry of the clues, a key of SYMMETRIES.
+        :return List[List[int]]: Rows of the puzzle, 0 for empty cells.
+        """
+        if symmetry not in SYMMETRIES:
+            raise Exception("Unknown symmetry!")
+        n = self.n
+        size = n**2
+        pair = SYMMETRIES[symmetry]
+
+        # Groups of cells removed together, in the order they are tried
+        groups = []
+        seen = set()
+        for i in range(0, size):
+            for j in range(0, size):
+                if (i, j) not in seen:
+                    group = {(i, j), pair(size, i, j)}
+                    seen |= group
+                    groups.append(sorted(group))
+        self.random.shuffle(groups)
+
+        def group_rows(group):
+            return [encode_candidate(n, solution[i][j], i + 1, j + 1) for i, j in group]
+
+        # Groups not tried yet are covered in reverse, so the next one to try is on
+        # top of them, and the clues that had to stay are covered above all of them
+        untried = []
+        for group in reversed(groups):
+            untried.append(group_rows(group))
+            select_rows(self.matrix, untried[-1])
+        kept = []
+        count = size * size
+
+        try:
+            while untried and (clues is None or count > clues):
+                rows = untried.pop()
+                uncover_givens(self.matrix, kept)
+                uncover_givens(self.matrix, rows)
+                select_rows(self.matrix, kept)
+
+                if not self._other_solution(rows):
+                    count -= len(rows)
+                else:
+                    select_rows(self.matrix, rows)
+                    kept += rows
+        finally:
+            left = kept + [row_number for rows in untried for row_number in rows]
+            uncover_givens(self.matrix, kept)
+            for rows in reversed(untried):
+                uncover_givens(self.matrix, rows)
+
+        puzzle = [[0] * size for i in range(0, size)]
+        for row_number in left:
+            number, row, col = decode_candidate(n, row_number)
+            puzzle[row - 1][col - 1] = number
+        return puzzle
+
+    def _other_solution(self, rows):
+        """Search for a solution other than the known one, once the clues of rows are
+        uncovered. It has to differ on one of their cells, so every other number is
+        placed in the first cell in turn, then the first clue is kept and the next cell
+        is tried, and so on. The first solution found ends the search.
+
+        :param List[int] rows: Rows of the removed clues, starting at 1.
+        :return bool: Whether another solution exists.
+        """
+        n = self.n
+        placed = []
+        try:
+            for row_number in rows:
+                number, row, col = decode_candidate(n, row_number)
+                for other in range(1, n**2 + 1):
+                    other_row = encode_candidate(n, other, row, col)
+                    if other == number or not self.matrix.select_row(other_row):
+                        continue
+                    solutions = search_all(self.matrix)
+                    try:
+                        if next(solutions, None) is not None:
+                            return True
+                    finally:
+                        solutions.close()
+                        self.matrix.unselect_row(other_row)
+                self.matrix.select_row(row_number)
+                placed.append(row_number)
+            return False
+        finally:
+            uncover_givens(self.matrix, placed)
+
+    def generate(self, clues=None, symmetry="none"):
+        """Generate a puzzle with exactly one solution.
+
+        :param int clues: Target number of clues, see remove_clues.
+        :param str symmetry: Name of the symmetry of the clues, a key of SYMMETRIES.
+        :return Tuple[List[List[int]], List[List[int]]]: Returns the puzzle and its solution.
+        """
+        solution = self.full_grid()
+        return self.remove_clues(solution, clues, symmetry), solution
+
+
+def _init_worker(n, engine):
+    """Build the PuzzleGenerator of a worker process once.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :return: None
+    """
+    global _generator
+    _generator = PuzzleGenerator(n, engine=engine)
+
+
+def _generate_one(task):
+    """Generate one puzzle in a worker process.
+
+    :param Tuple[int, int, str] task: Seed, clues and symmetry.
+    :return Tuple[List[List[int]], List[List[int]]]: The puzzle and its solution.
+    """
+    seed, clues, symmetry = task
+    _generator.random = Random(seed)
+    return _generator.generate(clues, symmetry)
+
+
+def generate_puzzles(n, count, workers=1, clues=None, symmetry="none", seed=None, engine="object"):
+    """Generate many puzzles with exactly one solution, in worker processes. Every
+    puzzle has its own seed, so the puzzles only depend on seed, not on workers.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param int count: Number of puzzles.
+    :param int workers: Number of worker processes, 1 to generate in this process.
+    :param int clues: Target number of clues, see PuzzleGenerator.remove_clues.
+    :param str symmetry: Name of the symmetry of the clues, a key of SYMMETRIES.
+    :param int seed: Seed of the puzzles, None for random ones.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :return Iterator[Tuple[List[List[int]], List[List[int]]]]: Yields every puzzle
+    and its solution, in order.
+    """
+    if symmetry not in SYMMETRIES:
+        raise Exception("Unknown symmetry!")
+    seeds = Random(seed)
+    tasks = ((seeds.getrandbits(64), clues, symmetry) for i in range(0, count))
+
+    if workers <= 1:
+        _init_worker(n, engine)
+        for task in tasks:
+            yield _generate_one(task)
+        return
+
+    with Pool(workers, _init_worker, (n, engine)) as pool:
+        yield from pool.imap(_generate_one, tasks, chunksize=4)
+
+
+def parse_args(argv):
+    """Parse the command line arguments.
+
+    :param List[str] argv: Arguments, without the program name.
+    :return argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with one solution, one per line.")
+    parser.add_argument("count", type=int, help="number of puzzles")
+    parser.add_argument("-n", type=int, default=3,
+                        help="n**2 is size of the grids (default 3)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file for the puzzles, - for stdout (default)")
+    parser.add_argument("--clues", type=int, default=None,
+                        help="stop removing clues at this many (default as few as possible)")
+    parser.add_argument("--symmetry", choices=sorted(SYMMETRIES), default="none",
+                        help="symmetry of the clues (default none)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed, for the same puzzles every run")
+    parser.add_argument("--solutions", action="store_true",
+                        help="add the solution to every line, separated by a tab")
+    parser.add_argument("--engine", choices=("object", "array"), default="object",
+                        help="dancing links engine (default object)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes (default 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Generate puzzles, as given by the command line.
+
+    :param List[str] argv: Arguments, None for sys.argv.
+    :return int: Exit status.
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for puzzle, solution in generate_puzzles(args.n, args.count, args.workers, args.clues,
+                                                 args.symmetry, args.seed, args.engine):
+            if args.solutions:
+                out.write("%s\t%s\n" % (format_grid(puzzle), format_grid(solution)))
+            else:
+                out.write(format_grid(puzzle) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,8 @@
+from random import Random
+
+from ArrayMatrix import HEURISTICS, build_array_matrix
+
+
 class DataObject:
     """A node in a linked matrix.
     :param DataObject L: Left node
@@ -51,6 +56,22 @@ class DataObject:
         else:
             raise Exception("Cannot cover row for column header!")
 
+    def cover_row_counted(self):
+        """
+        Cover the row this node belongs to, like cover_row, counting the links removed.
+        :return int: Number of links removed, see ColumnObject.count_updates
+        """
+        if self.row != 0:
+            updates = 0
+            c = self.R
+            while c != self:
+                updates += c.C.count_updates()
+                c.C.cover()
+                c = c.R
+            return updates
+        else:
+            raise Exception("Cannot cover row for column header!")
+
 class ColumnObject(DataObject):
     """A column node in a linked matrix, which is the head of a column.
     :param int S: Size of this column.
@@ -105,6 +126,22 @@ class ColumnObject(DataObject):
         self.R.L = self
         self.L.R = self
 
+    def count_updates(self):
+        """
+        Count the links cover would remove now, the header and every node of the
+        other columns of the rows of this column.
+        :return int: Number of links
+        """
+        updates = 1
+        i = self.D
+        while i != self:
+            j = i.R
+            while j != i:
+                updates += 1
+                j = j.R
+            i = i.D
+        return updates
+
     def choose(self):
         """
         Choose the next column to cover with minimum branching factor.
@@ -120,10 +157,118 @@ class ColumnObject(DataObject):
             j = j.R
         return c
 
+class SizeBucket:
+    """Head of a circular doubly linked list of the columns of one size.
+    :param ColumnObject BL: Last column in bucket
+    :param ColumnObject BR: First column in bucket
+    """
+
+    def __init__(self):
+        """
+        Initialize empty SizeBucket.
+        """
+        self.BL = self
+        self.BR = self
+
+class BucketColumnObject(ColumnObject):
+    """A ColumnObject that also keeps itself, and the columns its cover changes the
+    size of, in the size bucket of its root matching S. Covered columns are in no bucket.
+    Uncovering puts every column back exactly where it was in its bucket, so the
+    order of the buckets, and with it the search, only depends on the covers done.
+    :param RootObject root: Root of the linked matrix, holding the buckets.
+    :param DataObject BL: Previous column in size bucket
+    :param DataObject BR: Next column in size bucket
+    """
+
+    def __init__(self, L, R, U, D, C, N, root):
+        """
+        Initialize BucketColumnObject, in no bucket yet.
+        :param DataObject L: Left node
+        :param DataObject R: Right node
+        :param DataObject U: Up node
+        :param DataObject D: Down node
+        :param ColumnObject C: Head of column this node belongs to
+        :param str N: Name of this column
+        :param RootObject root: Root of the linked matrix
+        """
+        ColumnObject.__init__(self, L, R, U, D, C, N)
+        self.root = root
+        self.BL = self
+        self.BR = self
+
+    def cover(self):
+        """
+        Cover this column, moving the columns that lose a node to the head of the next
+        lower bucket. Every node taken out keeps the column before its own in the old
+        bucket, for uncover.
+        :return: None
+        """
+        root = self.root
+        buckets = root.buckets
+        # BL and BR are kept, to put this column back between them
+        self.BL.BR = self.BR
+        self.BR.BL = self.BL
+        self.R.L = self.L
+        self.L.R = self.R
+        i = self.D
+        while i != self:
+            j = i.R
+            while j != i:
+                j.D.U = j.U
+                j.U.D = j.D
+                c = j.C
+                c.BL.BR = c.BR
+                c.BR.BL = c.BL
+                j.B = c.BL
+                c.S = c.S - 1
+                head = buckets[c.S]
+                c.BL = head
+                c.BR = head.BR
+                head.BR.BL = c
+                head.BR = c
+                if c.S < root.lowest:
+                    root.lowest = c.S
+                j = j.R
+            i = i.D
+
+    def uncover(self):
+        """
+        Uncover this column, moving the columns that get a node back to where they
+        were in the next higher bucket. Only exact when covers are undone in reverse
+        order, as everything else is then as it was right after the cover.
+        :return: None
+        """
+        i = self.U
+        while i != self:
+            j = i.L
+            while j != i:
+                c = j.C
+                c.BL.BR = c.BR
+                c.BR.BL = c.BL
+                c.S = c.S + 1
+                before = j.B
+                c.BL = before
+                c.BR = before.BR
+                before.BR.BL = c
+                before.BR = c
+                j.D.U = j
+                j.U.D = j
+                j = j.L
+            i = i.U
+        self.R.L = self
+        self.L.R = self
+        self.BL.BR = self
+        self.BR.BL = self
+        if self.S < self.root.lowest:
+            self.root.lowest = self.S
+
 class RootObject(DataObject):
     """
     RootObject, which is the root or start of linked matrix.
     :param List[int] row_headers: Headers of rows
+    :param List[SizeBucket] buckets: Size buckets by size, None if not built with them
+    :param int lowest: No bucket below lowest has a column
+    :param DataObject secondary: Head of the list of secondary columns, None if there are none
     """
     def __init__(self, L, R, U, D, C):
         """
@@ -136,8 +281,88 @@ class RootObject(DataObject):
         """
         DataObject.__init__(self, L, R, U, D, C, 0)
         self.row_headers = [0]
+        self.buckets = None
+        self.lowest = 0
+        self.random = None
+        self.secondary = None
 
-    def choose(self):
+    def select_row(self, row_number):
+        """Put row number row_number in the solution by covering all of its columns,
+        unless one of them is already covered.
+
+        :param int row_number: Row to select, starting at 1.
+        :return bool: Whether the row could be selected.
+        """
+        row_start = self.row_headers[row_number]
+        j = row_start
+        while True:
+            if j.C.L.R != j.C:
+                return False
+            j = j.R
+            if j == row_start:
+                break
+        row_start.C.cover()
+        row_start.cover_row()
+        return True
+
+    def unselect_row(self, row_number):
+        """Undo select_row for row number row_number.
+
+        :param int row_number: Row to unselect, starting at 1.
+        :return: None
+        """
+        row_start = self.row_headers[row_number]
+        row_start.uncover_row()
+        row_start.C.uncover()
+
+    def branch_rows(self):
+        """Return the rows of the column choose picks, the rows search branches on next.
+
+        :return List[int]: Row numbers top to bottom, None if every column is covered.
+        """
+        c = self.choose()
+        if c == self:
+            return None
+        rows = []
+        r = c.D
+        while r != c:
+            rows.append(r.row)
+            r = r.D
+        return rows
+
+    def snapshot(self):
+        """Return the current state of the links, to check that covering and
+        uncovering restored them exactly.
+
+        :return List[tuple]: Name, size and rows of every column, left to right,
+        primary columns first, then the names of the columns of every size bucket
+        in order, if there are any.
+        """
+        state = []
+        for head in (self, self.secondary):
+            if head is None:
+                continue
+            c = head.R
+            while c != head:
+                rows = []
+                i = c.D
+                while i != c:
+                    rows.append(i.row)
+                    i = i.D
+                state.append((c.N, c.S, tuple(rows)))
+                c = c.R
+
+        # The search depends on the order of the buckets too
+        for head in self.buckets or ():
+            names = []
+            c = head.BR
+            while c != head:
+                names.append(c.N)
+                c = c.BR
+            state.append(tuple(names))
+        return state
+
+    def choose_min(self):
         """
         Choose the next column to cover with minimum branching factor.
         :return: Next ColumnObject to cover
@@ -151,3 +376,174 @@ class RootObject(DataObject):
                 s = j.S
             j = j.R
         return c
+
+    choose = choose_min
+
+    def choose_first(self):
+        """
+        Choose the leftmost column.
+        :return: Next ColumnObject to cover
+        """
+        return self.R
+
+    def choose_random(self):
+        """
+        Choose a column with minimum branching factor, breaking ties at random.
+        :return: Next ColumnObject to cover
+        """
+        ties = [self]
+        s = float("inf")
+        j = self.R
+        while j != self:
+            if j.S < s:
+                ties = [j]
+                s = j.S
+            elif j.S == s:
+                ties.append(j)
+            j = j.R
+        return self.random.choice(ties)
+
+    def choose_buckets(self):
+        """
+        Choose a column with minimum branching factor from the size buckets, without
+        looking at the other columns. Only for matrices built with buckets.
+        :return: Next ColumnObject to cover
+        """
+        buckets = self.buckets
+        s = self.lowest
+        while s < len(buckets):
+            head = buckets[s]
+            if head.BR != head:
+                self.lowest = s
+                return head.BR
+            s += 1
+        self.lowest = s
+        return self
+
+    def add_to_bucket(self, c):
+        """
+        Put column c in the size bucket matching its size.
+        :param BucketColumnObject c: Column to add
+        :return: None
+        """
+        head = self.buckets[c.S]
+        c.BL = head
+        c.BR = head.BR
+        head.BR.BL = c
+        head.BR = c
+        if c.S < self.lowest:
+            self.lowest = c.S
+
+    def set_heuristic(self, name, seed=None):
+        """
+        Set how choose picks the next column: "min" (leftmost column of minimum size,
+        the default), "first" (leftmost column), "random" (column of minimum size,
+        ties broken at random) or "buckets" (a column of minimum size from the size
+        buckets, only for matrices built with buckets).
+        :param str name: Name of the heuristic
+        :param int seed: Seed of the random tie-break
+        :return: None
+        """
+        if name not in HEURISTICS:
+            raise Exception("Unknown heuristic!")
+        if name == "buckets" and self.buckets is None:
+            raise Exception("Matrix was built without size buckets!")
+        if name == "random":
+            self.random = Random(seed)
+        self.choose = getattr(self, HEURISTICS[name])
+
+
+def build_linked_matrix(col_headers, rows, engine="object", buckets=False, secondary=0):
+    """Build a linked matrix directly from the positions of the ones in each row,
+    without ever creating a dense matrix. Runs in time proportional to the number
+    of ones.
+
+    The last secondary columns are secondary, as in Knuth's paper: they may be
+    covered at most once instead of exactly once. They are kept in their own list
+    under root.secondary, so choose never picks them, but covering a row still
+    removes the rows that share one of them.
+
+    :param List[str] col_headers: Column headers.
+    :param Iterable[List[int]] rows: For every row, the indices (starting at 0) of
+    the columns that contain a 1, in increasing order.
+    :param str engine: "object" for a graph of DataObjects, "array" for an
+    ArrayMatrix stored in flat integer arrays.
+    :param bool buckets: Whether to keep columns in size buckets, and choose from them.
+    :param int secondary: Number of secondary columns, the last ones of col_headers.
+    :return RootObject: Returns the linked matrix.
+    """
+    if engine == "array":
+        return build_array_matrix(col_headers, rows, buckets, secondary)
+    elif engine != "object":
+        raise Exception("Unknown engine!")
+    if not 0 <= secondary <= len(col_headers):
+        raise Exception("Incorrect header number")
+    if buckets and secondary:
+        raise Exception("Size buckets do not support secondary columns!")
+
+    root = RootObject(None, None, None, None, None)
+    root.L = root
+    root.R = root
+    head = root
+    if secondary:
+        root.secondary = DataObject(None, None, None, None, None, 0)
+        root.secondary.L = root.secondary
+        root.secondary.R = root.secondary
+
+    # Link the column headers left to right, the secondary ones under their own head
+    columns = []
+    curr = root
+    for k in range(0, len(col_headers)):
+        if k == len(col_headers) - secondary:
+            head.L = curr
+            head = root.secondary
+            curr = head
+        if buckets:
+            new = BucketColumnObject(curr, head, None, None, None, col_headers[k], root)
+        else:
+            new = ColumnObject(curr, head, None, None, None, col_headers[k])
+        new.U = new
+        new.D = new
+        curr.R = new
+        curr = new
+        columns.append(new)
+    head.L = curr
+
+    row_count = 0
+    for row in rows:
+        row_count += 1
+        row_start = None
+        row_LR = None
+
+        for i in row:
+            col = columns[i]
+
+            # The last node of a column is always directly above its header
+            col_UD = col.U
+            node = DataObject(row_LR, row_start, col_UD, col, col, row_count)
+
+            # If the row is already under construction
+            if row_LR is not None:
+                row_LR.R = node
+
+            # If not, start the construction
+            else:
+                row_start = node
+                row_start.R = row_start
+
+            col_UD.D = node
+            col.U = node
+            col.S += 1
+            row_LR = node
+
+        if row_start is not None:
+            row_start.L = row_LR
+        root.row_headers.append(row_start)
+
+    if buckets:
+        root.buckets = [SizeBucket() for i in range(0, max([0] + [c.S for c in columns]) + 1)]
+        for c in columns:
+            root.add_to_bucket(c)
+        root.set_heuristic("buckets")
+
+    return root
@@ -0,0 +1,274 @@
+import threading
+
+from Exact_Cover import *
+from SearchStats import Cancelled, SearchStats
+
+# Status of a grid, see LiveGrid.status
+NO_SOLUTION = "no solution"
+UNIQUE = "unique"
+MULTIPLE = "multiple"
+
+
+class LiveGrid:
+    """A Sudoku grid being edited, with every entry kept covered in its exact cover
+    matrix in the order it was entered. Entries that conflict with earlier ones
+    cannot be covered and are kept aside until the conflict is removed.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param RootObject matrix: The exact cover matrix, or an ArrayMatrix.
+    :param List[Tuple[int, int, int]] entries: Row, column and number of every
+    covered entry, in cover order.
+    :param List[Tuple[int, int, int]] conflicts: Row, column and number of every
+    entry that could not be covered, in the order they were entered.
+    """
+
+    def __init__(self, n=3, engine="object"):
+        """Initialize LiveGrid with an empty grid.
+
+        :param int n: n**2 is size of Sudoku grid.
+        :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+        """
+        self.n = n
+        self.matrix = generate_sudoku_matrix(n, engine)
+        self.entries = []
+        self.conflicts = []
+
+    def set(self, row, col, number):
+        """Enter a number in a cell, replacing what was there.
+
+        :param int row: Row of the cell, from 1 to n**2.
+        :param int col: Column of the cell, from 1 to n**2.
+        :param int number: Number to enter, 0 to clear the cell.
+        :return: None
+        """
+        size = self.n**2
+        if not (0 < row <= size and 0 < col <= size):
+            raise Exception("Cell out of bounds!")
+        if not 0 <= number <= size:
+            raise Exception("Invalid number!")
+
+        removed = self._remove(row, col)
+        if number:
+            self._add(row, col, number)
+
+        # Removing an entry may have resolved conflicts of later ones
+        if removed:
+            conflicts = self.conflicts
+            self.conflicts = []
+            for entry in conflicts:
+                self._add(*entry)
+
+    def grid(self):
+        """Return the grid of every entry, covered or not.
+
+        :return List[List[int]]: Rows of the grid, 0 for empty cells.
+        """
+        size = self.n**2
+        grid = [[0] * size for i in range(0, size)]
+        for row, col, number in self.entries + self.conflicts:
+            grid[row - 1][col - 1] = number
+        return grid
+
+    def status(self, stats=None, cancel=None):
+        """Search whether the grid has no solution, a unique one or several.
+
+        :param SearchStats stats: Statistics of the search, None to skip them.
+        :param cancel: Called at every node to abandon the search, see
+        Exact_Cover.search_all.
+        :return str: NO_SOLUTION, UNIQUE or MULTIPLE.
+        """
+        if self.conflicts:
+            return NO_SOLUTION
+        count = count_solutions(self.matrix, 2, stats, cancel)
+        return (NO_SOLUTION, UNIQUE, MULTIPLE)[count]
+
+    def solve(self, stats=None, cancel=None):
+        """Search for a solution of the grid, on top of the covered entries. The
+        matrix is restored even if the search is cancelled.
+
+        :param SearchStats stats: Statistics of the search, None to skip them.
+        :param cancel: Called at every node to abandon the search, see
+        Exact_Cover.search_all.
+        :return List[List[int]]: Returns the solved grid, None if there is no solution.
+        """
+        if self.conflicts:
+            return None
+
+        solutions = search_all(self.matrix, stats, cancel)
+        try:
+            solution = next(solutions, None)
+        finally:
+            solutions.close()
+
+        if solution is None:
+            return None
+        rows = [encode_candidate(self.n, number, row, col) for row, col, number in self.entries]
+        return rows_to_grid(self.n, rows + solution)
+
+    def _add(self, row, col, number):
+        """Cover a new entry, or keep it aside if it conflicts."""
+        if self.matrix.select_row(encode_candidate(self.n, number, row, col)):
+            self.entries.append((row, col, number))
+        else:
+            self.conflicts.append((row, col, number))
+
+    def _remove(self, row, col):
+        """Remove the entry of a cell. Entries covered after it are uncovered first
+        and covered again afterwards, so covers are always undone in reverse order.
+
+        :return bool: Whether a covered entry was removed.
+        """
+        for k in range(0, len(self.conflicts)):
+            if self.conflicts[k][:2] == (row, col):
+                self.conflicts.pop(k)
+                return False
+
+        for k in range(0, len(self.entries)):
+            if self.entries[k][:2] == (row, col):
+                later = self.entries[k + 1:]
+                for entry in reversed(self.entries[k:]):
+                    self.matrix.unselect_row(encode_candidate(self.n, entry[2], entry[0], entry[1]))
+                del self.entries[k:]
+                for entry in later:
+                    self._add(*entry)
+                return True
+        return False
+
+
+class LiveChecker(threading.Thread):
+    """Worker thread that owns a LiveGrid, applies edits to it and checks the grid
+    after every batch of edits. A check still running when a new edit arrives is
+    abandoned, so only the latest grid is ever reported. The thread also solves the
+    grid on request, until the solve is cancelled.
+
+    :param LiveGrid live: The grid, only touched by this thread once started.
+    :param callback: Called from this thread with the status of every check and the
+    version it is for.
+    :param solved_callback: Called from this thread with the result of every solve
+    that was not cancelled.
+    :param int version: Number of edits queued so far.
+    :param SearchStats progress: Statistics of the running or last solve, None before
+    the first one.
+    """
+
+    def __init__(self, live, callback, solved_callback=None):
+        """Initialize LiveChecker, which still has to be started.
+
+        :param LiveGrid live: The grid.
+        :param callback: Called with the status of every check, see LiveGrid.status,
+        and the version of the grid it is for, see edit.
+        :param solved_callback: Called with the solved grid, or None if there is no
+        solution, see LiveGrid.solve.
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.live = live
+        self.callback = callback
+        self.solved_callback = solved_callback
+        self.version = 0
+        self.progress = None
+        self._pending = []
+        self._solve = False
+        self._generation = 0
+        self._solving = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+
+    def edit(self, row, col, number):
+        """Queue an edit, see LiveGrid.set. Never blocks on a running check.
+
+        :param int row: Row of the cell, from 1 to n**2.
+        :param int col: Column of the cell, from 1 to n**2.
+        :param int number: Number to enter, 0 to clear the cell.
+        :return int: Version of the grid after the edit, results for older versions
+        are stale.
+        """
+        with self._condition:
+            self._pending.append((row, col, number))
+            self.version += 1
+            self._condition.notify()
+            return self.version
+
+    def solve(self):
+        """Queue a solve of the grid, after the edits queued before it. Its progress is
+        in progress while it runs.
+
+        :return: None
+        """
+        with self._condition:
+            # A running solve is for an older generation, so it is abandoned
+            self._generation += 1
+            self._solve = True
+            self.progress = None
+            self._condition.notify()
+
+    def cancel(self):
+        """Cancel the queued or running solve. Its search is abandoned at the next node
+        and the matrix is restored, solved_callback is not called once this returns.
+
+        :return: None
+        """
+        with self._condition:
+            self._generation += 1
+            self._solve = False
+
+    def stop(self):
+        """Abandon any check or solve and end the thread.
+
+        :return: None
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def run(self):
+        """Check the grid, then apply edits, solve if asked to and check the grid again
+        every time there is something new, until stopped.
+
+        :return: None
+        """
+        edits = []
+        version = 0
+        solve = False
+        while True:
+            for edit in edits:
+                self.live.set(*edit)
+
+            if solve:
+                # Only the nodes are shown, so links are not counted
+                self.progress = SearchStats(count_updates=False)
+                try:
+                    solved = self.live.solve(self.progress, self._solve_cancelled)
+                except Cancelled:
+                    pass
+                else:
+                    # Called holding the lock, so a solve or cancel that came after
+                    # the search ended waits, and never sees a stale result
+                    with self._condition:
+                        if not self._solve_cancelled() and self.solved_callback is not None:
+                            self.solved_callback(solved)
+
+            try:
+                self.callback(self.live.status(cancel=self._check_cancelled), version)
+            except Cancelled:
+                pass
+
+            with self._condition:
+                while not self._pending and not self._solve and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                edits = self._pending
+                self._pending = []
+                version = self.version
+                solve = self._solve
+                self._solve = False
+                self._solving = self._generation
+
+    def _check_cancelled(self):
+        """Cancel check of the check, abandoning it once there are newer edits or a solve."""
+        return bool(self._pending) or self._solve or self._stopped
+
+    def _solve_cancelled(self):
+        """Cancel check of the solve, abandoning it once cancelled or replaced by a
+        newer solve."""
+        return self._generation != self._solving or self._stopped
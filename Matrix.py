@@ -1,28 +1,46 @@
-from LinkedMatrix import DataObject, ColumnObject, RootObject
+from LinkedMatrix import build_linked_matrix
 
 class Matrix:
-    """A matrix with integer entries.
+    """A matrix with integer entries. A sparse matrix only stores its nonzero
+    entries, so exact cover matrices, which are almost all zeros, take memory and
+    time in proportion to their ones.
 
     :param int num_rows: Number of rows in this matrix.
     :param int num_cols: Number of columns in this matrix.
-    :param List[List[int]] matrix: The matrix is represented by a nested List of ints.
+    :param bool sparse: Whether only nonzero entries are stored.
+    :param List[List[int]] matrix: The matrix is represented by a nested List of ints,
+    None if sparse.
+    :param List[Dict[int, int]] entries: Nonzero entries of every row by column, from 0,
+    None if dense.
+    :param List[Set[int]] col_rows: Rows of the nonzero entries of every column, from 0,
+    None if dense.
     """
 
-    def __init__(self, num_rows, num_cols):
+    def __init__(self, num_rows, num_cols, sparse=False):
         """Initialize empty Matrix self.
 
         :param int num_rows: Number of rows for this matrix.
         :param int num_cols: Number columns for this matrix.
+        :param bool sparse: Whether to only store nonzero entries.
         """
         self.num_rows = num_rows
         self.num_cols = num_cols
+        self.sparse = sparse
+        self.max_element_size = 1
+        if sparse:
+            self.matrix = None
+            self.entries = [{} for i in range(0, num_rows)]
+            self.col_rows = [set() for j in range(0, num_cols)]
+            return
+
+        self.entries = None
+        self.col_rows = None
         self.matrix = []
         row = []
         for i in range(0, num_cols):
             row.append(0)
         for i in range(0, num_rows):
             self.matrix.append(row.copy())
-        self.max_element_size = 1
 
     def get_row(self, row):
         """Get row number row from Matrix self.
@@ -32,6 +50,11 @@ class Matrix:
         """
         if row > self.num_rows or row <= 0:
             raise Exception("Row out of bounds!")
+        if self.sparse:
+            values = [0] * self.num_cols
+            for j, element in self.entries[row - 1].items():
+                values[j] = element
+            return values
         return self.matrix[row - 1]
 
     def get_col(self, col):
@@ -42,28 +65,55 @@ class Matrix:
         """
         if col > self.num_cols or col <= 0:
             raise Exception("Column out of bounds!")
+        if self.sparse:
+            column = [0] * self.num_rows
+            for i in self.col_rows[col - 1]:
+                column[i] = self.entries[i][col - 1]
+            return column
         column = []
         for i in range(0, self.num_rows):
             column.append(self.matrix[i][col - 1])
         return column
 
+    def row_entries(self, row):
+        """Get the nonzero entries of row number row, in time proportional to them
+        if Matrix self is sparse.
+
+        :param int row: Row number to get.
+        :return List[Tuple[int, int]]: Column and entry of every nonzero entry, in order.
+        """
+        if row > self.num_rows or row <= 0:
+            raise Exception("Row out of bounds!")
+        if self.sparse:
+            return [(j + 1, element) for j, element in sorted(self.entries[row - 1].items())]
+        return [(j + 1, element) for j, element in enumerate(self.matrix[row - 1]) if element != 0]
+
+    def col_entries(self, col):
+        """Get the nonzero entries of column number col, in time proportional to them
+        if Matrix self is sparse.
+
+        :param int col: Column number to get.
+        :return List[Tuple[int, int]]: Row and entry of every nonzero entry, in order.
+        """
+        if col > self.num_cols or col <= 0:
+            raise Exception("Column out of bounds!")
+        if self.sparse:
+            return [(i + 1, self.entries[i][col - 1]) for i in sorted(self.col_rows[col - 1])]
+        return [(i + 1, self.matrix[i][col - 1]) for i in range(0, self.num_rows)
+                if self.matrix[i][col - 1] != 0]
 
     def __str__(self):
         """Return str representation of Matrix self.
 
         :return str: String representation of Matrix.
         """
-        content = ""
+        width = self.max_element_size
+        lines = []
         for i in range(0, self.num_rows):
-            next_row = ""
-            for j in range(0, self.num_cols):
-                element = self.get(i + 1, j + 1)
-                space = (self.max_element_size - element.__str__().__len__()) * " "
-                next_row += element.__str__() + space + " "
-            content += "\n| " + next_row + "|"
-        row_size = int(len(content.split("\n")[1])) - 4
-        brace = "--" + row_size * " " + "--"
-        return brace + content + "\n" + brace
+            row = self.get_row(i + 1)
+            lines.append("| " + "".join(str(element).ljust(width) + " " for element in row) + "|")
+        brace = "--" + (self.num_cols * (width + 1) - 1) * " " + "--"
+        return "\n".join([brace] + lines + [brace])
 
     def set(self, element, row, col):
         """Set the entry at row row and column col to element.
@@ -73,7 +123,19 @@ class Matrix:
         :param int col: Column of entry.
         :return: None
         """
-        self.matrix[row - 1][col - 1] = element
+        if self.sparse:
+            if row > self.num_rows or row <= 0:
+                raise Exception("Row out of bounds!")
+            if col > self.num_cols or col <= 0:
+                raise Exception("Column out of bounds!")
+            if element == 0:
+                self.entries[row - 1].pop(col - 1, None)
+                self.col_rows[col - 1].discard(row - 1)
+                return
+            self.entries[row - 1][col - 1] = element
+            self.col_rows[col - 1].add(row - 1)
+        else:
+            self.matrix[row - 1][col - 1] = element
         element_size = element.__str__().__len__()
         if element_size > self.max_element_size:
             self.max_element_size = element_size
@@ -86,6 +148,8 @@ class Matrix:
         :param col: Column of entry.
         :return: Returns entry.
         """
+        if self.sparse:
+            return self.entries[row - 1].get(col - 1, 0)
         return self.matrix[row - 1][col - 1]
 
     def remove_row(self, row):
@@ -96,6 +160,17 @@ class Matrix:
         """
         if row > self.num_rows or row <= 0:
             raise Exception("Row out of bounds!")
+        elif self.sparse:
+            removed_row = self.get_row(row)
+            self.num_rows -= 1
+            for j in self.entries.pop(row - 1):
+                self.col_rows[j].discard(row - 1)
+            # Rows below move up, only their nonzero entries are renumbered
+            for i in range(row - 1, self.num_rows):
+                for j in self.entries[i]:
+                    self.col_rows[j].discard(i + 1)
+                    self.col_rows[j].add(i)
+            return removed_row
         else:
             self.num_rows -= 1
             return self.matrix.pop(row - 1)
@@ -108,6 +183,16 @@ class Matrix:
         """
         if col > self.num_cols or col <= 0:
             raise Exception("Column out of bounds!")
+        elif self.sparse:
+            removed_col = self.get_col(col)
+            self.num_cols -= 1
+            for i in self.col_rows.pop(col - 1):
+                del self.entries[i][col - 1]
+            # Columns to the right move left, only their nonzero entries are renumbered
+            for j in range(col - 1, self.num_cols):
+                for i in self.col_rows[j]:
+                    self.entries[i][j] = self.entries[i].pop(j + 1)
+            return removed_col
         else:
             self.num_cols -= 1
             removed_col = []
@@ -128,6 +213,15 @@ class Matrix:
             if self.num_cols != len(row):
                 raise Exception("Number of columns do not match!")
 
+        if self.sparse:
+            self.entries = [{} for i in range(0, self.num_rows)]
+            self.col_rows = [set() for j in range(0, self.num_cols)]
+            for i in range(0, self.num_rows):
+                for j in range(0, self.num_cols):
+                    if rows[i][j] != 0:
+                        self.set(rows[i][j], i + 1, j + 1)
+            return
+
         self.matrix = rows.copy()
         for i in range(0, self.num_rows):
             for j in range(0, self.num_cols):
@@ -140,6 +234,12 @@ class Matrix:
 
         :return bool: Whether Matrix self is a boolean matrix.
         """
+        if self.sparse:
+            # Rows without columns have no entries at all, as for dense matrices
+            if self.num_cols == 0:
+                return self.num_rows == 0
+            return all(element == 1 for row in self.entries for element in row.values())
+
         for row in self.matrix:
             row_set = set(row)
             if len(row_set) == 0:
@@ -154,10 +254,13 @@ class Matrix:
                 return False
         return True
 
-    def convert(self, col_headers):
+    def convert(self, col_headers, engine="object", secondary=0):
         """Convert Matrix self to a linked matrix, with column headers from col_headers.
 
         :param List[str] col_headers: Column headers.
+        :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+        :param int secondary: Number of secondary columns, the last ones, see
+        LinkedMatrix.build_linked_matrix.
         :return RootObject: Returns converted linked matrix.
         """
         if len(col_headers) != self.num_cols:
@@ -165,55 +268,37 @@ class Matrix:
         if not self.is_boolean():
             raise Exception("Cannot convert a non-boolean matrix!")
         else:
-            root = RootObject(None, None, None, None, None)
-            root.L = root
-            root.R = root
-            curr = root
-            for i in range(0, len(col_headers)):
-                new = ColumnObject(curr, root, None, None, None, col_headers[i])
-                new.U = new
-                new.D = new
-                curr.R = new
-                curr = curr.R
-
-            root.L = curr
-            row_count = 0
-
-            #Iterate over rows
+            # Positions of the ones in each row
+            if self.sparse:
+                rows = [sorted(row) for row in self.entries]
+                return build_linked_matrix(col_headers, rows, engine, secondary=secondary)
+
+            rows = []
             for row in self.matrix:
-                row_count += 1
-                curr_col = root
-                row_LR = None
-                row_start = None
-
-                #Iterate over elements in row
-                for i in range(0, self.num_cols):
-                    curr_col = curr_col.R
-
-                    #If element is a 1
-                    if row[i] == 1:
-                        col_UD = curr_col
-
-                        #Move down the matrix to the last row
-                        while col_UD.D != curr_col:
-                            col_UD = col_UD.D
-
-                        #If the row is already under construction
-                        if row_LR is not None:
-                            row_LR.R = DataObject(row_LR, row_start, col_UD, curr_col, curr_col, row_count)
-                            row_LR = row_LR.R
-
-                        #If not, start the construction
-                        else:
-                            row_start = DataObject(None, None, col_UD, curr_col, curr_col, row_count)
-                            row_start.R = row_start
-                            row_start.L = row_start
-                            row_LR = row_start
-                        col_UD.D = row_LR
-                        row_LR.C.U = row_LR
-                        curr_col.S += 1
-
-                        row_start.L = row_LR
-                root.row_headers.append(row_start)
-
-            return root
+                rows.append([i for i in range(0, self.num_cols) if row[i] == 1])
+
+            return build_linked_matrix(col_headers, rows, engine, secondary=secondary)
+
+
+def sparse_matrix(num_rows, num_cols, pairs, element=1):
+    """Build a sparse Matrix from the positions of its nonzero entries, in one pass.
+
+    :param int num_rows: Number of rows of the matrix.
+    :param int num_cols: Number of columns of the matrix.
+    :param Iterable[Tuple[int, int]] pairs: Row and column of every nonzero entry,
+    starting at 1.
+    :param int element: Value of the entries, 1 for exact cover matrices.
+    :return Matrix: The sparse matrix.
+    """
+    if element == 0:
+        raise Exception("Entries of a sparse matrix cannot be 0!")
+    matrix = Matrix(num_rows, num_cols, True)
+    matrix.max_element_size = max(1, len(str(element)))
+    for row, col in pairs:
+        if row > num_rows or row <= 0:
+            raise Exception("Row out of bounds!")
+        if col > num_cols or col <= 0:
+            raise Exception("Column out of bounds!")
+        matrix.entries[row - 1][col - 1] = element
+        matrix.col_rows[col - 1].add(row - 1)
+    return matrix
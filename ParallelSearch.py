@@ -0,0 +1,154 @@
+from multiprocessing import Pool
+
+from Exact_Cover import *
+
+# Exact cover matrix of this worker process, built once by _init_worker
+_matrix = None
+
+
+def split_search(h, prefix=(), depth=None, frontier_size=None):
+    """Explore the top of the search tree below the rows of prefix and return the
+    subproblems left, in the order search would visit them. Each subproblem is the
+    list of rows to select to get to it. Branches that end in a column with no rows
+    are dropped, and the matrix is left as it was.
+
+    :param ColumnObject h: Root of LinkedMatrix, or an ArrayMatrix, built with its
+    secondary columns so branches never choose them.
+    :param List[int] prefix: Rows selected before the search starts, such as givens.
+    :param int depth: Number of levels to expand, None for no limit.
+    :param int frontier_size: Stop expanding once there are this many subproblems,
+    None for no limit. With no limit at all, one level is expanded.
+    :return List[List[int]]: Returns the rows of every subproblem.
+    """
+    if depth is None and frontier_size is None:
+        depth = 1
+
+    prefix = list(prefix)
+    if not select_rows(h, prefix):
+        return []
+    uncover_givens(h, prefix)
+
+    frontier = [prefix]
+    level = 0
+    while (depth is None or level < depth) and (frontier_size is None or len(frontier) < frontier_size):
+        expanded = []
+        complete = True
+        for rows in frontier:
+            select_rows(h, rows)
+            branches = h.branch_rows()
+            uncover_givens(h, rows)
+
+            # A solution already, nothing left to split
+            if branches is None:
+                expanded.append(rows)
+            else:
+                complete = False
+                for row_number in branches:
+                    expanded.append(rows + [row_number])
+
+        frontier = expanded
+        level += 1
+        if complete:
+            break
+
+    return frontier
+
+
+def _init_worker(col_headers, rows, engine, secondary):
+    """Build the exact cover matrix of a worker process once.
+
+    :param List[str] col_headers: Column headers.
+    :param List[List[int]] rows: Columns of every row, see LinkedMatrix.build_linked_matrix.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :param int secondary: Number of secondary columns, the last ones of col_headers.
+    :return: None
+    """
+    global _matrix
+    _matrix = build_linked_matrix(col_headers, rows, engine, secondary=secondary)
+
+
+def _search_subproblem(task):
+    """Search one subproblem in a worker process.
+
+    :param Tuple[List[int], bool, int] task: Rows of the subproblem, whether to
+    count solutions and the limit when counting.
+    :return: Returns the number of solutions when counting, else the rows of the
+    first solution or None.
+    """
+    rows, count, limit = task
+    if not select_rows(_matrix, rows):
+        return 0 if count else None
+
+    try:
+        if count:
+            return count_solutions(_matrix, limit)
+
+        solutions = search_all(_matrix)
+        try:
+            solution = next(solutions, None)
+        finally:
+            solutions.close()
+        return None if solution is None else rows + solution
+    finally:
+        uncover_givens(_matrix, rows)
+
+
+def parallel_search(col_headers, rows, workers, prefix=(), depth=None, frontier_size=None,
+                    count=False, limit=None, engine="object", secondary=0):
+    """Search an exact cover problem in worker processes. The top of the search tree
+    is split with split_search and every worker searches whole subproblems with its
+    own copy of the matrix. In first solution mode the other workers are stopped as
+    soon as one finds a solution. In counting mode the counts are summed.
+
+    :param List[str] col_headers: Column headers.
+    :param List[List[int]] rows: Columns of every row, see LinkedMatrix.build_linked_matrix.
+    :param int workers: Number of worker processes.
+    :param List[int] prefix: Rows selected before the search starts, such as givens.
+    :param int depth: Levels to split, see split_search.
+    :param int frontier_size: Subproblems to split into, see split_search.
+    :param bool count: Whether to count the solutions instead of finding one.
+    :param int limit: Stop counting once limit solutions are found, None to count all
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :param int secondary: Number of secondary columns, the last ones of col_headers.
+    :return: Returns the number of solutions when counting, else the rows of a
+    solution (starting with prefix) or None.
+    """
+    if frontier_size is None and depth is None:
+        frontier_size = workers * 8
+
+    h = build_linked_matrix(col_headers, rows, engine, secondary=secondary)
+    subproblems = split_search(h, prefix, depth, frontier_size)
+    tasks = [(subproblem, count, limit) for subproblem in subproblems]
+
+    # Leaving the with block terminates the workers still searching
+    with Pool(workers, _init_worker, (col_headers, rows, engine, secondary)) as pool:
+        if count:
+            total = 0
+            for result in pool.imap_unordered(_search_subproblem, tasks):
+                total += result
+                if limit is not None and total >= limit:
+                    return limit
+            return total
+
+        for result in pool.imap_unordered(_search_subproblem, tasks):
+            if result is not None:
+                return result
+        return None
+
+
+def parallel_solve_sudoku(n, grid, workers, depth=None, frontier_size=None, engine="object"):
+    """Solve one Sudoku puzzle with parallel_search.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :param int workers: Number of worker processes.
+    :param int depth: Levels to split, see split_search.
+    :param int frontier_size: Subproblems to split into, see split_search.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :return List[List[int]]: Returns the solved grid, None if there is no solution.
+    """
+    solution = parallel_search(generate_sudoku_col_headers(n), generate_sudoku_rows(n), workers,
+                               given_rows(n, grid), depth, frontier_size, engine=engine)
+    if solution is None:
+        return None
+    return rows_to_grid(n, solution)
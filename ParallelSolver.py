@@ -0,0 +1,115 @@
+import queue
+import time
+from multiprocessing import Pool
+
+from BatchSolver import BatchSolver
+
+# BatchSolver of this worker process, kept for the life of the process
+_solver = None
+
+
+def _init_worker(engine, cache, sizes):
+    """Build the BatchSolver of a worker process and the sessions for sizes once,
+    so tasks never rebuild a matrix. SolveServer sets up its workers with it too.
+
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :param bool cache: Whether to load matrices from the template cache.
+    :param Iterable[int] sizes: Values of n to build sessions for up front.
+    :return: None
+    """
+    global _solver
+    _solver = BatchSolver(engine, cache)
+    for n in sizes:
+        _solver.session(n)
+
+
+def _solve_chunk(chunk):
+    """Solve a chunk of puzzles in a worker process.
+
+    :param List[Tuple[int, str]] chunk: Number and line of every puzzle.
+    :return List[Tuple[int, str, str, float]]: Number, solution, status and time in
+    milliseconds of every puzzle.
+    """
+    results = []
+    for index, line in chunk:
+        start = time.perf_counter()
+        solution, result = _solver.solve_line(line)
+        results.append((index, solution, result, (time.perf_counter() - start) * 1000))
+    return results
+
+
+def _chunks(lines, chunk_size):
+    """Split lines into chunks of numbered lines.
+
+    :param Iterable[str] lines: Puzzles, one per line.
+    :param int chunk_size: Number of lines per chunk.
+    :return Iterator[List[Tuple[int, str]]]: Yields the chunks.
+    """
+    chunk = []
+    for index, line in enumerate(lines):
+        chunk.append((index, line))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_parallel(lines, workers, chunk_size=256, ordered=True, engine="object",
+                   cache=False, sizes=(3,)):
+    """Solve puzzles in a pool of worker processes, each holding its own sessions
+    for its whole life. Puzzles are sent in chunks, and at most a few chunks per
+    worker are in flight, so memory stays bounded however long lines is.
+
+    :param Iterable[str] lines: Puzzles, one per line.
+    :param int workers: Number of worker processes.
+    :param int chunk_size: Number of puzzles sent to a worker at once.
+    :param bool ordered: Whether to yield results in input order, otherwise as soon
+    as they are ready.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :param bool cache: Whether to load matrices from the template cache.
+    :param Iterable[int] sizes: Values of n every worker builds a session for up front.
+    :return Iterator[Tuple[int, str, str, float]]: Yields number (starting at 0),
+    solution, status and time in milliseconds of every puzzle.
+    """
+    window = workers * 4
+    done = queue.Queue()
+
+    with Pool(workers, _init_worker, (engine, cache, tuple(sizes))) as pool:
+        submitted = 0
+        yielded = 0
+        ready = {}
+
+        def wait():
+            """Wait for one chunk to finish and return the chunks that can be yielded now."""
+            chunk_id, results = done.get()
+            if isinstance(results, BaseException):
+                raise results
+
+            if not ordered:
+                return [results]
+
+            # Hold chunks back until every chunk before them is done
+            ready[chunk_id] = results
+            finished = []
+            while yielded + len(finished) in ready:
+                finished.append(ready.pop(yielded + len(finished)))
+            return finished
+
+        for chunk in _chunks(lines, chunk_size):
+            chunk_id = submitted
+            pool.apply_async(_solve_chunk, (chunk,),
+                             callback=lambda results, i=chunk_id: done.put((i, results)),
+                             error_callback=lambda error, i=chunk_id: done.put((i, error)))
+            submitted += 1
+
+            # Chunks not yielded yet are either in flight or held back
+            while submitted - yielded >= window:
+                for results in wait():
+                    yielded += 1
+                    yield from results
+
+        while yielded < submitted:
+            for results in wait():
+                yielded += 1
+                yield from results
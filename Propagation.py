@@ -0,0 +1,128 @@
+def propagate(n, grid):
+    """Fill the cells of a Sudoku grid that are forced by naked singles (a cell with
+    one candidate left) and hidden singles (a number with one cell left in a row,
+    column or box). Candidates are kept as bitmasks of the numbers used in every
+    row, column and box, bit number - 1 for number.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :return List[List[int]]: Returns a new grid with the forced cells filled, None if
+    the grid has no solution.
+    """
+    size = n**2
+    full = (1 << size) - 1
+    row_used = [0] * size
+    col_used = [0] * size
+    box_used = [0] * size
+
+    if len(grid) != size:
+        raise Exception("Number of rows do not match!")
+
+    cells = [list(row) for row in grid]
+    empty = []
+    for i in range(0, size):
+        if len(cells[i]) != size:
+            raise Exception("Number of columns do not match!")
+
+        for j in range(0, size):
+            number = cells[i][j]
+            if number == 0:
+                empty.append((i, j, (i // n) * n + j // n))
+                continue
+            if not 0 < number <= size:
+                raise Exception("Invalid number!")
+
+            bit = 1 << (number - 1)
+            b = (i // n) * n + j // n
+            if (row_used[i] | col_used[j] | box_used[b]) & bit:
+                return None
+            row_used[i] |= bit
+            col_used[j] |= bit
+            box_used[b] |= bit
+
+    while empty:
+        # Naked singles
+        remaining = []
+        candidates = []
+        for cell in empty:
+            i, j, b = cell
+            cand = full & ~(row_used[i] | col_used[j] | box_used[b])
+            if cand == 0:
+                return None
+
+            if cand & (cand - 1) == 0:
+                cells[i][j] = cand.bit_length()
+                row_used[i] |= cand
+                col_used[j] |= cand
+                box_used[b] |= cand
+            else:
+                remaining.append(cell)
+                candidates.append(cand)
+
+        if len(remaining) != len(empty):
+            empty = remaining
+            continue
+
+        # Hidden singles, by the numbers seen once and more than once in every unit
+        units = {}
+        for k in range(0, len(empty)):
+            i, j, b = empty[k]
+            for unit in (("R", i), ("C", j), ("B", b)):
+                if unit not in units:
+                    units[unit] = []
+                units[unit].append(k)
+
+        used = {"R": row_used, "C": col_used, "B": box_used}
+        found = []
+        for unit, members in units.items():
+            once = 0
+            twice = 0
+            for k in members:
+                twice |= once & candidates[k]
+                once |= candidates[k]
+
+            # A number that fits nowhere in the unit
+            if full & ~(used[unit[0]][unit[1]] | once):
+                return None
+
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for k in members:
+                    if candidates[k] & bit:
+                        found.append((k, bit))
+                        break
+
+        if not found:
+            break
+
+        placed = set()
+        for k, bit in found:
+            i, j, b = empty[k]
+
+            # The cell may already be taken by another hidden single, which the
+            # next pass reports as a number that fits nowhere
+            if k in placed or (row_used[i] | col_used[j] | box_used[b]) & bit:
+                continue
+            cells[i][j] = bit.bit_length()
+            row_used[i] |= bit
+            col_used[j] |= bit
+            box_used[b] |= bit
+            placed.add(k)
+
+        empty = [empty[k] for k in range(0, len(empty)) if k not in placed]
+
+    return cells
+
+
+def is_complete(grid):
+    """Returns whether every cell of a grid is filled.
+
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :return bool: Whether grid has no empty cells.
+    """
+    for row in grid:
+        if 0 in row:
+            return False
+    return True
@@ -0,0 +1,378 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from multiprocessing import Pool
+
+from PuzzleIO import format_grid, parse_puzzle
+from SolverSession import SudokuSession
+
+# Increase whenever the layout of the file changes
+FORMAT_VERSION = 1
+
+MAGIC = b"SDKC"
+
+# Magic, format version, n, bits per cell, then the number of records
+HEADER = struct.Struct("<4sIIIQ")
+
+# Records solved by a worker at once, see solve_corpus
+CHUNK_SIZE = 1024
+
+# Reader and SudokuSession of this worker process, opened once by _init_worker
+_reader = None
+_session = None
+
+
+def cell_bits(n):
+    """Return the bits used by every cell: 4 up to 9 by 9 grids, where numbers fit
+    in a hexadecimal digit, and a whole byte for bigger grids.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :return int: 4 or 8.
+    """
+    return 4 if n**2 < 16 else 8
+
+
+def record_size(n):
+    """Return the bytes taken by one grid.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :return int: Size of a record in bytes.
+    """
+    return (n**4 * cell_bits(n) + 7) // 8
+
+
+def encode_grid(n, grid):
+    """Pack a grid into one record, row by row, the first cell of a byte in its high
+    bits when cells take 4 bits.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :return bytes: The record.
+    """
+    cells = [number for row in grid for number in row]
+    if len(cells) != n**4:
+        raise Exception("Invalid grid size!")
+    if cell_bits(n) == 8:
+        return bytes(cells)
+    if len(cells) % 2:
+        cells.append(0)
+    return bytes((cells[k] << 4) | cells[k + 1] for k in range(0, len(cells), 2))
+
+
+def decode_record(n, record):
+    """Unpack one record into a grid, inverse of encode_grid.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param record: The record, bytes or a memoryview of them.
+    :return List[List[int]]: Rows of the grid, 0 for empty cells.
+    """
+    size = n**2
+    if cell_bits(n) == 8:
+        cells = list(record)
+    else:
+        # Every byte holds two cells, the first in its high bits
+        cells = []
+        for byte in record:
+            cells.append(byte >> 4)
+            cells.append(byte & 15)
+    return [cells[i * size:(i + 1) * size] for i in range(0, size)]
+
+
+class CorpusReader:
+    """Reads a corpus of grids by memory mapping it, so any record can be decoded
+    without reading the ones before it, and processes can read disjoint ranges of
+    the same file.
+
+    :param int n: n**2 is size of the grids.
+    :param int count: Number of grids.
+    :param int record_size: Bytes of every record.
+    """
+
+    def __init__(self, path):
+        """Open a corpus written by write_corpus.
+
+        :param str path: Path of the corpus.
+        """
+        self._mmap = None
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise Exception("Not a puzzle corpus!")
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise Exception("Not a puzzle corpus!")
+        magic, version, n, bits, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or bits != cell_bits(n):
+            self.close()
+            raise Exception("Not a puzzle corpus!")
+        self.n = n
+        self.count = count
+        self.record_size = record_size(n)
+        if len(self._mmap) != HEADER.size + count * self.record_size:
+            self.close()
+            raise Exception("Truncated puzzle corpus!")
+
+    def __len__(self):
+        """Return the number of grids."""
+        return self.count
+
+    def __enter__(self):
+        """Use the reader in a with block, closing it at the end."""
+        return self
+
+    def __exit__(self, *exc):
+        """Close the reader at the end of a with block."""
+        self.close()
+
+    def _offset(self, index):
+        """Return the position of one record in the file.
+
+        :param int index: Number of the grid, from 0.
+        :return int: Offset of the record in bytes.
+        """
+        if not 0 <= index < self.count:
+            raise Exception("Record out of bounds!")
+        return HEADER.size + index * self.record_size
+
+    def record(self, index):
+        """Return one record, copied out of the memory map. A copy stays valid once
+        the reader is closed, where a view of the map would keep it from closing.
+
+        :param int index: Number of the grid, from 0.
+        :return bytes: The record.
+        """
+        offset = self._offset(index)
+        return self._mmap[offset:offset + self.record_size]
+
+    def grid(self, index):
+        """Decode one grid straight from the memory map, without copying its record.
+        The views are released before returning, so close still succeeds.
+
+        :param int index: Number of the grid, from 0.
+        :return List[List[int]]: Rows of the grid, 0 for empty cells.
+        """
+        offset = self._offset(index)
+        with memoryview(self._mmap) as whole, whole[offset:offset + self.record_size] as view:
+            return decode_record(self.n, view)
+
+    def grids(self, start=0, stop=None):
+        """Decode a range of grids, one record at a time.
+
+        :param int start: Number of the first grid, from 0.
+        :param int stop: Number after the last grid, None for the end of the corpus.
+        :return Iterator[List[List[int]]]: Yields the grids in order.
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        for index in range(start, stop):
+            yield self.grid(index)
+
+    def close(self):
+        """Release the memory map and the file.
+
+        :return: None
+        """
+        try:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+        finally:
+            self._file.close()
+
+
+def write_corpus(path, n, grids):
+    """Write grids to a corpus. The file is written next to path first and then moved
+    in place, so readers never see half a corpus.
+
+    :param str path: Path of the corpus.
+    :param int n: n**2 is size of the grids.
+    :param Iterable[List[List[int]]] grids: Rows of every grid, 0 for empty cells.
+    :return int: Number of grids written.
+    """
+    return write_records(path, n, (encode_grid(n, grid) for grid in grids))
+
+
+def write_records(path, n, records):
+    """Write packed records to a corpus, see write_corpus. The number of records is
+    written into the header once they are all written.
+
+    :param str path: Path of the corpus.
+    :param int n: n**2 is size of the grids.
+    :param Iterable[bytes] records: Records from encode_grid, or several of them joined.
+    :return int: Number of records written.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    size = 0
+    temp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, n, cell_bits(n), 0))
+            for record in records:
+                f.write(record)
+                size += len(record)
+            if size % record_size(n):
+                raise Exception("Records of the wrong size!")
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, n, cell_bits(n), size // record_size(n)))
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return size // record_size(n)
+
+
+def text_to_corpus(text_path, path):
+    """Convert puzzles written one per line, see PuzzleIO.parse_puzzle, to a corpus.
+    Every puzzle must have the same size, and empty lines are skipped.
+
+    :param str text_path: Path of the puzzles.
+    :param str path: Path of the corpus.
+    :return int: Number of puzzles converted.
+    """
+    with open(text_path) as source:
+        lines = (line for line in source if line.strip())
+        first = next(lines, None)
+        if first is None:
+            raise Exception("No puzzles!")
+        n = parse_puzzle(first)[0]
+
+        def grids():
+            yield parse_puzzle(first)[1]
+            for line in lines:
+                size, grid = parse_puzzle(line)
+                if size != n:
+                    raise Exception("Puzzles of different sizes!")
+                yield grid
+
+        return write_corpus(path, n, grids())
+
+
+def corpus_to_text(path, text_path):
+    """Convert a corpus to puzzles written one per line, see PuzzleIO.format_grid.
+
+    :param str path: Path of the corpus.
+    :param str text_path: Path of the puzzles.
+    :return int: Number of puzzles converted.
+    """
+    with CorpusReader(path) as reader, open(text_path, "w") as out:
+        for grid in reader.grids():
+            out.write(format_grid(grid) + "\n")
+        return reader.count
+
+
+def _init_worker(path, engine):
+    """Map the corpus and build the SudokuSession of a worker process once.
+
+    :param str path: Path of the corpus.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :return: None
+    """
+    global _reader, _session
+    _reader = CorpusReader(path)
+    _session = SudokuSession(_reader.n, engine)
+
+
+def _solve_range(task):
+    """Solve a range of the corpus in a worker process.
+
+    :param Tuple[int, int] task: Number of the first puzzle and number after the last.
+    :return bytes: Records of the solutions, empty grids for puzzles without one.
+    """
+    start, stop = task
+    n = _reader.n
+    records = []
+    for grid in _reader.grids(start, stop):
+        solved = _session.solve(grid)
+        if solved is None:
+            solved = [[0] * n**2 for i in range(0, n**2)]
+        records.append(encode_grid(n, solved))
+    return b"".join(records)
+
+
+def solve_corpus(path, out_path, workers=1, engine="object", chunk_size=CHUNK_SIZE):
+    """Solve every puzzle of a corpus and write the solutions to another corpus, in
+    the same order, with an empty grid for every puzzle without a solution. Workers
+    map the same corpus and solve disjoint ranges of it.
+
+    :param str path: Path of the puzzles.
+    :param str out_path: Path of the solutions.
+    :param int workers: Number of worker processes, 1 to solve in this process.
+    :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+    :param int chunk_size: Puzzles in every range.
+    :return int: Number of puzzles solved.
+    """
+    global _reader, _session
+    with CorpusReader(path) as reader:
+        n = reader.n
+        count = reader.count
+    tasks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+    if workers <= 1:
+        _init_worker(path, engine)
+        try:
+            return write_records(out_path, n, map(_solve_range, tasks))
+        finally:
+            _reader.close()
+            _reader = None
+            _session = None
+
+    with Pool(workers, _init_worker, (path, engine)) as pool:
+        return write_records(out_path, n, pool.imap(_solve_range, tasks))
+
+
+def parse_args(argv):
+    """Parse the command line arguments.
+
+    :param List[str] argv: Arguments, without the program name.
+    :return argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Convert and solve binary puzzle corpora.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = commands.add_parser("pack", help="convert puzzles, one per line, to a corpus")
+    pack_parser.add_argument("input", help="file of puzzles")
+    pack_parser.add_argument("output", help="corpus to write")
+
+    unpack_parser = commands.add_parser("unpack", help="convert a corpus to puzzles, one per line")
+    unpack_parser.add_argument("input", help="corpus to read")
+    unpack_parser.add_argument("output", help="file of puzzles")
+
+    solve_parser = commands.add_parser("solve", help="solve a corpus into a corpus of solutions")
+    solve_parser.add_argument("input", help="corpus of puzzles")
+    solve_parser.add_argument("output", help="corpus of solutions to write")
+    solve_parser.add_argument("--engine", choices=("object", "array"), default="object",
+                              help="dancing links engine (default object)")
+    solve_parser.add_argument("-j", "--workers", type=int, default=1,
+                              help="number of worker processes (default 1)")
+    solve_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                              help="puzzles given to a worker at once (default %d)" % CHUNK_SIZE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Convert or solve corpora, as given by the command line.
+
+    :param List[str] argv: Arguments, None for sys.argv.
+    :return int: Exit status.
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command == "pack":
+        count = text_to_corpus(args.input, args.output)
+    elif args.command == "unpack":
+        count = corpus_to_text(args.input, args.output)
+    else:
+        count = solve_corpus(args.input, args.output, args.workers, args.engine, args.chunk_size)
+    print("%d puzzles" % count, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+from math import isqrt
+
+# Symbols of the numbers 1 to 25, for grids up to 25 by 25
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+# Symbols of empty cells
+BLANKS = ".0"
+
+
+class InvalidPuzzle(Exception):
+    """Raised by parse_puzzle for a line that is not a puzzle."""
+
+
+def parse_puzzle(line):
+    """Parse a puzzle written on one line, row by row, with "." or "0" for empty cells
+    and the numbers above 9 written as letters from A.
+
+    :param str line: The puzzle, n**4 characters long.
+    :return Tuple[int, List[List[int]]]: Returns n and the rows of the grid, 0 for
+    empty cells. Raises InvalidPuzzle if line is not a puzzle.
+    """
+    line = line.strip()
+    size = isqrt(len(line))
+    n = isqrt(size)
+    if n < 1 or n**4 != len(line):
+        raise InvalidPuzzle("Invalid grid size!")
+
+    grid = []
+    for i in range(0, size):
+        row = []
+        for char in line[i * size:(i + 1) * size]:
+            if char in BLANKS:
+                row.append(0)
+            else:
+                number = SYMBOLS.find(char.upper()) + 1
+                if not 0 < number <= size:
+                    raise InvalidPuzzle("Invalid number!")
+                row.append(number)
+        grid.append(row)
+
+    return n, grid
+
+
+def format_grid(grid):
+    """Write a grid on one line, inverse of parse_puzzle.
+
+    :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+    :return str: The grid on one line, with "." for empty cells.
+    """
+    return "".join(SYMBOLS[number - 1] if number else "." for row in grid for number in row)
@@ -0,0 +1,122 @@
+import time
+
+
+class Cancelled(Exception):
+    """Raised to abandon a search that is no longer needed, see the cancel argument
+    of Exact_Cover.search_all."""
+
+
+class SearchStats:
+    """Statistics of one or more searches, collected when passed to search_all or
+    count_solutions. Updates are counted like Knuth does, as the links removed by
+    cover, one for the column header and one for every node taken out of a column.
+    Counting them makes the search noticeably slower, so callers that only need the
+    hooks or the node counts can turn it off.
+
+    :param int nodes: Search tree nodes visited, one per choice of column.
+    :param int updates: Links removed while covering.
+    :param int backtracks: Rows taken back out of the solution.
+    :param int solutions: Solutions found.
+    :param float time: Seconds spent between the start and the end of the searches.
+    :param List[int] depth_nodes: Nodes visited at every depth.
+    :param List[int] depth_branches: Rows of the chosen columns at every depth.
+    :param on_node: Called with the depth and the number of branches of every node.
+    :param on_solution: Called with the rows of every solution.
+    :param on_backtrack: Called with the depth of every backtrack.
+    :param bool count_updates: Whether updates are counted, else they stay 0.
+    """
+
+    def __init__(self, on_node=None, on_solution=None, on_backtrack=None, count_updates=True):
+        """Initialize SearchStats with every count at 0.
+
+        :param on_node: Called with the depth and the number of branches of every node.
+        :param on_solution: Called with the rows of every solution.
+        :param on_backtrack: Called with the depth of every backtrack.
+        :param bool count_updates: Whether updates are counted, else they stay 0.
+        """
+        self.nodes = 0
+        self.updates = 0
+        self.backtracks = 0
+        self.solutions = 0
+        self.time = 0.0
+        self.depth_nodes = []
+        self.depth_branches = []
+        self.on_node = on_node
+        self.on_solution = on_solution
+        self.on_backtrack = on_backtrack
+        self.count_updates = count_updates
+        self._start = None
+
+    def start(self):
+        """Start timing a search.
+
+        :return: None
+        """
+        self._start = time.perf_counter()
+
+    def stop(self):
+        """Stop timing a search.
+
+        :return: None
+        """
+        if self._start is not None:
+            self.time += time.perf_counter() - self._start
+            self._start = None
+
+    def node(self, depth, branches):
+        """Record a node of the search tree.
+
+        :param int depth: Depth of the node, 0 at the top.
+        :param int branches: Rows of the chosen column, 0 when every column is covered.
+        :return: None
+        """
+        self.nodes += 1
+        if depth == len(self.depth_nodes):
+            self.depth_nodes.append(0)
+            self.depth_branches.append(0)
+        self.depth_nodes[depth] += 1
+        self.depth_branches[depth] += branches
+        if self.on_node is not None:
+            self.on_node(depth, branches)
+
+    def solution(self, rows):
+        """Record a solution.
+
+        :param List[int] rows: Rows of the solution.
+        :return: None
+        """
+        self.solutions += 1
+        if self.on_solution is not None:
+            self.on_solution(rows)
+
+    def backtrack(self, depth):
+        """Record a row taken back out of the solution.
+
+        :param int depth: Depth of the node the row was chosen at.
+        :return: None
+        """
+        self.backtracks += 1
+        if self.on_backtrack is not None:
+            self.on_backtrack(depth)
+
+    def branching_factors(self):
+        """Return the average number of branches of the nodes at every depth.
+
+        :return List[float]: Branching factor by depth.
+        """
+        return [self.depth_branches[d] / self.depth_nodes[d] for d in range(0, len(self.depth_nodes))]
+
+    def as_dict(self):
+        """Return the statistics as a dictionary, for export.
+
+        :return dict: Counts, time and branching factors.
+        """
+        return {
+            "nodes": self.nodes,
+            "updates": self.updates,
+            "backtracks": self.backtracks,
+            "solutions": self.solutions,
+            "time": self.time,
+            "depth_nodes": list(self.depth_nodes),
+            "branching_factors": self.branching_factors(),
+        }
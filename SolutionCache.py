@@ -0,0 +1,155 @@
+import os
+from collections import OrderedDict
+
+from Canonical import canonical_form
+from PuzzleIO import format_grid, parse_puzzle
+
+# Written in place of the solution of puzzles without one
+UNSOLVABLE = "unsolvable"
+
+
+class SolutionCache:
+    """Bounded cache of solutions, keyed by the canonical form of the puzzles, so a
+    puzzle that is a symmetry of a cached one is answered without searching. Puzzles
+    are also kept as they were given, so exact repeats skip the canonical form. The
+    least recently used entry is dropped once the cache is full.
+
+    :param int capacity: Most entries kept.
+    :param OrderedDict entries: Solution of every canonical grid and of every puzzle
+    as given on one line, None if there is none, least recently used first.
+    :param int hits: Puzzles answered from the cache.
+    :param int misses: Puzzles solved and added to the cache.
+    :param int uncached: Puzzles solved without the cache, their canonical form
+    being too costly, see Canonical.canonical_form.
+    :param int evictions: Entries dropped to make room.
+    """
+
+    def __init__(self, capacity=10000, path=None):
+        """Initialize SolutionCache.
+
+        :param int capacity: Most entries kept.
+        :param str path: File to load entries from if it exists, see save.
+        """
+        if capacity < 1:
+            raise Exception("Capacity must be positive!")
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.evictions = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def solve(self, session, grid, stats=None, cancel=None):
+        """Solve a Sudoku puzzle, from the cache if it or a symmetry of it was solved
+        before. A puzzle seen before exactly as given is looked up by its string alone,
+        only other puzzles pay for their canonical form. A hit on a symmetry transforms
+        the cached solution back in O(n**4) steps.
+
+        :param SolverSession.SudokuSession session: Session used on a miss, for grids
+        of its size.
+        :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+        :param SearchStats stats: Statistics of the search on a miss, None to skip them.
+        :param cancel: Called at every node to cancel the search on a miss, see
+        Exact_Cover.search_all.
+        :return List[List[int]]: Returns the solved grid, None if there is no solution.
+        """
+        key = format_grid(grid)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key]
+            return None if solution is None else parse_puzzle(solution)[1]
+
+        form = canonical_form(session.n, grid)
+        if form is None:
+            self.uncached += 1
+            return session.solve(grid, stats, cancel)
+
+        canonical, transform = form
+        canonical_key = format_grid(canonical)
+        if canonical_key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(canonical_key)
+            solution = self.entries[canonical_key]
+        else:
+            self.misses += 1
+            solved = session.solve(canonical, stats, cancel)
+            solution = None if solved is None else format_grid(solved)
+            self.add(canonical_key, solution)
+
+        # Also keep the puzzle as given, so a repeat of it skips canonical_form
+        if solution is None:
+            self.add(key, None)
+            return None
+        solved = transform.undo(parse_puzzle(solution)[1])
+        self.add(key, format_grid(solved))
+        return solved
+
+    def add(self, key, solution):
+        """Add an entry, dropping the least recently used ones beyond capacity.
+
+        :param str key: Canonical grid, or puzzle as given, on one line.
+        :param str solution: Its solution on one line, None if there is none.
+        :return: None
+        """
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self):
+        """Return the share of puzzles answered from the cache.
+
+        :return float: Hits over every solved puzzle, 0.0 before the first one.
+        """
+        total = self.hits + self.misses + self.uncached
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Return the counters of the cache.
+
+        :return Dict[str, float]: Hits, misses, uncached puzzles, evictions, number of
+        entries and hit rate.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "hit_rate": self.hit_rate(),
+        }
+
+    def save(self, path):
+        """Write every entry to path, one per line as the canonical grid and the
+        solution separated by a tab, least recently used first. The file is written
+        next to path first and then moved in place.
+
+        :param str path: Path of the file.
+        :return: None
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(temp_path, "w") as out:
+            for key, solution in self.entries.items():
+                out.write("%s\t%s\n" % (key, UNSOLVABLE if solution is None else solution))
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """Add the entries written by save, as the most recently used ones.
+
+        :param str path: Path of the file.
+        :return: None
+        """
+        with open(path) as source:
+            for line in source:
+                if not line.strip():
+                    continue
+                key, solution = line.split()
+                self.add(key, None if solution == UNSOLVABLE else solution)
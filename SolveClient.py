@@ -0,0 +1,94 @@
+import http.client
+import json
+
+from PuzzleIO import format_grid
+
+# Port SolveServer listens on by default
+DEFAULT_PORT = 8765
+
+
+class SolveClient:
+    """Client of a SolveServer, keeping one connection open for all its requests.
+
+    :param str host: Host of the server.
+    :param int port: Port of the server.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=60.0):
+        """Initialize SolveClient. The connection is opened by the first request.
+
+        :param str host: Host of the server.
+        :param int port: Port of the server.
+        :param float timeout: Seconds to wait for the server, None to wait forever.
+        """
+        self.host = host
+        self.port = port
+        self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def __enter__(self):
+        """Use the client in a with block, closing it at the end."""
+        return self
+
+    def __exit__(self, *exc):
+        """Close the client at the end of a with block."""
+        self.close()
+
+    def solve(self, puzzle, timeout=None):
+        """Solve one puzzle.
+
+        :param puzzle: The puzzle on one line, see PuzzleIO.parse_puzzle, or its rows.
+        :param float timeout: Seconds the server may spend, None for its default.
+        :return Tuple[str, str]: Returns the solution on one line, None if there is
+        none, and the status: solved, unsolvable, invalid, timeout, or error if the
+        server failed to solve it.
+        """
+        request = {"puzzle": _line(puzzle)}
+        if timeout is not None:
+            request["timeout"] = timeout
+        response = self._request("POST", "/solve", request)
+        return response["solution"], response["status"]
+
+    def solve_many(self, puzzles, timeout=None):
+        """Solve puzzles in one request, which the server spreads over its workers.
+
+        :param Iterable puzzles: Puzzles on one line, or their rows.
+        :param float timeout: Seconds the server may spend on the whole request, None
+        for its default.
+        :return List[Tuple[str, str]]: Returns the solution and status of every
+        puzzle, in order, see solve.
+        """
+        request = {"puzzles": [_line(puzzle) for puzzle in puzzles]}
+        if timeout is not None:
+            request["timeout"] = timeout
+        response = self._request("POST", "/solve", request)
+        return [(result["solution"], result["status"]) for result in response["results"]]
+
+    def stats(self):
+        """Return the counters of the server, see SolveServer.Counters.as_dict.
+
+        :return dict: The counters.
+        """
+        return self._request("GET", "/stats")
+
+    def close(self):
+        """Close the connection.
+
+        :return: None
+        """
+        self._connection.close()
+
+    def _request(self, method, path, body=None):
+        """Send a request and decode the JSON response, raising on errors."""
+        data = None if body is None else json.dumps(body).encode()
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        self._connection.request(method, path, data, headers)
+        response = self._connection.getresponse()
+        result = json.loads(response.read().decode())
+        if response.status != 200:
+            raise Exception(result.get("error", "Request failed!"))
+        return result
+
+
+def _line(puzzle):
+    """Return a puzzle on one line, formatting it if given as rows."""
+    return puzzle if isinstance(puzzle, str) else format_grid(puzzle)
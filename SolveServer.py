@@ -0,0 +1,480 @@
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Pool
+
+import ParallelSolver
+from BatchSolver import INVALID, SOLVED, UNSOLVABLE
+from SearchStats import Cancelled
+from SolveClient import DEFAULT_PORT
+
+# Status of puzzles whose deadline passed before they were solved
+TIMEOUT = "timeout"
+
+# Status of puzzles whose solve failed in the server, not because of the puzzle
+ERROR = "error"
+
+# Latencies kept for percentiles
+LATENCY_WINDOW = 10000
+
+# Extra seconds a request waits for workers to report a timeout themselves
+TIMEOUT_GRACE = 1.0
+
+def _past(deadline):
+    """Return a check that the deadline has passed, to cancel a search with.
+
+    :param float deadline: Deadline, as time.time().
+    :return: Callable returning whether the deadline has passed.
+    """
+    return lambda: time.time() > deadline
+
+
+def _solve_batch(batch):
+    """Solve a batch of puzzles in a worker process set up by
+    ParallelSolver._init_worker. A search still running at its deadline is
+    abandoned, which restores the matrix for the next puzzle.
+
+    :param List[Tuple[str, float]] batch: Line and deadline, as time.time(), of every
+    puzzle, None for no deadline.
+    :return List[Tuple[str, str]]: Solution on one line, None if there is none, and
+    status of every puzzle.
+    """
+    results = []
+    for line, deadline in batch:
+        if deadline is not None and time.time() > deadline:
+            results.append((None, TIMEOUT))
+            continue
+
+        cancel = None
+        if deadline is not None:
+            cancel = _past(deadline)
+
+        try:
+            solution, status = ParallelSolver._solver.solve_line(line, cancel=cancel)
+        except Cancelled:
+            results.append((None, TIMEOUT))
+            continue
+        except Exception:
+            # A bug, not a bad puzzle, so it is shown and the next puzzles still run
+            traceback.print_exc()
+            results.append((None, ERROR))
+            continue
+
+        results.append((solution if status == SOLVED else None, status))
+    return results
+
+
+class Counters:
+    """Counters of a SolveServer, updated from every request thread.
+
+    :param float start: Time the server started, as time.perf_counter().
+    :param int requests: Requests answered.
+    :param int puzzles: Puzzles answered.
+    :param int batches: Batches sent to the workers.
+    :param Dict[str, int] statuses: Number of puzzles by status.
+    :param deque latencies: Milliseconds taken by the latest requests.
+    """
+
+    def __init__(self):
+        """Initialize Counters at zero."""
+        self.start = time.perf_counter()
+        self.requests = 0
+        self.puzzles = 0
+        self.batches = 0
+        self.statuses = {SOLVED: 0, UNSOLVABLE: 0, INVALID: 0, TIMEOUT: 0, ERROR: 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._lock = threading.Lock()
+
+    def batch(self):
+        """Count a batch sent to the workers."""
+        with self._lock:
+            self.batches += 1
+
+    def request(self, statuses, latency):
+        """Count an answered request.
+
+        :param List[str] statuses: Status of every puzzle of the request.
+        :param float latency: Milliseconds from receiving the request to answering it.
+        :return: None
+        """
+        with self._lock:
+            self.requests += 1
+            self.puzzles += len(statuses)
+            for status in statuses:
+                self.statuses[status] += 1
+            self.latencies.append(latency)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self):
+        """Return the counters, with latencies of the latest requests as percentiles.
+
+        :return dict: Uptime, requests, puzzles, batches, puzzles by status,
+        throughput and latencies in milliseconds.
+        """
+        with self._lock:
+            uptime = time.perf_counter() - self.start
+            latencies = sorted(self.latencies)
+
+            def percentile(p):
+                return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+
+            return {
+                "uptime": uptime,
+                "requests": self.requests,
+                "puzzles": self.puzzles,
+                "batches": self.batches,
+                "statuses": dict(self.statuses),
+                "puzzles_per_second": self.puzzles / uptime if uptime > 0 else 0.0,
+                "mean_batch_size": self.puzzles / self.batches if self.batches else 0.0,
+                "latency_ms": {
+                    "mean": self.total_latency / self.requests if self.requests else 0.0,
+                    "max": self.max_latency,
+                    "p50": percentile(0.5),
+                    "p90": percentile(0.9),
+                    "p99": percentile(0.99),
+                },
+            }
+
+
+class Batcher(threading.Thread):
+    """Thread that combines the puzzles of concurrent requests into batches for the
+    worker pool. A batch is sent once it is full, or once the oldest puzzle in it has
+    waited batch_wait seconds.
+
+    :param int batch_size: Most puzzles in a batch.
+    :param float batch_wait: Seconds a puzzle waits for others to join its batch.
+    """
+
+    def __init__(self, pool, counters, batch_size=64, batch_wait=0.002):
+        """Initialize Batcher, which still has to be started.
+
+        :param Pool pool: Worker pool, its workers set up by ParallelSolver._init_worker.
+        :param Counters counters: Counters of the server.
+        :param int batch_size: Most puzzles in a batch.
+        :param float batch_wait: Seconds a puzzle waits for others to join its batch.
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.pool = pool
+        self.counters = counters
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue = queue.Queue()
+
+    def submit(self, lines, deadline):
+        """Queue puzzles to be solved.
+
+        :param List[str] lines: Puzzles, one per line.
+        :param float deadline: Time to give up at, as time.time(), None for never.
+        :return List[Future]: Futures of the solution and status of every puzzle.
+        """
+        futures = []
+        for line in lines:
+            future = Future()
+            self._queue.put((line, deadline, future))
+            futures.append(future)
+        return futures
+
+    def stop(self):
+        """End the thread once the queued puzzles are sent.
+
+        :return: None
+        """
+        self._queue.put(None)
+
+    def run(self):
+        """Send batches to the pool until stopped.
+
+        :return: None
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            end = time.perf_counter() + self.batch_wait
+            stopped = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, end - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopped = True
+                    break
+                batch.append(item)
+
+            futures = [future for line, deadline, future in batch]
+            self.counters.batch()
+            self.pool.apply_async(_solve_batch, ([(line, deadline) for line, deadline, future in batch],),
+                                  callback=lambda results, futures=futures: _resolve(futures, results),
+                                  error_callback=lambda error, futures=futures: _fail(futures, error))
+            if stopped:
+                return
+
+
+def _resolve(futures, results):
+    """Hand the results of a batch to the requests waiting for them."""
+    for future, result in zip(futures, results):
+        future.set_result(result)
+
+
+def _fail(futures, error):
+    """Hand the error of a batch to the requests waiting for it."""
+    for future in futures:
+        future.set_exception(error)
+
+
+class SolveHandler(BaseHTTPRequestHandler):
+    """Answers POST /solve and GET /stats, see SolveServer."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        """Answer GET /stats with the counters of the server."""
+        if self.path != "/stats":
+            self.send_json(404, {"error": "Not found!"})
+            return
+        self.send_json(200, self.server.solve_server.counters.as_dict())
+
+    def do_POST(self):
+        """Answer POST /solve, with a JSON object holding either a puzzle or a list of
+        puzzles, and optionally a timeout in seconds."""
+        if self.path != "/solve":
+            self.send_json(404, {"error": "Not found!"})
+            return
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode())
+            single = "puzzle" in request
+            lines = [request["puzzle"]] if single else request["puzzles"]
+            timeout = request.get("timeout", self.server.solve_server.timeout)
+            if not all(isinstance(line, str) for line in lines):
+                raise ValueError()
+            if timeout is not None and timeout <= 0:
+                raise ValueError()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.send_json(400, {"error": "Invalid request!"})
+            return
+
+        results = self.server.solve_server.solve(lines, timeout)
+        self.server.solve_server.counters.request([status for solution, status in results],
+                                                  (time.perf_counter() - start) * 1000)
+        if single:
+            solution, status = results[0]
+            self.send_json(200, {"solution": solution, "status": status})
+        else:
+            self.send_json(200, {"results": [{"solution": solution, "status": status}
+                                             for solution, status in results]})
+
+    def send_json(self, code, body):
+        """Send a JSON response.
+
+        :param int code: HTTP status code.
+        :param dict body: The response.
+        :return: None
+        """
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Only log requests when the server is verbose."""
+        if self.server.solve_server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class SolveServer:
+    """Long running solve service on localhost. Worker processes build their sessions
+    once at start, puzzles of concurrent requests are combined into batches, and
+    every request can have a timeout.
+
+    :param Tuple[str, int] address: Host and port the server listens on, once started.
+    :param Counters counters: Latency and throughput counters.
+    :param float timeout: Default timeout of requests in seconds, None for none.
+    :param bool verbose: Whether to log every request to stderr.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, workers=1, engine="object",
+                 cache=False, sizes=(3,), batch_size=64, batch_wait=0.002, timeout=10.0,
+                 verbose=False):
+        """Initialize SolveServer, which still has to be started.
+
+        :param str host: Host to listen on, only local ones are meant to be used.
+        :param int port: Port to listen on, 0 for any free one.
+        :param int workers: Number of worker processes.
+        :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+        :param bool cache: Whether to load matrices from the template cache.
+        :param Iterable[int] sizes: Values of n every worker builds a session for up front.
+        :param int batch_size: Most puzzles sent to a worker at once.
+        :param float batch_wait: Seconds a puzzle waits for others to join its batch.
+        :param float timeout: Default timeout of requests in seconds, None for none.
+        :param bool verbose: Whether to log every request to stderr.
+        """
+        self.address = (host, port)
+        self.workers = workers
+        self.engine = engine
+        self.cache = cache
+        self.sizes = tuple(sizes)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.timeout = timeout
+        self.verbose = verbose
+        self.counters = None
+        self._pool = None
+        self._batcher = None
+        self._http = None
+        self._thread = None
+
+    def __enter__(self):
+        """Start the server for a with block, stopping it at the end."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        """Stop the server at the end of a with block."""
+        self.stop()
+
+    def start(self):
+        """Start the workers, wait until they are ready and start listening.
+
+        :return: None
+        """
+        self.counters = Counters()
+        self._pool = Pool(self.workers, ParallelSolver._init_worker, (self.engine, self.cache, self.sizes))
+        # Workers build their sessions before taking their first task, so the first
+        # requests only wait for workers that are slow to start
+        self._pool.map(_solve_batch, [[]] * self.workers, chunksize=1)
+
+        self._batcher = Batcher(self._pool, self.counters, self.batch_size, self.batch_wait)
+        self._batcher.start()
+        self._http = ThreadingHTTPServer(self.address, SolveHandler)
+        self._http.daemon_threads = True
+        self._http.solve_server = self
+        self.address = self._http.server_address[:2]
+        self._thread = threading.Thread(target=self._http.serve_forever, daemon=True)
+        self._thread.start()
+
+    def wait(self):
+        """Block until the server stops listening.
+
+        :return: None
+        """
+        self._thread.join()
+
+    def stop(self):
+        """Stop listening, then stop the workers.
+
+        :return: None
+        """
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+        if self._batcher is not None:
+            self._batcher.stop()
+            self._batcher.join()
+            self._batcher = None
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def solve(self, lines, timeout=None):
+        """Solve puzzles through the batcher, waiting at most timeout seconds. Puzzles
+        not answered by then are reported as timed out.
+
+        :param List[str] lines: Puzzles, one per line.
+        :param float timeout: Seconds to wait, None to wait until they are solved.
+        :return List[Tuple[str, str]]: Solution on one line, None if there is none,
+        and status of every puzzle: solved, unsolvable, invalid, timeout or error.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        futures = self._batcher.submit(lines, deadline)
+        results = []
+        for future in futures:
+            try:
+                if deadline is None:
+                    results.append(future.result())
+                else:
+                    # Workers report timeouts themselves, unless all of them are busy
+                    wait = max(0.0, deadline - time.time()) + TIMEOUT_GRACE
+                    results.append(future.result(timeout=wait))
+            except FutureTimeout:
+                results.append((None, TIMEOUT))
+            except Exception:
+                # The batch failed in its worker, see _fail
+                results.append((None, ERROR))
+        return results
+
+
+def parse_args(argv):
+    """Parse the command line arguments.
+
+    :param List[str] argv: Arguments, without the program name.
+    :return argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Serve Sudoku solutions over HTTP on localhost.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="host to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help="port to listen on (default %d)" % DEFAULT_PORT)
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes (default 1)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3],
+                        help="values of n every worker prepares for (default 3)")
+    parser.add_argument("--engine", choices=("object", "array"), default="object",
+                        help="dancing links engine (default object)")
+    parser.add_argument("--cache", action="store_true",
+                        help="load matrices from the template cache, array engine only")
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="most puzzles sent to a worker at once (default 64)")
+    parser.add_argument("--batch-wait", type=float, default=0.002,
+                        help="seconds a puzzle waits for others to join its batch (default 0.002)")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="default timeout of requests in seconds, 0 for none (default 10)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="log every request to stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the server, as given by the command line, until interrupted.
+
+    :param List[str] argv: Arguments, None for sys.argv.
+    :return int: Exit status.
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.cache and args.engine != "array":
+        print("--cache needs --engine array", file=sys.stderr)
+        return 2
+
+    server = SolveServer(args.host, args.port, args.workers, args.engine, args.cache, args.sizes,
+                         args.batch_size, args.batch_wait, args.timeout or None, args.verbose)
+    server.start()
+    print("Listening on http://%s:%d" % server.address, file=sys.stderr)
+    try:
+        server.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
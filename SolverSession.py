@@ -0,0 +1,172 @@
+from contextlib import contextmanager
+
+from Exact_Cover import *
+from Propagation import is_complete, propagate
+from TemplateCache import get_cached_sudoku_matrix
+
+
+class SudokuSession:
+    """Solves any number of Sudoku puzzles of one size against a single exact
+    cover matrix. Every solve covers the givens, searches and then uncovers
+    everything again in reverse order, so the matrix is only built once.
+
+    :param int n: n**2 is size of the Sudoku grids.
+    :param RootObject matrix: The exact cover matrix, or an ArrayMatrix.
+    :param bool debug: Whether to check that the matrix is restored after every call.
+    :param bool propagation: Whether forced cells are filled before searching.
+    """
+
+    def __init__(self, n=3, engine="object", debug=False, cache=False, propagation=True):
+        """Initialize SudokuSession, building its exact cover matrix.
+
+        :param int n: n**2 is size of the Sudoku grids.
+        :param str engine: "object" or "array", see LinkedMatrix.build_linked_matrix.
+        :param bool debug: Whether to check that the matrix is restored after every call.
+        :param bool cache: Whether to load the matrix from the template cache,
+        only for the array engine.
+        :param bool propagation: Whether to fill forced cells with Propagation.propagate
+        before searching.
+        """
+        self.n = n
+        self.propagation = propagation
+        if cache:
+            if engine != "array":
+                raise Exception("Only the array engine can be cached!")
+            self.matrix = get_cached_sudoku_matrix(n)
+        else:
+            self.matrix = generate_sudoku_matrix(n, engine)
+        self.debug = debug
+
+    def solve(self, grid, stats=None, cancel=None):
+        """Solve a Sudoku puzzle.
+
+        :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+        :param SearchStats stats: Statistics of the search, None to skip them.
+        :param cancel: Called at every node to cancel the search, see Exact_Cover.search_all.
+        :return List[List[int]]: Returns the solved grid, None if there is no solution.
+        """
+        if self.propagation:
+            grid = propagate(self.n, grid)
+            if grid is None or is_complete(grid):
+                return grid
+
+        with self._givens(grid) as rows:
+            if rows is None:
+                return None
+
+            # Close the search before the givens are uncovered
+            solutions = search_all(self.matrix, stats, cancel)
+            try:
+                solution = next(solutions, None)
+            finally:
+                solutions.close()
+
+            if solution is None:
+                return None
+            return self.to_grid(rows + solution)
+
+    def count_solutions(self, grid, limit=None, stats=None, cancel=None):
+        """Count the solutions of a Sudoku puzzle.
+
+        :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+        :param int limit: Stop counting once limit solutions are found, None to count all
+        :param SearchStats stats: Statistics of the search, None to skip them.
+        :param cancel: Called at every node to cancel the search, see Exact_Cover.search_all.
+        :return int: Returns the number of solutions, at most limit
+        """
+        if self.propagation:
+            grid = propagate(self.n, grid)
+            if grid is None:
+                return 0
+            if is_complete(grid):
+                return 1
+
+        with self._givens(grid) as rows:
+            if rows is None:
+                return 0
+            return count_solutions(self.matrix, limit, stats, cancel)
+
+    def hint(self, grid, row, col):
+        """Find the numbers that can go in one cell, without solving the whole grid.
+        A cell that is given, or forced by propagation, can only hold its number, so
+        the search just checks that the grid has a solution at all. Otherwise the
+        search branches on the cell first: every number left for it is placed in
+        turn, and kept if the rest of the grid has a solution.
+
+        :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+        :param int row: Row of the cell, from 1 to n**2.
+        :param int col: Column of the cell, from 1 to n**2.
+        :return List[int]: Returns the possible numbers in increasing order, an empty
+        list if there is no solution.
+        """
+        size = self.n**2
+        if not (0 < row <= size and 0 < col <= size):
+            raise Exception("Cell out of bounds!")
+
+        if self.propagation:
+            grid = propagate(self.n, grid)
+            if grid is None:
+                return []
+
+        with self._givens(grid) as rows:
+            if rows is None:
+                return []
+            if grid[row - 1][col - 1]:
+                solutions = search_all(self.matrix)
+                try:
+                    if next(solutions, None) is None:
+                        return []
+                finally:
+                    solutions.close()
+                return [grid[row - 1][col - 1]]
+
+            numbers = []
+            for number in range(1, size + 1):
+                # Numbers already in the row, column or box of the cell are covered
+                row_number = encode_candidate(self.n, number, row, col)
+                if not self.matrix.select_row(row_number):
+                    continue
+
+                solutions = search_all(self.matrix)
+                try:
+                    if next(solutions, None) is not None:
+                        numbers.append(number)
+                finally:
+                    solutions.close()
+                    self.matrix.unselect_row(row_number)
+            return numbers
+
+    def is_unique(self, grid):
+        """Returns whether a Sudoku puzzle has exactly one solution.
+
+        :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+        :return bool: Whether grid has a unique solution
+        """
+        return self.count_solutions(grid, 2) == 1
+
+    def to_grid(self, rows):
+        """Convert rows of the exact cover matrix to a grid.
+
+        :param List[int] rows: Rows of the matrix, starting at 1.
+        :return List[List[int]]: Rows of the grid, 0 for empty cells.
+        """
+        return rows_to_grid(self.n, rows)
+
+    @contextmanager
+    def _givens(self, grid):
+        """Cover the givens of grid for the duration of a with block, then uncover them.
+
+        :param List[List[int]] grid: Rows of the grid, 0 for empty cells.
+        :return List[int]: Yields the rows of the givens, None if they conflict.
+        """
+        if self.debug:
+            state = self.matrix.snapshot()
+
+        rows = cover_givens(self.matrix, self.n, grid)
+        try:
+            yield rows
+        finally:
+            if rows is not None:
+                uncover_givens(self.matrix, rows)
+            if self.debug and self.matrix.snapshot() != state:
+                raise Exception("Cover matrix was not restored!")
@@ -0,0 +1,124 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from ArrayMatrix import ARRAY_NAMES, array_matrix_from_arrays
+from Exact_Cover import generate_sudoku_col_headers, generate_sudoku_matrix
+
+# Increase whenever the layout of the matrix or of the file changes
+FORMAT_VERSION = 1
+
+MAGIC = b"DLXT"
+
+# Magic, format version, int size, little endian, n, then the length of
+# every array in ARRAY_NAMES
+HEADER = struct.Struct("<4sIII" + "I" * (1 + len(ARRAY_NAMES)))
+
+
+def default_cache_dir():
+    """Return the directory templates are cached in, from the SUDOKU_CACHE_DIR
+    environment variable or else ~/.cache/SudokuSolver.
+
+    :return str: Path of the cache directory.
+    """
+    return os.environ.get("SUDOKU_CACHE_DIR",
+                          os.path.join(os.path.expanduser("~"), ".cache", "SudokuSolver"))
+
+
+def template_path(n, cache_dir=None):
+    """Return the path of the cached template of Sudoku puzzles with size n**2.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param str cache_dir: Cache directory, None for default_cache_dir().
+    :return str: Path of the template file.
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    return os.path.join(cache_dir, "sudoku_n%d_v%d.dlx" % (n, FORMAT_VERSION))
+
+
+def save_template(matrix, n, path):
+    """Write the exact cover ArrayMatrix of Sudoku puzzles with size n**2 to path.
+    The file is written next to path first and then moved in place, so readers
+    never see half a template.
+
+    :param ArrayMatrix matrix: Matrix from generate_sudoku_matrix(n, "array").
+    :param int n: n**2 is size of Sudoku grid.
+    :param str path: Path of the template file.
+    :return: None
+    """
+    arrays = matrix.to_arrays()
+    lengths = [len(arrays[name]) for name in ARRAY_NAMES]
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, array("i").itemsize,
+                                sys.byteorder == "little", n, *lengths))
+            for name in ARRAY_NAMES:
+                arrays[name].tofile(f)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+
+
+def load_template(n, path):
+    """Read the exact cover ArrayMatrix of Sudoku puzzles with size n**2 from path,
+    by memory mapping the file and copying every array out in one go.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param str path: Path of the template file.
+    :return ArrayMatrix: Returns the matrix, None if the file is missing or stale.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) < HEADER.size:
+                return None
+
+            header = HEADER.unpack_from(mm, 0)
+            if header[:5] != (MAGIC, FORMAT_VERSION, array("i").itemsize,
+                              sys.byteorder == "little", n):
+                return None
+
+            lengths = header[5:]
+            itemsize = array("i").itemsize
+            if len(mm) != HEADER.size + sum(lengths) * itemsize:
+                return None
+
+            arrays = {}
+            offset = HEADER.size
+            for name, length in zip(ARRAY_NAMES, lengths):
+                arrays[name] = array("i")
+                arrays[name].frombytes(mm[offset:offset + length * itemsize])
+                offset += length * itemsize
+    except (OSError, ValueError):
+        return None
+
+    return array_matrix_from_arrays(generate_sudoku_col_headers(n), arrays)
+
+
+def get_cached_sudoku_matrix(n, cache_dir=None):
+    """Return the exact cover ArrayMatrix of Sudoku puzzles with size n**2 from the
+    template cache, building and caching it first if it is missing or stale.
+
+    :param int n: n**2 is size of Sudoku grid.
+    :param str cache_dir: Cache directory, None for default_cache_dir().
+    :return ArrayMatrix: Returns the matrix.
+    """
+    path = template_path(n, cache_dir)
+    matrix = load_template(n, path)
+    if matrix is None:
+        matrix = generate_sudoku_matrix(n, "array")
+        try:
+            save_template(matrix, n, path)
+        except OSError:
+            # A read-only cache only costs the next start the build again
+            pass
+    return matrix
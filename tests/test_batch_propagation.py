@@ -0,0 +1,67 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from BatchPropagation import (CONTRADICTION, SOLVED, candidates_to_grids, eliminate, grids_to_candidates,
+                              solve_batch)
+from Generator import generate_puzzles
+from PuzzleIO import parse_puzzle
+from SolverSession import SudokuSession
+
+LINES = [
+    "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..",
+    # Conflicting givens
+    "11...............................................................................",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    # No solution, but no contradiction for singles either
+    "....5..6.7891........7891..3....5.7......2.4.............5...9.....3......48...3.",
+    "." * 81,
+]
+
+
+def batch(n):
+    """A batch of given puzzles, contradictory and unsolvable ones among them, and
+    generated ones."""
+    if n == 3:
+        grids = [parse_puzzle(line)[1] for line in LINES]
+    else:
+        grids = [parse_puzzle(line)[1] for line in ("." * 16, "11" + "." * 14, ".12.3...4.......")]
+    grids.extend(puzzle for puzzle, solution in generate_puzzles(n, 6, seed=n))
+    return grids
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_eliminate_matches_search(n):
+    grids = batch(n)
+    session = SudokuSession(n, propagation=False)
+    cand = grids_to_candidates(n, grids)
+    status = eliminate(n, cand)
+    values = candidates_to_grids(cand)
+    for grid, state, value in zip(grids, status, values.tolist()):
+        solution = session.solve(grid)
+        if state == CONTRADICTION:
+            assert solution is None
+            continue
+        if solution is None:
+            continue
+        assert all(value[i][j] in (0, solution[i][j]) for i in range(0, n**2) for j in range(0, n**2))
+        if state == SOLVED:
+            assert value == solution
+    assert CONTRADICTION in status and SOLVED in status
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_solve_batch(n):
+    grids = batch(n)
+    session = SudokuSession(n, propagation=False)
+    expected = [session.solve(grid) for grid in grids]
+    assert None in expected
+    assert solve_batch(n, grids) == expected
+    assert solve_batch(n, np.array(grids), session, chunk_size=3) == expected
+
+
+def test_invalid_grids():
+    with pytest.raises(Exception):
+        grids_to_candidates(2, [[[0] * 4] * 3])
+    with pytest.raises(Exception):
+        grids_to_candidates(2, [[[5] * 4] * 4])
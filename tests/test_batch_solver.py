@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from BatchSolver import INVALID, SOLVED, UNSOLVABLE, BatchSolver
+from SearchStats import Cancelled, SearchStats
+from SolutionCache import SolutionCache
+
+PUZZLE = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+
+# Left with empty cells by propagation, so it is searched
+HARD = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+
+
+def test_solve_line():
+    solver = BatchSolver()
+    solution, status = solver.solve_line(PUZZLE)
+    assert status == SOLVED
+    assert all(a == b for a, b in zip(PUZZLE, solution) if a != ".")
+    assert solver.solve_line("11" + "." * 79) == (UNSOLVABLE, UNSOLVABLE)
+    assert solver.solve_line("12345") == (INVALID, INVALID)
+    assert solver.solve_line("Z" * 81) == (INVALID, INVALID)
+    assert solver.counts == {SOLVED: 1, UNSOLVABLE: 1, INVALID: 2}
+
+
+def test_solve_line_raises_engine_errors():
+    solver = BatchSolver()
+
+    def broken(grid, stats=None, cancel=None):
+        raise RuntimeError("broken")
+
+    solver.session(3).solve = broken
+    with pytest.raises(RuntimeError):
+        solver.solve_line(PUZZLE)
+    assert solver.counts[INVALID] == 0
+
+
+def test_solution_cache():
+    cache = SolutionCache(capacity=2)
+    solver = BatchSolver(solution_cache=cache)
+    # The transposed puzzle is a symmetry of the first one
+    transposed = "".join(PUZZLE[j * 9 + i] for i in range(0, 9) for j in range(0, 9))
+    first, status = solver.solve_line(PUZZLE)
+    second, status = solver.solve_line(transposed)
+    assert status == SOLVED
+    assert second == "".join(first[j * 9 + i] for i in range(0, 9) for j in range(0, 9))
+    assert cache.hits == 1 and cache.misses == 1
+
+
+@pytest.mark.parametrize("solution_cache", [None, SolutionCache()])
+def test_solve_line_cancel(solution_cache):
+    solver = BatchSolver(solution_cache=solution_cache)
+    with pytest.raises(Cancelled):
+        solver.solve_line(HARD, cancel=lambda: True)
+    stats = SearchStats()
+    assert solver.solve_line(HARD, stats)[1] == SOLVED
+    assert stats.nodes > 0
+    assert solver.counts[SOLVED] == 1
+
+
+def test_solve_stream():
+    solver = BatchSolver(engine="array")
+    out = io.StringIO()
+    solver.solve_stream([PUZZLE + "\n", "\n", "12345\n"], out)
+    lines = out.getvalue().split()
+    assert len(lines) == 2 and lines[1] == INVALID
@@ -0,0 +1,59 @@
+import pytest
+
+from ArrayMatrix import ArrayMatrix
+from Exact_Cover import count_solutions, generate_sudoku_matrix, search_all
+from SearchStats import SearchStats
+
+
+def bucket_order(matrix):
+    """Columns of every size bucket, in order."""
+    order = []
+    if isinstance(matrix, ArrayMatrix):
+        BR = matrix.BR
+        for head in range(matrix.num_cols + 1, len(BR)):
+            c = BR[head]
+            columns = []
+            while c != head:
+                columns.append(c)
+                c = BR[c]
+            order.append(columns)
+    else:
+        for head in matrix.buckets:
+            c = head.BR
+            columns = []
+            while c != head:
+                columns.append(c.N)
+                c = c.BR
+            order.append(columns)
+    return order
+
+
+def first_solutions(matrix, count):
+    solutions = []
+    for rows in search_all(matrix):
+        solutions.append(rows)
+        if len(solutions) == count:
+            break
+    return solutions
+
+
+@pytest.mark.parametrize("engine", ["object", "array"])
+def test_bucket_order_restored(engine):
+    matrix = generate_sudoku_matrix(3, engine, buckets=True)
+    state = matrix.snapshot()
+    order = bucket_order(matrix)
+    first = first_solutions(matrix, 20)
+    assert bucket_order(matrix) == order
+    assert matrix.snapshot() == state
+    assert first_solutions(matrix, 20) == first
+
+
+@pytest.mark.parametrize("engine", ["object", "array"])
+def test_bucket_search_reproducible(engine):
+    matrix = generate_sudoku_matrix(2, engine, buckets=True)
+    counts = []
+    for k in range(0, 3):
+        stats = SearchStats()
+        assert count_solutions(matrix, None, stats) == 288
+        counts.append((stats.nodes, stats.updates))
+    assert counts[0] == counts[1] == counts[2]
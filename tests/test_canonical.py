@@ -0,0 +1,101 @@
+from random import Random
+
+from Canonical import Transform, canonical_form
+import SolutionCache as solution_cache
+from PuzzleIO import parse_puzzle
+from SolutionCache import SolutionCache
+from SolverSession import SudokuSession
+
+PUZZLE = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+UNSOLVABLE = "....5..6.7891........7891..3....5.7......2.4.............5...9.....3......48...3."
+
+
+def random_transform(n, random):
+    """A random symmetry of grids of size n**2."""
+    def order():
+        blocks = list(range(0, n))
+        random.shuffle(blocks)
+        order = []
+        for b in blocks:
+            inner = list(range(0, n))
+            random.shuffle(inner)
+            order.extend(b * n + k for k in inner)
+        return order
+
+    labels = list(range(1, n**2 + 1))
+    random.shuffle(labels)
+    return Transform(random.random() < 0.5, order(), order(), [0] + labels)
+
+
+def test_undo():
+    n, grid = parse_puzzle(PUZZLE)
+    random = Random(1)
+    for k in range(0, 20):
+        transform = random_transform(n, random)
+        assert transform.undo(transform.apply(grid)) == grid
+
+
+def test_symmetries_share_canonical_form():
+    n, grid = parse_puzzle(PUZZLE)
+    canonical, transform = canonical_form(n, grid)
+    assert transform.apply(grid) == canonical
+    random = Random(2)
+    for k in range(0, 10):
+        other = random_transform(n, random).apply(grid)
+        assert canonical_form(n, other)[0] == canonical
+
+
+def test_conflict():
+    n, grid = parse_puzzle("11" + "." * 79)
+    assert canonical_form(n, grid) is None
+
+
+def test_cache_undoes_transform(tmp_path):
+    n, grid = parse_puzzle(PUZZLE)
+    session = SudokuSession(n)
+    cache = SolutionCache(capacity=4)
+    random = Random(3)
+    for k in range(0, 10):
+        other = random_transform(n, random).apply(grid)
+        assert cache.solve(session, other) == session.solve(other)
+    assert cache.misses == 1 and cache.hits == 9
+
+    path = str(tmp_path / "cache.txt")
+    cache.save(path)
+    loaded = SolutionCache(capacity=4, path=path)
+    assert loaded.entries == cache.entries
+    assert loaded.solve(session, grid) == session.solve(grid)
+    assert loaded.hits == 1
+
+
+def test_cache_eviction():
+    cache = SolutionCache(capacity=2)
+    for key in ("a", "b", "a", "c"):
+        cache.add(key, None)
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.evictions == 1
+
+
+def test_cache_repeat_skips_canonical_form(monkeypatch):
+    n, grid = parse_puzzle(PUZZLE)
+    session = SudokuSession(n)
+    cache = SolutionCache()
+    other = random_transform(n, Random(4)).apply(grid)
+    solution = cache.solve(session, other)
+    assert cache.solve(session, grid) == session.solve(grid)
+    assert cache.misses == 1 and cache.hits == 1
+
+    def fail(n, grid):
+        raise AssertionError("canonical_form called for a repeat")
+
+    monkeypatch.setattr(solution_cache, "canonical_form", fail)
+    assert cache.solve(session, other) == solution
+    assert cache.solve(session, grid) == session.solve(grid)
+    assert cache.hits == 3
+
+    # No conflicting givens, but no solution either
+    unsolvable = parse_puzzle(UNSOLVABLE)[1]
+    monkeypatch.undo()
+    assert cache.solve(session, unsolvable) is None
+    monkeypatch.setattr(solution_cache, "canonical_form", fail)
+    assert cache.solve(session, unsolvable) is None
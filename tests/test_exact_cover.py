@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+
+from Exact_Cover import (count_exact_covers, count_solutions, exact_cover_matrix, exact_covers,
+                         generate_queens_problem, generate_sudoku_matrix, get_sudoku_matrix, is_unique,
+                         search, search_all)
+from PuzzleIO import parse_puzzle
+from SearchStats import Cancelled, SearchStats
+
+PUZZLE = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+
+# The example of Knuth's paper, its only solution is rows 0, 3 and 4
+KNUTH_ROWS = [["C", "E", "F"], ["A", "D", "G"], ["B", "C", "F"], ["A", "D"], ["B", "G"], ["D", "E", "G"]]
+KNUTH_COLUMNS = ["A", "B", "C", "D", "E", "F", "G"]
+
+ENGINES = ["object", "array"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_search_all(engine):
+    matrix = generate_sudoku_matrix(2, engine)
+    solutions = list(search_all(matrix))
+    assert len(solutions) == 288
+    assert len(set(tuple(sorted(rows)) for rows in solutions)) == 288
+    assert all(len(rows) == 16 for rows in solutions)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_search_restores_matrix(engine):
+    matrix = generate_sudoku_matrix(2, engine)
+    state = matrix.snapshot()
+    solutions = search_all(matrix)
+    next(solutions)
+    solutions.close()
+    assert matrix.snapshot() == state
+    solution = []
+    assert search(0, matrix, solution)
+    assert len(solution) == 16
+    assert matrix.snapshot() == state
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_count_solutions_limit(engine):
+    matrix = generate_sudoku_matrix(2, engine)
+    state = matrix.snapshot()
+    assert count_solutions(matrix) == 288
+    assert count_solutions(matrix, 5) == 5
+    assert count_solutions(matrix, 1000) == 288
+    assert count_solutions(matrix, 0) == 0
+    with pytest.raises(Exception):
+        count_solutions(matrix, -1)
+    assert matrix.snapshot() == state
+
+
+def test_is_unique():
+    assert is_unique(parse_puzzle(PUZZLE)[1])
+    assert not is_unique([[0] * 4 for i in range(0, 4)])
+    assert not is_unique(parse_puzzle("11" + "." * 14)[1])
+
+
+def test_is_unique_threads():
+    grid = parse_puzzle(PUZZLE)[1]
+    results = []
+
+    def check():
+        results.append(all(is_unique(grid) for k in range(0, 20)))
+
+    threads = [threading.Thread(target=check) for k in range(0, 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 4
+    assert get_sudoku_matrix(3).snapshot() == generate_sudoku_matrix(3).snapshot()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stats(engine):
+    matrix = generate_sudoku_matrix(2, engine)
+    found = []
+    counted = SearchStats(on_solution=found.append)
+    uncounted = SearchStats(count_updates=False)
+    assert count_solutions(matrix, None, counted) == 288
+    assert count_solutions(matrix, None, uncounted) == 288
+    assert len(found) == counted.solutions == uncounted.solutions == 288
+    assert counted.nodes == uncounted.nodes
+    assert counted.backtracks == uncounted.backtracks
+    assert counted.updates > 0 and uncounted.updates == 0
+    assert sum(counted.depth_nodes) == counted.nodes
+    assert len(counted.branching_factors()) == len(counted.depth_nodes)
+    assert counted.as_dict()["nodes"] == counted.nodes
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_knuth_example(engine):
+    assert list(exact_covers(KNUTH_ROWS, KNUTH_COLUMNS, engine=engine)) == [[0, 3, 4]]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_secondary_columns(engine):
+    # Secondary columns may be left uncovered, but never covered twice
+    rows = [["a", "x"], ["b", "x"], ["a"], ["b"]]
+    solutions = sorted(exact_covers(rows, ["a", "b"], ["x"], engine))
+    assert solutions == [[0, 3], [1, 2], [2, 3]]
+    with pytest.raises(Exception):
+        exact_cover_matrix([["a", "y"]], ["a"], ["x"], engine)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_queens(engine):
+    expected = [1, 0, 0, 2, 10, 4, 40, 92]
+    for n in range(1, 9):
+        rows, primary, secondary = generate_queens_problem(n)
+        assert count_exact_covers(rows, primary, secondary, engine=engine) == expected[n - 1]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cancel(engine):
+    matrix = generate_sudoku_matrix(2, engine)
+    state = matrix.snapshot()
+    stats = SearchStats()
+    with pytest.raises(Cancelled):
+        count_solutions(matrix, None, stats, lambda: stats.nodes >= 10)
+    assert stats.nodes == 10
+    assert matrix.snapshot() == state
+    with pytest.raises(Cancelled):
+        list(search_all(matrix, cancel=lambda: True))
+    assert matrix.snapshot() == state
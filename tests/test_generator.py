@@ -0,0 +1,36 @@
+import pytest
+
+from Generator import PuzzleGenerator, SYMMETRIES, generate_puzzles
+from SolverSession import SudokuSession
+
+
+@pytest.mark.parametrize("engine", ["object", "array"])
+def test_puzzles_are_unique(engine):
+    session = SudokuSession(3)
+    for puzzle, solution in generate_puzzles(3, 3, seed=5, engine=engine):
+        assert session.count_solutions(puzzle, 2) == 1
+        assert session.solve(puzzle) == solution
+        assert all(cell in (0, solution[i][j]) for i, row in enumerate(puzzle) for j, cell in enumerate(row))
+
+
+def test_symmetry():
+    generator = PuzzleGenerator(2, seed=7)
+    pair = SYMMETRIES["rotational"]
+    puzzle, solution = generator.generate(symmetry="rotational")
+    for i in range(0, 4):
+        for j in range(0, 4):
+            k, l = pair(4, i, j)
+            assert bool(puzzle[i][j]) == bool(puzzle[k][l])
+    assert SudokuSession(2).count_solutions(puzzle, 2) == 1
+
+
+def test_seeded():
+    first = list(generate_puzzles(2, 3, seed=11))
+    assert list(generate_puzzles(2, 3, seed=11)) == first
+
+
+def test_matrix_restored():
+    generator = PuzzleGenerator(2, seed=3)
+    state = generator.matrix.snapshot()
+    generator.generate()
+    assert generator.matrix.snapshot() == state
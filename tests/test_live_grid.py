@@ -0,0 +1,75 @@
+import threading
+
+from LiveGrid import MULTIPLE, LiveChecker, LiveGrid
+
+
+def test_stale_solve_is_not_reported():
+    # The first solve is held before its search starts, then cancelled and replaced
+    live = LiveGrid(2)
+    held = threading.Event()
+    release = threading.Event()
+    solve = live.solve
+
+    def held_solve(stats=None, cancel=None):
+        if not held.is_set():
+            held.set()
+            release.wait(5)
+        return solve(stats, cancel)
+
+    live.solve = held_solve
+    solved = []
+    done = threading.Event()
+
+    def solved_callback(grid):
+        solved.append(grid)
+        done.set()
+
+    checker = LiveChecker(live, lambda status, version: None, solved_callback)
+    checker.start()
+    try:
+        checker.solve()
+        assert held.wait(5)
+        checker.cancel()
+        checker.solve()
+        release.set()
+        assert done.wait(5)
+    finally:
+        checker.stop()
+        checker.join(5)
+    assert len(solved) == 1
+
+
+def test_cancelled_solve_is_not_reported():
+    live = LiveGrid(2)
+    held = threading.Event()
+    release = threading.Event()
+    solve = live.solve
+
+    def held_solve(stats=None, cancel=None):
+        held.set()
+        release.wait(5)
+        return solve(stats, cancel)
+
+    live.solve = held_solve
+    solved = []
+    statuses = []
+    checked = threading.Event()
+
+    def callback(status, version):
+        statuses.append(status)
+        if held.is_set():
+            checked.set()
+
+    checker = LiveChecker(live, callback, solved.append)
+    checker.start()
+    try:
+        checker.solve()
+        assert held.wait(5)
+        checker.cancel()
+        release.set()
+        assert checked.wait(5)
+    finally:
+        checker.stop()
+        checker.join(5)
+    assert solved == []
+    assert statuses[-1] == MULTIPLE
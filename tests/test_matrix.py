@@ -0,0 +1,55 @@
+from Exact_Cover import count_solutions
+from Matrix import Matrix, sparse_matrix
+
+ROWS = [
+    [0, 0, 1, 0, 1, 1, 0],
+    [1, 0, 0, 1, 0, 0, 1],
+    [0, 1, 1, 0, 0, 1, 0],
+    [1, 0, 0, 1, 0, 0, 0],
+    [0, 1, 0, 0, 0, 0, 1],
+    [0, 0, 0, 1, 1, 0, 1],
+]
+
+
+def matrices():
+    dense = Matrix(6, 7)
+    dense.set_matrix([row.copy() for row in ROWS])
+    sparse = Matrix(6, 7, sparse=True)
+    sparse.set_matrix(ROWS)
+    return dense, sparse
+
+
+def test_sparse_matches_dense():
+    dense, sparse = matrices()
+    for i in range(1, 7):
+        assert sparse.get_row(i) == dense.get_row(i)
+        assert sparse.row_entries(i) == dense.row_entries(i)
+    for j in range(1, 8):
+        assert sparse.get_col(j) == dense.get_col(j)
+        assert sparse.col_entries(j) == dense.col_entries(j)
+    assert str(sparse) == str(dense)
+
+
+def test_sparse_edits():
+    dense, sparse = matrices()
+    for matrix in (dense, sparse):
+        matrix.set(0, 1, 3)
+        matrix.set(5, 2, 3)
+    assert sparse.remove_row(3) == dense.remove_row(3)
+    assert sparse.remove_col(2) == dense.remove_col(2)
+    assert (sparse.num_rows, sparse.num_cols) == (dense.num_rows, dense.num_cols)
+    for i in range(1, sparse.num_rows + 1):
+        assert sparse.get_row(i) == dense.get_row(i)
+    for j in range(1, sparse.num_cols + 1):
+        assert sparse.col_entries(j) == dense.col_entries(j)
+    assert not sparse.is_boolean() and not dense.is_boolean()
+
+
+def test_sparse_matrix():
+    pairs = [(i + 1, j + 1) for i in range(0, 6) for j in range(0, 7) if ROWS[i][j]]
+    matrix = sparse_matrix(6, 7, pairs)
+    dense, sparse = matrices()
+    assert all(matrix.get_row(i) == dense.get_row(i) for i in range(1, 7))
+    for engine in ("object", "array"):
+        assert count_solutions(matrix.convert(list("ABCDEFG"), engine)) == 1
+        assert count_solutions(dense.convert(list("ABCDEFG"), engine)) == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from Exact_Cover import (count_exact_covers, count_solutions, generate_queens_problem,
+                         generate_sudoku_col_headers, generate_sudoku_matrix, generate_sudoku_rows,
+                         select_rows, uncover_givens)
+from ParallelSearch import parallel_search, parallel_solve_sudoku, split_search
+from PuzzleIO import parse_puzzle
+from SolverSession import SudokuSession
+
+PUZZLE = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+
+
+@pytest.mark.parametrize("engine", ["object", "array"])
+def test_split_search(engine):
+    matrix = generate_sudoku_matrix(2, engine)
+    state = matrix.snapshot()
+    subproblems = split_search(matrix, frontier_size=20)
+    assert len(subproblems) >= 20
+    assert matrix.snapshot() == state
+
+    total = 0
+    for rows in subproblems:
+        assert select_rows(matrix, rows)
+        total += count_solutions(matrix)
+        uncover_givens(matrix, rows)
+    assert total == 288
+    assert matrix.snapshot() == state
+
+
+def test_parallel_count():
+    headers = generate_sudoku_col_headers(2)
+    rows = generate_sudoku_rows(2)
+    assert parallel_search(headers, rows, 2, count=True) == 288
+    assert parallel_search(headers, rows, 2, count=True, limit=10) == 10
+    assert parallel_search(headers, rows, 2, depth=2, count=True, engine="array") == 288
+
+
+@pytest.mark.parametrize("engine", ["object", "array"])
+def test_parallel_secondary_columns(engine):
+    rows, primary, secondary = generate_queens_problem(8)
+    headers = primary + secondary
+    index = dict((header, i) for i, header in enumerate(headers))
+    sparse = [sorted(index[col] for col in row) for row in rows]
+    expected = count_exact_covers(rows, primary, secondary, engine=engine)
+    assert expected == 92
+    assert parallel_search(headers, sparse, 2, count=True, engine=engine,
+                           secondary=len(secondary)) == expected
+
+    solution = parallel_search(headers, sparse, 2, engine=engine, secondary=len(secondary))
+    queens = [rows[row - 1] for row in solution]
+    assert sorted(queen[0] for queen in queens) == primary[:8]
+    assert sorted(queen[1] for queen in queens) == primary[8:]
+    assert len(set(queen[2] for queen in queens)) == len(set(queen[3] for queen in queens)) == 8
+
+
+def test_parallel_first_solution():
+    grid = parse_puzzle(PUZZLE)[1]
+    assert parallel_solve_sudoku(3, grid, 2) == SudokuSession(3).solve(grid)
+    grid[0][0] = 3
+    assert parallel_solve_sudoku(3, grid, 2) is None
@@ -0,0 +1,40 @@
+from BatchSolver import INVALID, UNSOLVABLE, BatchSolver, main
+from Generator import generate_puzzles
+from ParallelSolver import solve_parallel
+from PuzzleIO import format_grid
+
+PUZZLES = [format_grid(puzzle) for puzzle, solution in generate_puzzles(2, 10, seed=1)]
+LINES = PUZZLES[:5] + ["11" + "." * 14, "12345"] + PUZZLES[5:]
+
+
+def expected():
+    solver = BatchSolver()
+    return [solver.solve_line(line) for line in LINES]
+
+
+def test_ordered():
+    results = list(solve_parallel(LINES, 2, chunk_size=2, sizes=(2,)))
+    assert [index for index, solution, result, elapsed in results] == list(range(0, len(LINES)))
+    assert [(solution, result) for index, solution, result, elapsed in results] == expected()
+    assert results[5][2] == UNSOLVABLE and results[6][2] == INVALID
+
+
+def test_unordered():
+    results = list(solve_parallel(LINES, 2, chunk_size=1, ordered=False, engine="array", sizes=(2,)))
+    assert sorted(index for index, solution, result, elapsed in results) == list(range(0, len(LINES)))
+    by_index = {index: (solution, result) for index, solution, result, elapsed in results}
+    assert [by_index[index] for index in range(0, len(LINES))] == expected()
+
+
+def test_command_line(tmp_path):
+    source = tmp_path / "puzzles.txt"
+    source.write_text("\n".join(LINES) + "\n")
+    ordered = tmp_path / "ordered.txt"
+    unordered = tmp_path / "unordered.txt"
+    assert main([str(source), "-o", str(ordered), "-j", "2", "--chunk-size", "3"]) == 0
+    assert main([str(source), "-o", str(unordered), "-j", "2", "--chunk-size", "3", "--unordered"]) == 0
+
+    solutions = [solution for solution, result in expected()]
+    assert ordered.read_text().split("\n")[:-1] == solutions
+    lines = [line.split("\t") for line in unordered.read_text().split("\n")[:-1]]
+    assert sorted((int(index), solution) for index, solution in lines) == list(enumerate(solutions))
@@ -0,0 +1,50 @@
+import pytest
+
+from Generator import generate_puzzles
+from Propagation import is_complete, propagate
+from PuzzleIO import parse_puzzle
+from SolverSession import SudokuSession
+
+PUZZLES = [
+    "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+]
+
+# Conflicting givens, and a first cell left with no number, 1 and 2 being in its
+# row and 3 and 4 in its column
+CONTRADICTIONS = ["11" + "." * 14, ".12.3...4......."]
+
+
+def puzzles():
+    for line in PUZZLES:
+        yield parse_puzzle(line)
+    for n in (2, 3):
+        for puzzle, solution in generate_puzzles(n, 4, seed=n):
+            yield n, puzzle
+
+
+@pytest.mark.parametrize("n, grid", list(puzzles()))
+def test_forced_cells_match_search(n, grid):
+    original = [row.copy() for row in grid]
+    solution = SudokuSession(n, propagation=False).solve(grid)
+    filled = propagate(n, grid)
+    assert grid == original
+    for i in range(0, n**2):
+        for j in range(0, n**2):
+            assert filled[i][j] in (0, solution[i][j])
+            if grid[i][j]:
+                assert filled[i][j] == grid[i][j]
+    assert not is_complete(filled) or filled == solution
+
+
+@pytest.mark.parametrize("line", CONTRADICTIONS)
+def test_contradiction(line):
+    n, grid = parse_puzzle(line)
+    assert propagate(n, grid) is None
+    assert SudokuSession(n, propagation=False).solve(grid) is None
+
+
+def test_open_grid():
+    grid = [[0] * 9 for i in range(0, 9)]
+    assert propagate(3, grid) == grid
+    assert not is_complete(grid)
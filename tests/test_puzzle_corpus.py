@@ -0,0 +1,72 @@
+import pytest
+
+from PuzzleCorpus import (CorpusReader, corpus_to_text, decode_record, encode_grid, solve_corpus,
+                          text_to_corpus, write_corpus)
+from PuzzleIO import format_grid, parse_puzzle
+
+PUZZLES = [
+    "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..",
+    "2...8.3...6..7..84.3.5..2.9...1.54.8.........4.27.6...3.1..7.4.72..4..6...4.1...3",
+    # Conflicting givens
+    "11...............................................................................",
+]
+
+
+@pytest.mark.parametrize("n", [2, 3, 4])
+def test_encode_round_trip(n):
+    size = n**2
+    grid = [[(i * n + i // n + j) % size + 1 for j in range(0, size)] for i in range(0, size)]
+    grid[0][0] = 0
+    assert decode_record(n, encode_grid(n, grid)) == grid
+
+
+def test_text_round_trip(tmp_path):
+    text = tmp_path / "puzzles.txt"
+    text.write_text("\n".join(PUZZLES) + "\n\n")
+    assert text_to_corpus(str(text), str(tmp_path / "puzzles.sdkc")) == 3
+    assert corpus_to_text(str(tmp_path / "puzzles.sdkc"), str(tmp_path / "out.txt")) == 3
+    assert (tmp_path / "out.txt").read_text().split() == PUZZLES
+
+
+def test_record_outlives_reader(tmp_path):
+    path = str(tmp_path / "puzzles.sdkc")
+    write_corpus(path, 3, [parse_puzzle(line)[1] for line in PUZZLES])
+    reader = CorpusReader(path)
+    record = reader.record(1)
+    reader.close()
+    assert reader._file.closed
+    assert format_grid(decode_record(3, record)) == PUZZLES[1]
+
+
+def test_grid_releases_map(tmp_path):
+    path = str(tmp_path / "puzzles.sdkc")
+    write_corpus(path, 3, [parse_puzzle(line)[1] for line in PUZZLES])
+    reader = CorpusReader(path)
+    assert format_grid(reader.grid(1)) == PUZZLES[1]
+    grids = reader.grids()
+    assert format_grid(next(grids)) == PUZZLES[0]
+    # Neither the decoded grid nor the unfinished generator holds a view of the map
+    reader.close()
+    assert reader._file.closed
+
+
+def test_bad_corpus(tmp_path):
+    path = tmp_path / "puzzles.sdkc"
+    write_corpus(str(path), 3, [parse_puzzle(PUZZLES[0])[1]])
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(Exception, match="Truncated"):
+        CorpusReader(str(path))
+    path.write_bytes(b"")
+    with pytest.raises(Exception, match="Not a puzzle corpus"):
+        CorpusReader(str(path))
+
+
+def test_solve_corpus(tmp_path):
+    path = str(tmp_path / "puzzles.sdkc")
+    out_path = str(tmp_path / "solutions.sdkc")
+    write_corpus(path, 3, [parse_puzzle(line)[1] for line in PUZZLES])
+    assert solve_corpus(path, out_path, chunk_size=2) == 3
+    with CorpusReader(out_path) as reader:
+        solutions = list(reader.grids())
+    assert all(sorted(row) == list(range(1, 10)) for row in solutions[0] + solutions[1])
+    assert solutions[2] == [[0] * 9 for i in range(0, 9)]
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+import ParallelSolver
+import SolveServer
+from BatchSolver import BatchSolver
+from SolveClient import SolveClient
+from SolveServer import ERROR, INVALID, SOLVED, TIMEOUT, UNSOLVABLE, SolveServer as Server
+
+PUZZLE = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+
+# Hard for the "first" heuristic, see Benchmark
+HARD = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+
+
+@pytest.fixture(scope="module")
+def server():
+    with Server(port=0, workers=1, batch_wait=0.001) as server:
+        yield server
+
+
+def test_solve(server):
+    with SolveClient(*server.address) as client:
+        solution, status = client.solve(PUZZLE)
+        assert status == SOLVED
+        assert all(a == b for a, b in zip(PUZZLE, solution) if a != ".")
+        results = client.solve_many([PUZZLE, "11" + "." * 79, "12345"])
+        assert [status for solution, status in results] == [SOLVED, UNSOLVABLE, INVALID]
+        assert results[0][0] == solution
+        stats = client.stats()
+    assert stats["statuses"][SOLVED] >= 2
+    assert stats["statuses"][INVALID] >= 1
+
+
+def test_bad_request(server):
+    with SolveClient(*server.address) as client:
+        with pytest.raises(Exception, match="Invalid request"):
+            client._request("POST", "/solve", {"puzzles": [1]})
+        with pytest.raises(Exception, match="Not found"):
+            client._request("GET", "/nothing")
+
+
+def test_timeout(monkeypatch):
+    monkeypatch.setattr(ParallelSolver, "_solver", BatchSolver())
+    ParallelSolver._solver.session(3).matrix.set_heuristic("first")
+    start = time.time()
+    results = SolveServer._solve_batch([(HARD, start + 0.05), (PUZZLE, None), (PUZZLE, 0.0)])
+    assert time.time() - start < 5
+    assert results[0] == (None, TIMEOUT)
+    assert results[1][1] == SOLVED
+    assert results[2] == (None, TIMEOUT)
+
+
+def test_error(monkeypatch):
+    monkeypatch.setattr(ParallelSolver, "_solver", BatchSolver())
+
+    def broken(grid, stats=None, cancel=None):
+        raise RuntimeError("broken")
+
+    ParallelSolver._solver.session(3).solve = broken
+    results = SolveServer._solve_batch([(PUZZLE, None), ("12345", None)])
+    assert results == [(None, ERROR), (None, INVALID)]
@@ -0,0 +1,37 @@
+import pytest
+
+from PuzzleIO import parse_puzzle
+from SolverSession import SudokuSession
+
+PUZZLE = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+
+# Consistent after propagation, but without a solution
+UNSOLVABLE = "....5..6.7891........7891..3....5.7......2.4.............5...9.....3......48...3."
+
+
+@pytest.mark.parametrize("engine", ["object", "array"])
+def test_solve_restores_matrix(engine):
+    session = SudokuSession(3, engine, debug=True)
+    n, grid = parse_puzzle(PUZZLE)
+    solved = session.solve(grid)
+    assert all(sorted(row) == list(range(1, 10)) for row in solved)
+    assert session.count_solutions(grid) == 1
+    assert session.solve(grid) == solved
+
+
+@pytest.mark.parametrize("propagation", [True, False])
+def test_hint_on_unsolvable_grid(propagation):
+    session = SudokuSession(3, debug=True, propagation=propagation)
+    n, grid = parse_puzzle(UNSOLVABLE)
+    assert session.solve(grid) is None
+    # A given cell and an empty one
+    assert session.hint(grid, 1, 5) == []
+    assert session.hint(grid, 1, 1) == []
+
+
+def test_hint():
+    session = SudokuSession(3, debug=True)
+    n, grid = parse_puzzle(PUZZLE)
+    solved = session.solve(grid)
+    assert session.hint(grid, 1, 3) == [3]
+    assert session.hint(grid, 1, 1) == [solved[0][0]]
@@ -0,0 +1,86 @@
+import os
+import struct
+
+import pytest
+
+from ArrayMatrix import ARRAY_NAMES
+from Exact_Cover import count_solutions, generate_sudoku_matrix, search_all
+from PuzzleIO import parse_puzzle
+from SolverSession import SudokuSession
+from TemplateCache import HEADER, get_cached_sudoku_matrix, load_template, save_template, template_path
+
+PUZZLE = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "template.dlx")
+    fresh = generate_sudoku_matrix(2, "array")
+    save_template(fresh, 2, path)
+    assert os.listdir(str(tmp_path)) == ["template.dlx"]
+    loaded = load_template(2, path)
+    assert loaded.snapshot() == fresh.snapshot()
+    assert list(search_all(loaded)) == list(search_all(generate_sudoku_matrix(2, "array")))
+    assert count_solutions(loaded) == 288
+
+
+def test_stale_templates(tmp_path):
+    path = str(tmp_path / "template.dlx")
+    save_template(generate_sudoku_matrix(2, "array"), 2, path)
+    data = open(path, "rb").read()
+    assert load_template(3, path) is None
+
+    # Another format version
+    open(path, "wb").write(data[:4] + struct.pack("<I", 999) + data[8:])
+    assert load_template(2, path) is None
+
+    open(path, "wb").write(data[:-1])
+    assert load_template(2, path) is None
+    open(path, "wb").write(data[:HEADER.size - 1])
+    assert load_template(2, path) is None
+    open(path, "wb").write(b"")
+    assert load_template(2, path) is None
+    assert load_template(2, str(tmp_path / "missing.dlx")) is None
+
+
+def test_cache_rebuilds(tmp_path):
+    cache_dir = str(tmp_path)
+    path = template_path(3, cache_dir)
+    first = get_cached_sudoku_matrix(3, cache_dir)
+    data = open(path, "rb").read()
+
+    open(path, "wb").write(data[:len(data) // 2])
+    rebuilt = get_cached_sudoku_matrix(3, cache_dir)
+    assert rebuilt.snapshot() == first.snapshot()
+    assert open(path, "rb").read() == data
+    assert os.listdir(cache_dir) == [os.path.basename(path)]
+
+
+def test_cached_session(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUDOKU_CACHE_DIR", str(tmp_path))
+    grid = parse_puzzle(PUZZLE)[1]
+    expected = SudokuSession(3, "array").solve(grid)
+    for k in range(0, 2):
+        session = SudokuSession(3, "array", debug=True, cache=True)
+        assert session.solve(grid) == expected
+
+
+def test_failed_save_keeps_template(tmp_path):
+    path = str(tmp_path / "template.dlx")
+    save_template(generate_sudoku_matrix(2, "array"), 2, path)
+    data = open(path, "rb").read()
+
+    class Broken:
+        def __len__(self):
+            return 1
+
+        def tofile(self, f):
+            raise OSError("Disk full")
+
+    class BrokenMatrix:
+        def to_arrays(self):
+            return {name: Broken() for name in ARRAY_NAMES}
+
+    with pytest.raises(OSError):
+        save_template(BrokenMatrix(), 2, path)
+    assert os.listdir(str(tmp_path)) == ["template.dlx"]
+    assert open(path, "rb").read() == data